@@ -1,9 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Response
+from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
-from src.predictor import predict_sales
+from src.predictor import predict_payload, prediction_frame, scaled_features, score_features
+from src.result_cache import CachedResponse, ResultCache, cache_key
+from src.serialization import MEDIA_TYPES, FastJSONResponse, dumps, encode_frame, ndjson_lines
+from src.batching import MicroBatcher
+from src.horizon import MAX_HORIZON, forecast_payload
+from src.batch_scoring import ForecastStore
+from src.executor import Overloaded, PredictionExecutor
 from src.hopsworks_utils import get_recent_data, init_hopsworks
-from src.model_utils import load_model
-from src.model_utils import load_scaler  
+from src.artifacts import ArtifactHolder, ServingArtifacts, load_artifacts
+from src.model_watcher import ModelWatcher
+from src.feature_cache import FeatureCache
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 import uvicorn
 import logging
@@ -20,17 +32,70 @@ logger = logging.getLogger(__name__)
 FEATURE_GROUP = "sales_record"
 FEATURE_GROUP_VERSION = 1
 DAYS_TO_FETCH = 25
+MAX_PRODUCTS_PER_REQUEST = int(os.getenv("MAX_PRODUCTS_PER_REQUEST", "1000"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "10000"))
+# Products scored per step of a streamed (format=ndjson) response
+STREAM_CHUNK_PRODUCTS = int(os.getenv("STREAM_CHUNK_PRODUCTS", "500"))
 
 # Initialize FastAPI app
 app = FastAPI(title="Sales Forecast API", version="1.0")
 
-# Load model and scaler
+# Load model, scaler and schema once at startup as an immutable snapshot
+artifacts = ArtifactHolder()
 try:
-    model = load_model()
-    logger.info("Model loaded successfully.")
+    artifacts.swap(load_artifacts())
 except Exception as e:
     logger.error(f" Failed to load model: {e}")
-    model = None
+
+
+# Set up below once Hopsworks is connected
+feature_cache = None
+
+
+def swap_model(bundle: dict):
+    """Serve a newly promoted bundle; the feature cache reloads if it reads more columns"""
+    artifacts.swap(ServingArtifacts.from_bundle(bundle))
+    if feature_cache is not None:
+        try:
+            feature_cache.refresh()
+        except Exception as e:
+            logger.error(f"Feature cache refresh after model swap failed: {e}")
+
+
+# Follow the registry's production pointer and hot-swap new versions
+model_watcher = ModelWatcher(
+    on_swap=swap_model,
+    current_version=artifacts.current.version if artifacts.ready else None,
+    interval=float(os.getenv("MODEL_WATCH_INTERVAL", "10")),
+).start()
+
+# Prediction work runs in a bounded pool; beyond PREDICT_MAX_PENDING jobs
+# requests get 429. PREDICT_EXECUTOR=process uses worker processes that
+# each preload the model.
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+executor = PredictionExecutor(
+    kind=os.getenv("PREDICT_EXECUTOR", "thread"),
+    max_workers=PREDICT_WORKERS,
+    max_pending=int(os.getenv("PREDICT_MAX_PENDING", "0")) or 4 * PREDICT_WORKERS,
+)
+
+
+# Concurrent /predict calls are scored together: requests arriving within
+# MICRO_BATCH_WAIT_MS share one predict of up to MICRO_BATCH_MAX_ROWS rows.
+# MICRO_BATCH=0 scores every request on its own. Batches run on behalf of
+# requests that already hold an admission slot, so they take none of their own.
+batcher = None
+if os.getenv("MICRO_BATCH", "1") == "1":
+    batcher = MicroBatcher(
+        run_batch=lambda snapshot, X: executor.run(snapshot, score_features, X),
+        max_batch_size=int(os.getenv("MICRO_BATCH_MAX_ROWS", "50000")),
+        max_wait_ms=float(os.getenv("MICRO_BATCH_WAIT_MS", "2")),
+    )
+
+
+def overloaded_response(e: Overloaded) -> JSONResponse:
+    return JSONResponse(status_code=429, content={"error": f"Server busy: {e}"}, headers={"Retry-After": "1"})
+
 
 # Connect to Hopsworks Feature Store
 try:
@@ -40,6 +105,191 @@ except Exception as e:
     logger.error(f"Failed to initialize Hopsworks: {e}")
     fs = None
 
+# Only read the columns the model needs and only DATA_LOOKBACK_DAYS of
+# history; both are pushed down to the feature store. The default leaves
+# room for DAYS_TO_FETCH rows of products that don't sell daily;
+# DATA_LOOKBACK_DAYS=0 reads the full history
+DATA_LOOKBACK_DAYS = int(os.getenv("DATA_LOOKBACK_DAYS", str(4 * DAYS_TO_FETCH)))
+
+
+def read_columns():
+    """Columns the currently served model needs; follows hot swaps"""
+    current = artifacts.current
+    return current.read_columns() if current is not None else None
+
+
+# Recent rows per product kept in memory and refreshed incrementally;
+# FEATURE_CACHE_REFRESH=0 reads the feature group on every request instead.
+# Each refresh re-reads FEATURE_CACHE_OVERLAP seconds before the watermark
+# to catch rows that land late.
+FEATURE_CACHE_REFRESH = float(os.getenv("FEATURE_CACHE_REFRESH", "60"))
+FEATURE_CACHE_OVERLAP = float(os.getenv("FEATURE_CACHE_OVERLAP", "600"))
+if fs is not None and FEATURE_CACHE_REFRESH > 0:
+    try:
+        feature_cache = FeatureCache(
+            fs, FEATURE_GROUP, FEATURE_GROUP_VERSION, days=DAYS_TO_FETCH,
+            refresh_interval=FEATURE_CACHE_REFRESH,
+            columns=read_columns,
+            lookback_days=DATA_LOOKBACK_DAYS,
+            overlap=FEATURE_CACHE_OVERLAP
+        )
+        feature_cache.load()
+        feature_cache.start()
+    except Exception as e:
+        logger.error(f"Feature cache disabled, reading per request: {e}")
+        feature_cache = None
+
+# Encoded responses are cached per (model version, feature window revision,
+# request) and dropped as soon as either moves. Needs the feature cache for
+# the revision; RESULT_CACHE_MB=0 disables it, RESULT_CACHE_SPILL_DIR
+# keeps entries evicted from memory on disk.
+RESULT_CACHE_MB = float(os.getenv("RESULT_CACHE_MB", "256"))
+result_cache = None
+if RESULT_CACHE_MB > 0 and feature_cache is not None:
+    result_cache = ResultCache(
+        max_bytes=int(RESULT_CACHE_MB * 2**20),
+        spill_dir=os.getenv("RESULT_CACHE_SPILL_DIR") or None,
+        spill_max_bytes=int(float(os.getenv("RESULT_CACHE_SPILL_MB", "1024")) * 2**20)
+    )
+
+
+def cache_generation(current: ServingArtifacts):
+    """Model version and feature window revision results depend on; None disables caching"""
+    if result_cache is None or feature_cache is None:
+        return None
+    return (current.version, current.loaded_at, feature_cache.snapshot().revision)
+
+
+async def _result_cache_call(method, *args):
+    """Memory-only cache calls stay on the event loop; spilling ones may do disk I/O"""
+    if result_cache.spill_dir:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+async def cached_response(generation, key: str) -> Optional[Response]:
+    if generation is None:
+        return None
+    entry = await _result_cache_call(result_cache.get, generation, key)
+    if entry is None:
+        return None
+    return Response(content=entry.body, media_type=entry.media_type, headers=entry.headers)
+
+
+async def store_response(generation, key: str, response):
+    """Cache successful, fully encoded responses; returns response unchanged"""
+    if (generation is not None and isinstance(response, Response)
+            and not isinstance(response, StreamingResponse) and response.status_code == 200):
+        headers = {k: v for k, v in response.headers.items() if k.lower().startswith("x-")}
+        await _result_cache_call(result_cache.put, generation, key,
+                                 CachedResponse(bytes(response.body), response.media_type, headers))
+    return response
+
+# Forecasts precomputed by the nightly batch scoring job (src.batch_scoring)
+forecast_store = ForecastStore()
+
+
+def recent_data() -> pd.DataFrame:
+    """Last DAYS_TO_FETCH rows per product, from the cache when enabled"""
+    if feature_cache is not None:
+        return feature_cache.snapshot().frame
+    since = pd.Timestamp.now() - pd.Timedelta(days=DATA_LOOKBACK_DAYS) if DATA_LOOKBACK_DAYS else None
+    return get_recent_data(
+        fs=fs,
+        feature_group_name=FEATURE_GROUP,
+        version=FEATURE_GROUP_VERSION,
+        days=DAYS_TO_FETCH,
+        columns=read_columns(),
+        since=since
+    )
+
+
+def with_global_categories(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    marketplace_name as a categorical over every marketplace in data, so
+    marketplace_code (its category code) does not depend on which rows a
+    request selects. The feature cache's frame is categorical already.
+    """
+    if isinstance(data["marketplace_name"].dtype, pd.CategoricalDtype):
+        return data
+    categories = sorted(data["marketplace_name"].dropna().unique())
+    return data.assign(marketplace_name=pd.Categorical(data["marketplace_name"], categories=categories))
+
+
+def recent_rows(product_names) -> pd.DataFrame:
+    """
+    Recent rows of the given products only, via the cache's product index,
+    in product/time order (the row order predictions are returned in)
+    """
+    if feature_cache is not None:
+        return feature_cache.snapshot().rows_for(product_names)
+    data = with_global_categories(recent_data())
+    data = data[data["product_name"].isin(list(product_names))]
+    return data.sort_values(["product_name", "created_at"], kind="stable")
+
+
+def page_rows(cursor: Optional[str], limit: Optional[int]):
+    """
+    Rows of the products after `cursor` (by name), at most `limit` of them,
+    in product/time order
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    if feature_cache is not None:
+        window = feature_cache.snapshot()
+        products = window.products
+        if cursor is None and limit is None:
+            return window.frame, None
+    else:
+        data = with_global_categories(recent_data()).sort_values(["product_name", "created_at"], kind="stable")
+        products = np.sort(data["product_name"].astype(str).unique())
+    start = int(np.searchsorted(products, cursor, side="right")) if cursor is not None else 0
+    stop = len(products) if limit is None else min(start + limit, len(products))
+    page = products[start:stop]
+    next_cursor = str(page[-1]) if stop < len(products) and len(page) else None
+    if feature_cache is not None:
+        return window.rows_for(page), next_cursor
+    return data[data["product_name"].astype(str).isin(page)], next_cursor
+
+
+class ProductsRequest(BaseModel):
+    products: List[str] = Field(..., min_length=1, max_length=MAX_PRODUCTS_PER_REQUEST)
+
+
+async def score_payload(current: ServingArtifacts, data: pd.DataFrame, build=predict_payload):
+    """
+    build(artifacts, data, scores) on the executor (predict_payload or
+    prediction_frame), scored through the micro-batcher when enabled.
+    Segment-routed versions score per request: their rows need the raw
+    segment labels, which the batcher's stacked matrices don't carry.
+    """
+    if batcher is None or current.segment_model is not None:
+        return await executor.run(current, build, data)
+    X = await executor.run(current, scaled_features, data)
+    scores = await batcher.submit(current, X)
+    return await executor.run(current, build, data, scores)
+
+
+async def stream_predictions(current: ServingArtifacts, data: pd.DataFrame):
+    """NDJSON lines, scoring STREAM_CHUNK_PRODUCTS products at a time"""
+    if data.empty:
+        return
+    products = data["product_name"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])
+    bounds = np.r_[starts[::STREAM_CHUNK_PRODUCTS], len(products)]
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        try:
+            with executor.admit():
+                payload = await score_payload(current, data.iloc[start:stop])
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            logger.exception("Streaming prediction failed.")
+            yield dumps({"error": str(e)}) + b"\n"
+            return
+        for line in ndjson_lines(payload):
+            yield line
+
 
 @app.get("/", tags=["Health"])
 def health_check():
@@ -47,49 +297,192 @@ def health_check():
     return {"message": " Sales Forecast API is running."}
 
 
+@app.get("/ready", tags=["Health"])
+def readiness(response: Response):
+    """Readiness probe: 200 once a model and the data source are available."""
+    current = artifacts.current
+    window = feature_cache.snapshot() if feature_cache is not None else None
+    ready = current is not None and fs is not None
+    response.status_code = 200 if ready else 503
+    return {
+        "ready": ready,
+        "model_version": current.version if current else None,
+        "model_loaded_at": current.loaded_at.isoformat() if current else None,
+        "feature_store": fs is not None,
+        "feature_cache_watermark": str(window.watermark) if window is not None else None,
+        "feature_cache_revision": window.revision if window is not None else None,
+        "executor": executor.stats(),
+        "batcher": batcher.stats() if batcher is not None else None,
+        "result_cache": result_cache.stats() if result_cache is not None else None,
+        "forecast_store": forecast_store.meta() if forecast_store.exists() else None,
+    }
+
+
 @app.get("/predict", tags=["Prediction"])
-def predict_all():
+async def predict_all(
+    format: str = Query("json", pattern="^(json|ndjson|arrow|parquet)$"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """
     Fetch recent data from Feature Store,
     run predictions, and return actual vs predicted sales
     grouped by product_name.
+
+    With limit, products are paged in name order: the response is
+    {"predictions": ..., "next_cursor": ...} and next_cursor is passed back
+    as cursor for the following page. format=ndjson streams one product
+    per line; arrow and parquet return one flat table. Both put the next
+    cursor in the X-Next-Cursor header.
     """
-    if model is None or fs is None:
+    # Read the reference once so a concurrent swap cannot mix versions
+    current = artifacts.current
+    if current is None or fs is None:
         return {"error": "Model or Feature Store connection not initialized."}
 
+    generation = cache_generation(current) if format != "ndjson" else None
+    key = cache_key("predict", format, limit, cursor)
+    hit = await cached_response(generation, key)
+    if hit is not None:
+        return hit
+
+    paged = limit is not None or cursor is not None
     try:
-        # Fetch recent 25-day data
-        data = get_recent_data(
-            fs=fs,
-            feature_group_name=FEATURE_GROUP,
-            version=FEATURE_GROUP_VERSION,
-            days=DAYS_TO_FETCH
-        )
+        # The slot is taken before the feature read, so an overloaded server
+        # rejects the request without reading anything. NDJSON releases it
+        # on return; each streamed chunk is admitted on its own.
+        with executor.admit():
+            # Recent 25 rows per product (of the requested page)
+            data, next_cursor = await run_in_threadpool(page_rows, cursor, limit)
+
+            if data.empty and not paged:
+                return {"error": "No data retrieved from Feature Store."}
 
-        if data.empty:
-            return {"error": "No data retrieved from Feature Store."}
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+            if format == "ndjson":
+                return StreamingResponse(stream_predictions(current, data), media_type=MEDIA_TYPES[format],
+                                         headers=headers)
+            if format in ("arrow", "parquet"):
+                # A page past the end is an empty table with the usual schema
+                frame = (await score_payload(current, data, build=prediction_frame) if not data.empty
+                         else prediction_frame(current, data))
+                body = await run_in_threadpool(encode_frame, frame, format)
+                return await store_response(generation, key,
+                                            Response(content=body, media_type=MEDIA_TYPES[format], headers=headers))
 
-        # Prepare actual sales for comparison
-        actual = data[["product_name", "created_at", "sub_total"]].rename(columns={"sub_total": "actual_sales"})
-        scaler = load_scaler()
-        # Predict
-        predictions = predict_sales(model=model, raw_df=data, scaler = scaler )
+            payload = await score_payload(current, data) if not data.empty else {}
+            if not paged:
+                return await store_response(generation, key, FastJSONResponse(payload))
+            return await store_response(generation, key,
+                                        FastJSONResponse({"predictions": payload, "next_cursor": next_cursor}))
 
-        # Merge predicted + actual
-        combined = pd.merge(actual, predictions, on=["product_name", "created_at"], how="left")
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        logger.exception("Prediction failed.")
+        return {"error": str(e)}
 
-        # Group by product_name
-        result = {
-            product: group.sort_values("created_at").to_dict(orient="records")
-            for product, group in combined.groupby("product_name")
-        }
 
-        return result
+@app.get("/predict/{product_name}", tags=["Prediction"])
+async def predict_product(product_name: str):
+    """Actual vs predicted sales of a single product."""
+    return await predict_products(ProductsRequest(products=[product_name]))
 
+
+@app.post("/predict", tags=["Prediction"])
+async def predict_products(request: ProductsRequest):
+    """
+    Actual vs predicted sales of the requested products, grouped by
+    product_name. Products without recent data are left out; 404 if none
+    have any.
+    """
+    current = artifacts.current
+    if current is None or fs is None:
+        return {"error": "Model or Feature Store connection not initialized."}
+
+    generation = cache_generation(current)
+    key = cache_key("products", tuple(sorted(set(request.products))))
+    hit = await cached_response(generation, key)
+    if hit is not None:
+        return hit
+
+    try:
+        with executor.admit():
+            data = await run_in_threadpool(recent_rows, request.products)
+
+            if data.empty:
+                return JSONResponse(status_code=404, content={"error": "No recent data for the requested products."})
+
+            return await store_response(generation, key, FastJSONResponse(await score_payload(current, data)))
+
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         logger.exception("Prediction failed.")
         return {"error": str(e)}
 
 
+@app.get("/forecast", tags=["Prediction"])
+async def forecast(horizon: int = Query(30, ge=1, le=MAX_HORIZON)):
+    """
+    Forecast the next `horizon` days per product, feeding each day's
+    prediction back in as the next day's lag feature.
+    """
+    current = artifacts.current
+    if current is None or fs is None:
+        return {"error": "Model or Feature Store connection not initialized."}
+
+    generation = cache_generation(current)
+    key = cache_key("forecast", horizon)
+    hit = await cached_response(generation, key)
+    if hit is not None:
+        return hit
+
+    try:
+        with executor.admit():
+            data = await run_in_threadpool(recent_data)
+
+            if data.empty:
+                return {"error": "No data retrieved from Feature Store."}
+
+            return await store_response(generation, key,
+                                        FastJSONResponse(await executor.run(current, forecast_payload, data, horizon)))
+
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        logger.exception("Forecast failed.")
+        return {"error": str(e)}
+
+
+@app.get("/forecasts/{product_name}", tags=["Prediction"])
+async def stored_forecast(product_name: str, horizon: Optional[int] = Query(None, ge=1, le=MAX_HORIZON)):
+    """Precomputed forecast of a single product."""
+    return await stored_forecasts(ProductsRequest(products=[product_name]), horizon=horizon)
+
+
+@app.post("/forecasts", tags=["Prediction"])
+async def stored_forecasts(request: ProductsRequest, horizon: Optional[int] = Query(None, ge=1, le=MAX_HORIZON)):
+    """
+    Forecasts of the requested products from the nightly batch scoring
+    store, grouped by product_name. Nothing is scored on request; products
+    missing from the store are left out (404 if all are).
+    """
+    if not forecast_store.exists():
+        return JSONResponse(status_code=503, content={"error": "No forecast store; run python -m src.batch_scoring."})
+
+    try:
+        result = await run_in_threadpool(forecast_store.lookup, request.products, horizon)
+
+        if not result:
+            return JSONResponse(status_code=404, content={"error": "No stored forecasts for the requested products."})
+
+        return FastJSONResponse(result)
+
+    except Exception as e:
+        logger.exception("Forecast store lookup failed.")
+        return {"error": str(e)}
+
+
 if __name__ == "__main__":
     uvicorn.run("src.app:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,91 @@
+# src/artifacts.py
+"""
+Everything a request needs from the model side, loaded once and held as an
+immutable snapshot. Reloads build a complete new snapshot and swap it in
+with one reference assignment, so a request never sees a mix of versions.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from src.featurengineering import raw_columns
+from src.model_utils import load_bundle, load_legacy_model, load_legacy_scaler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ServingArtifacts:
+    """Model, preprocessing and metadata of one served version"""
+    model: Any
+    scaler: Any
+    feature_names: Optional[tuple] = None
+    metrics: dict = field(default_factory=dict)
+    version: Optional[str] = None
+    quantile_model: Any = None
+    segment_model: Any = None
+    loaded_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def from_bundle(cls, bundle: dict) -> "ServingArtifacts":
+        feature_names = bundle.get("feature_names")
+        return cls(
+            model=bundle["model"],
+            scaler=bundle["scaler"],
+            feature_names=tuple(feature_names) if feature_names else None,
+            metrics=dict(bundle.get("metrics") or {}),
+            version=bundle.get("version"),
+            quantile_model=bundle.get("quantile_model"),
+            segment_model=bundle.get("segment_model"),
+        )
+
+    def read_columns(self) -> Optional[list]:
+        """Feature group columns this version needs, None (read all) without a schema"""
+        if not self.feature_names:
+            return None
+        extra = (self.segment_model.column,) if self.segment_model is not None else ()
+        return raw_columns(self.feature_names, extra)
+
+
+def load_artifacts(bundle_dir: str = None) -> ServingArtifacts:
+    """Load the registry bundle, falling back to the legacy pickles"""
+    try:
+        return ServingArtifacts.from_bundle(load_bundle(bundle_dir))
+    except FileNotFoundError:
+        if bundle_dir is not None:
+            raise
+        # Nothing promoted to production yet: the bundle lookup already
+        # failed once, so go straight to the legacy pickles
+        return ServingArtifacts(model=load_legacy_model(), scaler=load_legacy_scaler())
+
+
+class ArtifactHolder:
+    """
+    Current ServingArtifacts; read with .current, replace with swap()
+
+    Readers should take .current once per request and use that snapshot
+    throughout.
+    """
+
+    def __init__(self, artifacts: Optional[ServingArtifacts] = None):
+        self._current = artifacts
+        self._swap_lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[ServingArtifacts]:
+        return self._current
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    def swap(self, artifacts: ServingArtifacts) -> Optional[ServingArtifacts]:
+        """Install a fully loaded snapshot and return the previous one"""
+        with self._swap_lock:
+            previous, self._current = self._current, artifacts
+        logger.info(f"Serving model {artifacts.version or '(legacy pickle)'}"
+                    f" (was {previous.version if previous else None})")
+        return previous
@@ -0,0 +1,259 @@
+# src/batch_scoring.py
+"""
+Nightly batch scoring: forecast every product for the upcoming horizon and
+write the results to an indexed SQLite file the API serves lookups from.
+
+Products are scored in chunks across worker processes; each finished chunk
+is appended to a new database that replaces the live one atomically, so
+readers never see a partial run.
+
+Usage:
+    python -m src.batch_scoring --horizon 30 --workers 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.artifacts import load_artifacts
+from src.horizon import forecast_horizon
+from src.model_utils import resolve_bundle
+
+logger = logging.getLogger(__name__)
+
+FORECAST_STORE_PATH = os.getenv(
+    "FORECAST_STORE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../forecast_store.sqlite"))
+)
+# SQLite's default limit on bound parameters per statement is 999
+_MAX_PARAMS = 900
+
+# Artifacts of a scoring worker process, loaded once by _init_worker
+_worker_artifacts = None
+
+
+def _init_worker(bundle_dir):
+    global _worker_artifacts
+    _worker_artifacts = load_artifacts(bundle_dir)
+
+
+def _score_chunk(rows: pd.DataFrame, horizon: int, origin=None) -> pd.DataFrame:
+    artifacts = _worker_artifacts
+    return forecast_horizon(
+        artifacts.model, artifacts.scaler, rows, horizon=horizon,
+        feature_names=artifacts.feature_names, quantile_model=artifacts.quantile_model,
+        segment_model=artifacts.segment_model, origin=origin,
+    )
+
+
+def product_chunks(data: pd.DataFrame, chunk_products: int):
+    """Split rows into frames of at most chunk_products whole products"""
+    data = data.sort_values(["product_name", "created_at"], kind="stable")
+    # marketplace_code is the category code, so the categories are fixed
+    # over all rows: every chunk then encodes a marketplace the same way
+    if not isinstance(data["marketplace_name"].dtype, pd.CategoricalDtype):
+        categories = sorted(data["marketplace_name"].dropna().unique())
+        data = data.assign(marketplace_name=pd.Categorical(data["marketplace_name"], categories=categories))
+    products = data["product_name"].to_numpy()
+    if not len(products):
+        return
+    starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])
+    bounds = np.r_[starts[::chunk_products], len(products)]
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        yield data.iloc[start:stop]
+
+
+def _create_tables(conn, value_columns):
+    values = ", ".join(f'"{name}" REAL' for name in value_columns)
+    conn.execute(
+        f"CREATE TABLE forecasts (product_name TEXT NOT NULL, step INTEGER NOT NULL, "
+        f"forecast_date TEXT NOT NULL, {values}, PRIMARY KEY (product_name, step)) WITHOUT ROWID"
+    )
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def _insert(conn, forecasts: pd.DataFrame, value_columns):
+    columns = ["product_name", "step", "forecast_date"] + list(value_columns)
+    frame = forecasts[columns].copy()
+    frame["product_name"] = frame["product_name"].astype(str)
+    frame["forecast_date"] = pd.to_datetime(frame["forecast_date"]).dt.strftime("%Y-%m-%dT%H:%M:%S")
+    placeholders = ", ".join("?" * len(columns))
+    conn.executemany(
+        f"INSERT INTO forecasts VALUES ({placeholders})",
+        frame.astype(object).itertuples(index=False, name=None)
+    )
+
+
+def run_batch_scoring(data: pd.DataFrame, horizon: int = 30, out_path: str = FORECAST_STORE_PATH,
+                      bundle_dir: str = None, workers: int = None, chunk_products: int = 1000) -> dict:
+    """
+    Forecast every product in data and publish the store at out_path
+
+    Args:
+        data: Recent raw rows per product (as read for /forecast)
+        horizon: Days ahead stored per product
+        out_path: SQLite file to (re)place
+        bundle_dir: Model bundle to score with; the served one by default
+        workers: Scoring processes, 1 scores in this process
+        chunk_products: Products per scoring task
+
+    Returns:
+        Dictionary with the run's metadata (also stored in the meta table)
+    """
+    start = time.perf_counter()
+    if bundle_dir is None:
+        # Pin the served version now so every worker scores with the same one
+        try:
+            bundle_dir = resolve_bundle()
+        except FileNotFoundError:
+            pass
+    artifacts = load_artifacts(bundle_dir)
+    workers = workers or min(8, os.cpu_count() or 1)
+    labels = artifacts.quantile_model.labels if artifacts.quantile_model is not None else ()
+    value_columns = ["predicted_sales"] + [f"predicted_{label}" for label in labels]
+
+    tmp_path = f"{out_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    chunks = list(product_chunks(data, chunk_products))
+    # One forecast origin for the whole run, not per chunk
+    origin = pd.to_datetime(data["created_at"]).max()
+    n_rows = 0
+    published = False
+    conn = sqlite3.connect(tmp_path)
+    try:
+        try:
+            # The file only goes live after a complete run, so durability is not needed while building it
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            _create_tables(conn, value_columns)
+
+            if workers == 1:
+                global _worker_artifacts
+                _worker_artifacts = artifacts
+                results = (_score_chunk(rows, horizon, origin) for rows in chunks)
+                for forecasts in results:
+                    _insert(conn, forecasts, value_columns)
+                    n_rows += len(forecasts)
+            else:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(bundle_dir,)) as pool:
+                    futures = [pool.submit(_score_chunk, rows, horizon, origin) for rows in chunks]
+                    for i, future in enumerate(as_completed(futures), 1):
+                        forecasts = future.result()
+                        _insert(conn, forecasts, value_columns)
+                        n_rows += len(forecasts)
+                        logger.info(f"Scored chunk {i}/{len(futures)}")
+
+            meta = {
+                "model_version": artifacts.version,
+                "horizon": horizon,
+                "products": int(data["product_name"].nunique()),
+                "rows": n_rows,
+                "data_watermark": str(origin),
+                "scored_at": datetime.now().isoformat(timespec="seconds"),
+                "value_columns": ",".join(value_columns),
+            }
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, out_path)
+        published = True
+    finally:
+        # A failed run must not leave its partial store behind
+        if not published and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    meta["seconds"] = round(time.perf_counter() - start, 2)
+    logger.info(f"Forecast store written to {out_path}: {meta}")
+    return meta
+
+
+class ForecastStore:
+    """
+    Read side of the batch scoring output
+
+    Connections are per thread and reopened when the nightly job replaces
+    the file, so lookups always read one complete run.
+    """
+
+    def __init__(self, path: str = FORECAST_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        stat = os.stat(self.path)
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        local = self._local
+        if getattr(local, "identity", None) != identity:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            local.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            local.identity = identity
+        return local.conn
+
+    def meta(self) -> dict:
+        return dict(self._connection().execute("SELECT key, value FROM meta").fetchall())
+
+    def lookup(self, product_names, max_step: int = None) -> dict:
+        """
+        Stored forecasts of the given products, grouped by product_name;
+        unknown products are left out
+
+        Args:
+            product_names: Products to look up
+            max_step: Only return steps up to this many days ahead
+        """
+        conn = self._connection()
+        names = list(dict.fromkeys(product_names))
+        result = {}
+        for i in range(0, len(names), _MAX_PARAMS):
+            part = names[i:i + _MAX_PARAMS]
+            sql = f"SELECT * FROM forecasts WHERE product_name IN ({', '.join('?' * len(part))})"
+            params = list(part)
+            if max_step is not None:
+                sql += " AND step <= ?"
+                params.append(max_step)
+            cursor = conn.execute(sql + " ORDER BY product_name, step", params)
+            columns = [d[0] for d in cursor.description]
+            for row in cursor:
+                record = dict(zip(columns, row))
+                result.setdefault(record.pop("product_name"), []).append(record)
+        return result
+
+
+def main():
+    from src.hopsworks_utils import get_recent_data, init_hopsworks
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--days", type=int, default=25, help="recent rows fetched per product")
+    parser.add_argument("--out", default=FORECAST_STORE_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-products", type=int, default=1000)
+    args = parser.parse_args()
+
+    artifacts = load_artifacts()
+    columns = artifacts.read_columns()
+    data = get_recent_data(fs=init_hopsworks(), feature_group_name="sales_record", version=1,
+                           days=args.days, columns=columns)
+    run_batch_scoring(data, horizon=args.horizon, out_path=args.out,
+                      workers=args.workers, chunk_products=args.chunk_products)
+
+
+if __name__ == "__main__":
+    main()
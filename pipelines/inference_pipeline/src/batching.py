@@ -0,0 +1,133 @@
+# src/batching.py
+"""
+Micro-batching of concurrent scoring calls. Requests that arrive within
+max_wait_ms of each other (up to max_batch_size rows) are stacked into one
+feature matrix, scored with a single vectorized predict and the result
+rows are handed back to each caller.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("artifacts", "X", "future", "enqueued")
+
+    def __init__(self, artifacts, X, future):
+        self.artifacts = artifacts
+        self.X = X
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Collects submit() calls on the event loop and scores them in batches
+
+    Requests are only batched with others on the same artifacts snapshot,
+    so a model swap never mixes versions within a batch.
+
+    Attributes:
+        run_batch: async fn(artifacts, X) -> array with one row per row of X
+        max_batch_size: Stop collecting once this many rows are queued
+        max_wait_ms: Longest the first request of a batch waits for company
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = 50_000, max_wait_ms: float = 2.0,
+                 window: int = 1024):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = None
+        self._dispatcher = None
+        self._running = set()
+        # Counters and the last `window` batch sizes / queue waits for stats()
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self._batch_sizes = deque(maxlen=window)
+        self._waits_ms = deque(maxlen=window)
+
+    async def submit(self, artifacts, X: np.ndarray) -> np.ndarray:
+        """Score X as part of the next batch; returns the rows for X only"""
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = asyncio.Queue()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        pending = _Pending(artifacts, X, asyncio.get_running_loop().create_future())
+        self._queue.put_nowait(pending)
+        return await pending.future
+
+    async def _collect(self) -> list:
+        first = await self._queue.get()
+        batch, rows = [first], len(first.X)
+        deadline = first.enqueued + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item.X)
+        # Whatever else is already queued rides along without waiting
+        while rows < self.max_batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            batch.append(item)
+            rows += len(item.X)
+        return batch
+
+    async def _dispatch(self):
+        while True:
+            batch = await self._collect()
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item.artifacts), []).append(item)
+            for group in groups.values():
+                # Run batches concurrently; the executor bounds the actual work
+                task = asyncio.get_running_loop().create_task(self._score(group))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _score(self, group: list):
+        started = time.perf_counter()
+        X = group[0].X if len(group) == 1 else np.concatenate([item.X for item in group])
+        self.batches += 1
+        self.requests += len(group)
+        self.rows += len(X)
+        self._batch_sizes.append(len(group))
+        self._waits_ms.extend((started - item.enqueued) * 1000 for item in group)
+        try:
+            scores = await self.run_batch(group[0].artifacts, X)
+        except Exception as e:
+            for item in group:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        stops = np.cumsum([len(item.X) for item in group])
+        for item, part in zip(group, np.split(scores, stops[:-1])):
+            if not item.future.done():
+                item.future.set_result(part)
+
+    def stats(self) -> dict:
+        sizes = np.asarray(self._batch_sizes, dtype=np.float64)
+        waits = np.asarray(self._waits_ms, dtype=np.float64)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "requests": self.requests,
+            "rows": self.rows,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_requests_mean": round(float(sizes.mean()), 2) if len(sizes) else None,
+            "batch_requests_max": int(sizes.max()) if len(sizes) else None,
+            "queue_wait_ms_p50": round(float(np.percentile(waits, 50)), 3) if len(waits) else None,
+            "queue_wait_ms_p99": round(float(np.percentile(waits, 99)), 3) if len(waits) else None,
+        }
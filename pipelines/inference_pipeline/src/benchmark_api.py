@@ -0,0 +1,72 @@
+# src/benchmark_api.py
+"""
+Latency percentiles of a running API under concurrent load.
+
+Usage:
+    python -m src.benchmark_api --url http://localhost:8000/predict --requests 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+
+async def _worker(client, url, queue, latencies, statuses):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.get(url)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(url: str, n_requests: int, concurrency: int, timeout: float = 60.0) -> dict:
+    """Fire n_requests GETs with `concurrency` in flight; latencies cover 200s only"""
+    queue = asyncio.Queue()
+    for i in range(n_requests):
+        queue.put_nowait(i)
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        await asyncio.gather(*(
+            _worker(client, url, queue, latencies, statuses) for _ in range(concurrency)
+        ))
+    elapsed = time.perf_counter() - start
+    result = {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(n_requests / elapsed, 1),
+        "statuses": dict(statuses),
+    }
+    if latencies:
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        result.update({"p50_ms": round(p50, 1), "p90_ms": round(p90, 1), "p99_ms": round(p99, 1)})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000/predict")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        print(asyncio.run(run_load(args.url, args.requests, concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# src/benchmark_predict.py
+"""
+Latency of FlatForest.predict vs the stock LightGBM paths across batch sizes.
+
+Usage:
+    python -m src.benchmark_predict                 # synthetic model
+    python -m src.benchmark_predict --bundle        # current registry bundle
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.tree_evaluator import FlatForest
+
+
+def _time_call(fn, X, repeats):
+    fn(X)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def benchmark(model, n_features, batch_sizes, repeats=20, seed=0) -> list:
+    """Per-call latency in ms for each batch size, plus the max abs difference"""
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    forest = FlatForest.from_booster(booster)
+    rng = np.random.default_rng(seed)
+    rows = []
+    for batch_size in batch_sizes:
+        X = rng.normal(size=(batch_size, n_features))
+        X[rng.random(X.shape) < 0.01] = np.nan
+        row = {
+            "batch_size": batch_size,
+            "numpy_ms": _time_call(forest.predict, X, repeats),
+            "booster_ms": _time_call(booster.predict, X, repeats),
+            "max_abs_diff": float(np.max(np.abs(forest.predict(X) - booster.predict(X)))),
+        }
+        if hasattr(model, "booster_"):
+            row["sklearn_ms"] = _time_call(model.predict, X, repeats)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bundle", action="store_true", help="benchmark the registry's current bundle")
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.bundle:
+        from src.model_utils import load_bundle
+        bundle = load_bundle()
+        model, n_features = bundle["model"], len(bundle["feature_names"])
+    else:
+        from lightgbm import LGBMRegressor
+        rng = np.random.default_rng(42)
+        X = rng.normal(size=(20_000, args.features))
+        y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=len(X))
+        model = LGBMRegressor(n_estimators=args.trees, num_leaves=31, verbose=-1).fit(X, y)
+        n_features = args.features
+
+    print(f"{'batch':>7} {'numpy ms':>10} {'booster ms':>11} {'sklearn ms':>11} {'max diff':>10}")
+    for row in benchmark(model, n_features, args.batch_sizes, args.repeats):
+        sklearn_ms = f"{row['sklearn_ms']:.3f}" if "sklearn_ms" in row else "-"
+        print(
+            f"{row['batch_size']:>7} {row['numpy_ms']:>10.3f} {row['booster_ms']:>11.3f} "
+            f"{sklearn_ms:>11} {row['max_abs_diff']:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# src/benchmark_recent_data.py
+"""
+Cost of picking each product's latest rows from a multi-year history.
+
+Compares the old full sort + groupby head against latest_rows_per_product,
+and shows how much a created_at pushdown and column projection shrink the
+frame that has to be read at all.
+
+Usage:
+    python -m src.benchmark_recent_data --products 5000 --years 3 --days 25
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.hopsworks_utils import latest_rows_per_product
+
+
+def synthetic_history(n_products: int, years: int, extra_columns: int = 8, seed: int = 0) -> pd.DataFrame:
+    """One row per product per day, shuffled like an unordered feature group read"""
+    rng = np.random.default_rng(seed)
+    days = 365 * years
+    n = n_products * days
+    df = pd.DataFrame({
+        "order_id": np.arange(n),
+        "created_at": np.tile(pd.date_range("2020-01-01", periods=days).values, n_products),
+        "product_name": np.repeat([f"product-{i}" for i in range(n_products)], days),
+        "marketplace_name": rng.choice(["amazon", "ebay", "shop"], n),
+        "sub_total": rng.gamma(2.0, 10.0, n),
+    })
+    for i in range(extra_columns):
+        df[f"unused_{i}"] = rng.normal(size=n)
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--days", type=int, default=25, help="rows kept per product")
+    parser.add_argument("--lookback-days", type=int, default=60)
+    args = parser.parse_args()
+
+    df = synthetic_history(args.products, args.years)
+    print(f"History: {len(df):,} rows, {df.memory_usage(deep=True).sum() / 1e6:,.0f} MB")
+
+    old, old_s = _timed(
+        lambda: df.sort_values("created_at", ascending=False).groupby("product_name").head(args.days)
+    )
+    new, new_s = _timed(lambda: latest_rows_per_product(df, args.days))
+    assert set(old.index) == set(new.index)
+    print(f"sort + groupby.head:      {old_s:7.3f}s")
+    print(f"latest_rows_per_product:  {new_s:7.3f}s")
+
+    # What the feature store would return with the filter and projection pushed down
+    since = df["created_at"].max() - pd.Timedelta(days=args.lookback_days)
+    columns = ["order_id", "created_at", "product_name", "marketplace_name", "sub_total"]
+    pushed = df.loc[df["created_at"] > since, columns]
+    print(f"Pushed down ({args.lookback_days}d, {len(columns)} columns): {len(pushed):,} rows, "
+          f"{pushed.memory_usage(deep=True).sum() / 1e6:,.0f} MB")
+    _, pushed_s = _timed(lambda: latest_rows_per_product(pushed, args.days))
+    print(f"latest_rows_per_product on pushed-down rows: {pushed_s:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
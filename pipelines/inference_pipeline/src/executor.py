@@ -0,0 +1,128 @@
+# src/executor.py
+"""
+Bounded executor for prediction work, so the event loop stays free and
+overload is answered with 429 instead of an ever-growing queue.
+
+"thread" runs jobs in a thread pool on the served ServingArtifacts.
+"process" runs them in worker processes that load the model once at start
+and reload only when the served version changes.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.artifacts import load_artifacts
+from src.model_utils import resolve_bundle
+
+logger = logging.getLogger(__name__)
+
+# Per-process artifacts of a process-pool worker, and the served version
+# they were loaded for (what the parent asks for, not what got loaded:
+# a None version may load a registry bundle, which must not reload per job)
+_worker_artifacts = None
+_worker_version = None
+
+# Set while a request holds an admission slot (see PredictionExecutor.admit)
+_admitted = contextvars.ContextVar("admitted", default=False)
+
+
+def _init_worker():
+    global _worker_artifacts, _worker_version
+    _worker_artifacts = load_artifacts()
+    _worker_version = _worker_artifacts.version
+
+
+def _run_in_worker(version, fn, args):
+    """Call fn(artifacts, *args) with this worker's artifacts at `version`"""
+    global _worker_artifacts, _worker_version
+    if _worker_artifacts is None or _worker_version != version:
+        _worker_artifacts = load_artifacts(resolve_bundle(version=version) if version else None)
+        _worker_version = version
+    return fn(_worker_artifacts, *args)
+
+
+class Overloaded(Exception):
+    """Raised when the executor already holds max_pending jobs"""
+
+
+class PredictionExecutor:
+    """
+    Runs fn(artifacts, *args) off the event loop with bounded admission
+
+    Attributes:
+        kind: "thread" or "process"
+        max_workers: Jobs running at once
+        max_pending: Jobs running or queued before new ones are rejected
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_pending: int = 16):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self.rejected = 0
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="predict")
+
+    @contextlib.contextmanager
+    def admit(self):
+        """
+        Hold one admission slot for the enclosed block, so a request is
+        rejected before it reads any features; run() calls inside the block
+        use this slot instead of taking their own
+
+        Raises:
+            Overloaded: max_pending jobs are already admitted
+        """
+        if _admitted.get():
+            yield
+            return
+        # Admission is decided on the event loop thread, so a plain counter is safe
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.pending} prediction jobs pending")
+        self.pending += 1
+        token = _admitted.set(True)
+        try:
+            yield
+        finally:
+            _admitted.reset(token)
+            self.pending -= 1
+
+    async def run(self, artifacts, fn, *args):
+        """
+        Run fn with the given artifacts snapshot (in a process pool, each
+        worker's own copy of the same version)
+
+        Raises:
+            Overloaded: max_pending jobs are already admitted
+        """
+        with self.admit():
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                return await loop.run_in_executor(self._pool, _run_in_worker, artifacts.version, fn, args)
+            return await loop.run_in_executor(self._pool, fn, artifacts, *args)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
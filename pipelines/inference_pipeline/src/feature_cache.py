@@ -0,0 +1,215 @@
+# src/feature_cache.py
+"""
+In-process cache of each product's most recent rows, so /predict does not
+read the whole feature group per request. A background timer pulls only
+the rows newer than the cache watermark and merges them in.
+"""
+
+import itertools
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.hopsworks_utils import read_rows_since
+
+logger = logging.getLogger(__name__)
+
+_CATEGORICAL = ("product_name", "marketplace_name", "category", "sub_category", "sub_sub_category")
+# Feature group primary key, used to drop rows a refresh reads twice
+_ROW_KEY = ["product_name", "order_id"]
+_revisions = itertools.count(1)
+
+
+def _unify_categories(*frames: pd.DataFrame) -> list:
+    """
+    Give each categorical column of the first frame one shared, sorted
+    category set across all frames, so concat keeps it categorical
+    """
+    frames = [frame.copy() for frame in frames]
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        parts = [frame[col] if isinstance(frame[col].dtype, pd.CategoricalDtype)
+                 else frame[col].astype("category") for frame in frames]
+        dtype = pd.CategoricalDtype(union_categoricals(parts, sort_categories=True).categories)
+        for frame in frames:
+            frame[col] = frame[col].astype(dtype)
+    return frames
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical strings and downcast integers; floats stay float64"""
+    df = df.copy()
+    df["created_at"] = pd.to_datetime(df["created_at"])
+    for col in df.columns:
+        if col in _CATEGORICAL or df[col].dtype == object:
+            df[col] = df[col].astype("category")
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+class FeatureWindow:
+    """
+    Immutable snapshot: the last `days` rows per product, sorted by product
+    then time, with the row range of every product
+
+    Attributes:
+        frame: Cached rows
+        offsets: Dictionary of {product_name: (start, stop)} into frame
+        products: Sorted product names, for cursor pagination
+        watermark: Newest created_at in the cache
+        revision: Increases with every window built, so it changes whenever
+            the rows do, including late rows that leave the watermark put
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.revision = next(_revisions)
+        products = frame["product_name"].to_numpy()
+        if len(products):
+            starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])
+            stops = np.r_[starts[1:], len(products)]
+            self.offsets = dict(zip(products[starts], zip(starts.tolist(), stops.tolist())))
+            self.watermark = frame["created_at"].max()
+        else:
+            self.offsets = {}
+            self.watermark = None
+        self.products = np.asarray(sorted(self.offsets), dtype=object)
+
+    @classmethod
+    def build(cls, rows: pd.DataFrame, days: int) -> "FeatureWindow":
+        rows = rows.sort_values(["product_name", "created_at"], kind="stable")
+        rows = rows.groupby("product_name", observed=True, sort=False).tail(days)
+        return cls(rows.reset_index(drop=True))
+
+    def rows(self, product_name: str) -> pd.DataFrame:
+        start, stop = self.offsets[product_name]
+        return self.frame.iloc[start:stop]
+
+    def rows_for(self, product_names) -> pd.DataFrame:
+        """
+        Rows of the given products, in the frame's product/time order;
+        unknown products are skipped. Cost depends only on the rows returned.
+        """
+        ranges = sorted({self.offsets[name] for name in product_names if name in self.offsets})
+        if not ranges:
+            return self.frame.iloc[:0]
+        index = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+        return self.frame.iloc[index]
+
+
+class FeatureCache:
+    """
+    Keeps a FeatureWindow fresh from the feature group
+
+    Readers take the current snapshot() and use it as-is; refreshes build
+    a new window and replace the reference in one assignment.
+
+    Attributes:
+        days: Rows kept per product (same meaning as get_recent_data's days)
+        refresh_interval: Seconds between incremental refreshes
+        columns: Feature group columns to read, None for all, or a callable
+            returning them, evaluated on every load and refresh so the
+            projection follows the serving model
+        lookback_days: Initial load reads only this many days back, 0 for all
+        overlap: Seconds before the watermark each refresh re-reads, so rows
+            committed late with an older created_at are still picked up
+    """
+
+    def __init__(self, fs, feature_group_name: str, version: int = 1, days: int = 25,
+                 refresh_interval: float = 60.0, columns=None, lookback_days: int = 0,
+                 overlap: float = 600.0):
+        self.fs = fs
+        self.feature_group_name = feature_group_name
+        self.version = version
+        self.days = days
+        self.refresh_interval = refresh_interval
+        self.columns = columns
+        self.lookback_days = lookback_days
+        self.overlap = overlap
+        self._window = None
+        self._loaded_columns = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self) -> FeatureWindow:
+        return self._window
+
+    def _columns(self):
+        return self.columns() if callable(self.columns) else self.columns
+
+    def load(self) -> FeatureWindow:
+        """Initial read (projected, and bounded by lookback_days if set)"""
+        since = pd.Timestamp.now() - pd.Timedelta(days=self.lookback_days) if self.lookback_days else None
+        columns = self._columns()
+        rows = read_rows_since(self.fs, self.feature_group_name, self.version, since=since, columns=columns)
+        self._window = FeatureWindow.build(_compact(rows), self.days)
+        self._loaded_columns = None if columns is None else set(columns)
+        logger.info(f"Feature cache loaded: {len(self._window.frame)} rows, "
+                    f"{len(self._window.offsets)} products, watermark {self._window.watermark}")
+        return self._window
+
+    def refresh(self) -> int:
+        """
+        Merge rows created after watermark - overlap; rows already cached
+        are dropped by primary key and only products with new rows are
+        re-windowed. A model that needs columns the cache was not loaded
+        with triggers a full reload instead.
+
+        Returns:
+            Number of new rows
+        """
+        with self._lock:
+            window = self._window
+            columns = self._columns()
+            widened = self._loaded_columns is not None and (
+                columns is None or not set(columns) <= self._loaded_columns
+            )
+            if window is None or window.watermark is None or widened:
+                return len(self.load().frame)
+            since = window.watermark - pd.Timedelta(seconds=self.overlap)
+            fresh = read_rows_since(self.fs, self.feature_group_name, self.version,
+                                    since=since, columns=columns)
+            if fresh.empty:
+                return 0
+
+            old, fresh = _unify_categories(window.frame, _compact(fresh))
+            is_touched = old["product_name"].isin(fresh["product_name"].unique()).to_numpy()
+            key = [col for col in _ROW_KEY if col in fresh.columns]
+            combined = pd.concat([old[is_touched], fresh], ignore_index=True)
+            # The overlap re-reads cached rows; the freshly read copy wins
+            combined = combined.drop_duplicates(subset=key if len(key) == len(_ROW_KEY) else None,
+                                                keep="last")
+            n_new = len(combined) - int(is_touched.sum())
+            if n_new <= 0:
+                return 0
+
+            updated = FeatureWindow.build(combined, self.days).frame
+            merged = pd.concat([old[~is_touched], updated], ignore_index=True)
+            self._window = FeatureWindow(
+                merged.sort_values(["product_name", "created_at"], kind="stable").reset_index(drop=True)
+            )
+            logger.info(f"Feature cache refreshed: {n_new} new rows for "
+                        f"{updated['product_name'].nunique()} products")
+            return n_new
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Feature cache refresh failed, serving watermark "
+                             f"{self._window.watermark if self._window else None}: {e}")
+
+    def start(self) -> "FeatureCache":
+        self._thread = threading.Thread(target=self._run, name="feature-cache", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
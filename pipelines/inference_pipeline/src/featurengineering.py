@@ -1,6 +1,24 @@
 
 import pandas as pd
 
+# Features computed here rather than read from the feature group
+DERIVED_FEATURES = ("day_of_week", "hour", "week_of_year", "product_length", "marketplace_code", "prev_day_sales")
+# Raw columns engineer_features_for_inference and the API always need
+BASE_COLUMNS = ("order_id", "created_at", "product_name", "marketplace_name", "sub_total")
+
+
+def raw_columns(feature_names, extra=()) -> list:
+    """
+    Feature group columns needed to build the given model features, plus
+    extra raw columns (e.g. a segment label)
+    """
+    columns = list(BASE_COLUMNS)
+    for name in list(feature_names) + list(extra):
+        if name not in DERIVED_FEATURES and name not in columns:
+            columns.append(name)
+    return columns
+
+
 def engineer_features_for_inference(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df["created_at"] = pd.to_datetime(df["created_at"])
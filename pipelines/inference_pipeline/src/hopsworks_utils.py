@@ -1,8 +1,11 @@
-import hopsworks
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
-from hsfs.feature_view import FeatureView
-from hsfs.feature_group import FeatureGroup
 from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from hsfs.feature_group import FeatureGroup
 load_dotenv()
 import os
 hopsworks_api_key = os.getenv("HOPSWORKS_API_KEY")
@@ -10,15 +13,80 @@ hopsworks_project_name = os.getenv("HOPSWORKS_PROJECT_NAME")
 
 
 def init_hopsworks():
+    # Imported here so the frame helpers below work without the client installed
+    import hopsworks
+
     project = hopsworks.login()  
     fs = project.get_feature_store()
     return fs
 
 
-def get_recent_data(fs, feature_group_name="sales-record", version=1, days=25):
-    fg: FeatureGroup = fs.get_feature_group(feature_group_name, version)
-    query_df = fg.select_all().read()
+def _select(fg, columns=None, since=None):
+    """Query with column projection and a created_at lower bound pushed down"""
+    query = fg.select(list(columns)) if columns else fg.select_all()
+    if since is not None:
+        query = query.filter(fg.get_feature("created_at") > since)
+    return query
+
+
+def latest_rows_per_product(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    """
+    The n newest rows of every product without sorting the whole frame
+
+    Each product's candidates are first narrowed to a time window sized
+    from its own row spacing (widened only for products that fall short),
+    so only the small candidate set is sorted.
+    """
+    if df.empty:
+        return df
+    codes, uniques = pd.factorize(df["product_name"], sort=False)
+    # Epoch integers; also valid for tz-aware columns, whose to_numpy() is object
+    ts = df["created_at"].array.asi8
+    n_products = len(uniques)
+
+    newest = np.full(n_products, np.iinfo(np.int64).min)
+    oldest = np.full(n_products, np.iinfo(np.int64).max)
+    np.maximum.at(newest, codes, ts)
+    np.minimum.at(oldest, codes, ts)
+    counts = np.bincount(codes, minlength=n_products)
+    wanted = np.minimum(counts, n)
+
+    # Start from 1.5x the window n evenly spaced rows would need
+    window = (newest - oldest) / np.maximum(counts - 1, 1) * n * 1.5 + 1
+    while True:
+        candidates = np.flatnonzero(ts >= newest[codes] - window[codes])
+        short = np.bincount(codes[candidates], minlength=n_products) < wanted
+        if not short.any():
+            break
+        window[short] *= 2
+
+    order = candidates[np.lexsort((-ts[candidates], codes[candidates]))]
+    group = codes[order]
+    first = np.r_[0, np.flatnonzero(np.diff(group)) + 1]
+    rank = np.arange(len(order)) - np.repeat(first, np.diff(np.r_[first, len(order)]))
+    return df.iloc[np.sort(order[rank < n])]
+
+
+def get_recent_data(fs, feature_group_name="sales-record", version=1, days=25, columns=None, since=None):
+    """
+    Last `days` rows per product
+
+    Args:
+        columns: Columns to read (projection pushed to the feature store);
+            None reads all
+        since: Only rows with created_at after this are read (filter pushed
+            to the feature store); None reads the full history
+    """
+    fg: "FeatureGroup" = fs.get_feature_group(feature_group_name, version)
+    query_df = _select(fg, columns, since).read()
 
     query_df["created_at"] = pd.to_datetime(query_df["created_at"])
-    recent_df = query_df.sort_values("created_at", ascending=False).groupby("product_name").head(days)
-    return recent_df
+    return latest_rows_per_product(query_df, days)
+
+
+def read_rows_since(fs, feature_group_name="sales-record", version=1, since=None, columns=None):
+    """All rows of the feature group, or only those with created_at > since"""
+    fg: "FeatureGroup" = fs.get_feature_group(feature_group_name, version)
+    rows = _select(fg, columns, since).read()
+    rows["created_at"] = pd.to_datetime(rows["created_at"])
+    return rows
@@ -0,0 +1,164 @@
+# src/horizon.py
+"""
+Multi-step forecasts: every product is rolled forward one day at a time,
+feeding each step's prediction back in as the next step's prev_day_sales.
+All products advance together from one forecast origin, so a horizon of H
+days is H predict calls and step s is the same date for every product.
+
+Usage:
+    python -m src.horizon --horizon 30 --out forecasts.parquet
+"""
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.featurengineering import engineer_features_for_inference
+
+logger = logging.getLogger(__name__)
+
+MAX_HORIZON = 90
+
+
+def _scale(scaler, X: np.ndarray, feature_names) -> np.ndarray:
+    """Apply the training scaler to a raw feature array"""
+    if isinstance(scaler, StandardScaler):
+        out = X.copy()
+        if getattr(scaler, "mean_", None) is not None:
+            out -= scaler.mean_
+        if getattr(scaler, "scale_", None) is not None:
+            out /= scaler.scale_
+        return out
+    return scaler.transform(pd.DataFrame(X, columns=feature_names))
+
+
+def forecast_horizon(model, scaler, raw_df: pd.DataFrame, horizon: int = 30, feature_names=None,
+                     quantile_model=None, segment_model=None, origin=None) -> pd.DataFrame:
+    """
+    Forecast the next `horizon` days for every product in raw_df
+
+    Step s forecasts origin + s days for every product. Calendar features
+    follow that date, prev_day_sales is the previous step's prediction (the
+    product's last actual sales for step 1, however old) and all other
+    features keep the product's latest observed values.
+
+    Args:
+        model: Fitted model with predict(X)
+        scaler: Training scaler
+        raw_df: Recent rows with product_name, created_at and sub_total
+        horizon: Days ahead, 1..MAX_HORIZON
+        feature_names: Feature column order; defaults to the scaler's
+        quantile_model: Optional QuantileModel for interval columns
+        segment_model: Optional SegmentRoutedModel; products of segments
+            with a local model are forecast by it instead of model
+        origin: Forecast origin, normalised to midnight; defaults to the
+            newest created_at in raw_df (the feature watermark)
+
+    Returns:
+        Long frame with product_name, step, forecast_date, predicted_sales
+        (and predicted_pXX columns with a quantile model)
+    """
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {MAX_HORIZON}")
+
+    raw = raw_df.reset_index(drop=True)
+    raw["created_at"] = pd.to_datetime(raw["created_at"])
+    features = engineer_features_for_inference(raw)
+    if feature_names is None:
+        feature_names = list(getattr(scaler, "feature_names_in_", features.columns))
+    feature_names = list(feature_names)
+
+    # Latest row per product is the starting state of the recursion
+    last = raw.sort_values("created_at", kind="stable").groupby("product_name").tail(1)
+    X = features.loc[last.index, feature_names].to_numpy(dtype=np.float64)
+    products = last["product_name"].to_numpy()
+    origin = pd.Timestamp(raw["created_at"].max() if origin is None else origin).normalize()
+    col = {name: feature_names.index(name) for name in ("day_of_week", "week_of_year", "prev_day_sales")
+           if name in feature_names}
+
+    segments = (last[segment_model.column].to_numpy(dtype=object)
+                if segment_model is not None and segment_model.column in last.columns else None)
+
+    y_prev = last["sub_total"].to_numpy(dtype=np.float64)
+    n = len(products)
+    steps = np.arange(1, horizon + 1)
+    point = np.empty((horizon, n))
+    intervals = None
+    if quantile_model is not None:
+        intervals = np.empty((horizon, n, len(quantile_model.labels)))
+
+    dates = origin + pd.to_timedelta(steps, unit="D")
+    for i, date in enumerate(dates):
+        if "day_of_week" in col:
+            X[:, col["day_of_week"]] = date.dayofweek
+        if "week_of_year" in col:
+            X[:, col["week_of_year"]] = date.isocalendar().week
+        if "prev_day_sales" in col:
+            X[:, col["prev_day_sales"]] = y_prev
+
+        X_scaled = _scale(scaler, X, feature_names)
+        point[i] = model.predict(X_scaled) if segments is None else segment_model.predict(X_scaled, segments)
+        if intervals is not None:
+            intervals[i] = quantile_model.predict(X_scaled)
+        y_prev = point[i]
+
+    result = pd.DataFrame({
+        "product_name": np.tile(products, horizon),
+        "step": np.repeat(steps, n),
+        "forecast_date": np.repeat(dates, n),
+        "predicted_sales": point.ravel(),
+    })
+    if intervals is not None:
+        for j, label in enumerate(quantile_model.labels):
+            result[f"predicted_{label}"] = intervals[:, :, j].ravel()
+    return result
+
+
+def forecast_payload(artifacts, data: pd.DataFrame, horizon: int) -> dict:
+    """Forecasts grouped by product_name, as served by /forecast"""
+    forecasts = forecast_horizon(
+        model=artifacts.model,
+        scaler=artifacts.scaler,
+        raw_df=data,
+        horizon=horizon,
+        feature_names=artifacts.feature_names,
+        quantile_model=artifacts.quantile_model,
+        segment_model=artifacts.segment_model
+    )
+    return {
+        product: group.drop(columns="product_name").to_dict(orient="records")
+        for product, group in forecasts.groupby("product_name", observed=True)
+    }
+
+
+def main():
+    from src.hopsworks_utils import get_recent_data, init_hopsworks
+    from src.model_utils import load_bundle
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--days", type=int, default=25, help="recent rows fetched per product")
+    parser.add_argument("--out", default="forecasts.parquet", help=".parquet or .csv")
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    data = get_recent_data(fs=init_hopsworks(), feature_group_name="sales_record", version=1, days=args.days)
+    forecasts = forecast_horizon(
+        bundle["model"], bundle["scaler"], data, horizon=args.horizon,
+        feature_names=bundle["feature_names"], quantile_model=bundle.get("quantile_model"),
+        segment_model=bundle.get("segment_model"),
+    )
+    forecasts["model_version"] = bundle["version"]
+    if args.out.endswith(".csv"):
+        forecasts.to_csv(args.out, index=False)
+    else:
+        forecasts.to_parquet(args.out, index=False)
+    logger.info(f"{len(forecasts)} forecasts for {forecasts['product_name'].nunique()} products written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,14 +34,134 @@ COMET_ML_WORKSPACE = os.getenv('COMET_ML_WORKSPACE')
     model = joblib.load(model_file_path)
     return model
 '''
+import json
+import logging
 import os
 import joblib
-
-def load_model():
-    # Relative path from this script to training's model folder
-    model_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../../training_pipeline/models/lightgbm_model.pkl")
-    )
+import lightgbm as lgb
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from src.quantile_model import QuantileModel
+from src.segment_model import SegmentRoutedModel
+from src.tree_evaluator import FlatForest, SmallBatchRouter
+
+logger = logging.getLogger(__name__)
+
+# Local registry written by training_pipeline/src/model_registry.py
+MODEL_REGISTRY_DIR = os.getenv(
+    "MODEL_REGISTRY_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../../training_pipeline/models/registry"))
+)
+MODEL_NAME = os.getenv("MODEL_NAME", "lightgbm_model")
+MODEL_DIR = os.path.join(MODEL_REGISTRY_DIR, MODEL_NAME)
+# Pin a version; unset follows the production pointer. The latest pointer is
+# never served: every training run writes it, including unapproved ones
+MODEL_VERSION = os.getenv("MODEL_VERSION")
+# "lightgbm" (booster.predict), "numpy" (FlatForest) or "auto" (by batch size)
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "lightgbm")
+NUMPY_MAX_BATCH = int(os.getenv("NUMPY_MAX_BATCH", "32"))
+LEGACY_MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../training_pipeline/models"))
+# Manifest format of training_pipeline/src/model_bundle.py this reader understands
+BUNDLE_FORMAT = 2
+# Stage pointer written by training_pipeline/src/model_registry.py on promotion
+PRODUCTION_STAGE = "production"
+
+
+def pointer_path(model_dir: str = MODEL_DIR) -> str:
+    """Stage pointer file the service follows (production)"""
+    return os.path.join(model_dir, PRODUCTION_STAGE)
+
+
+def resolve_bundle(model_dir: str = MODEL_DIR, version: str = MODEL_VERSION) -> str:
+    """Directory of a pinned version, or of the one the stage pointer names"""
+    if version is None:
+        pointer = pointer_path(model_dir)
+        if not os.path.exists(pointer):
+            raise FileNotFoundError(f" No production model promoted yet (no pointer at: {pointer})")
+        with open(pointer) as f:
+            version = f.read().strip()
+    return os.path.join(model_dir, version)
+
+
+def _with_engine(booster: lgb.Booster):
+    """
+    The booster wrapped for PREDICT_ENGINE, or the booster itself when
+    FlatForest cannot represent it
+    """
+    try:
+        if PREDICT_ENGINE == "numpy":
+            return FlatForest.from_booster(booster)
+        if PREDICT_ENGINE == "auto":
+            return SmallBatchRouter(booster, max_numpy_batch=NUMPY_MAX_BATCH)
+    except ValueError as e:
+        logger.warning(f"PREDICT_ENGINE={PREDICT_ENGINE} unavailable ({e}), using the LightGBM engine")
+    return booster
+
+
+def load_bundle(bundle_dir: str = None) -> dict:
+    """
+    Load model, scaler, feature schema and metrics from one bundle directory.
+    Scaler arrays are memory-mapped; the booster is parsed from model.txt.
+    Reads the manifest written by training_pipeline/src/model_bundle.py.
+    """
+    bundle_dir = bundle_dir or resolve_bundle()
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format", 1) > BUNDLE_FORMAT:
+        raise ValueError(f"Bundle format {manifest['format']} is newer than supported ({BUNDLE_FORMAT})")
+
+    # File names come from the manifest; format 1 bundles used fixed names
+    if manifest["scaler"] == "standard":
+        scaler_files = manifest.get("scaler_files") or {
+            attr: f"scaler_{attr.rstrip('_')}.npy" for attr in ("mean_", "scale_", "var_")
+            if os.path.exists(os.path.join(bundle_dir, f"scaler_{attr.rstrip('_')}.npy"))
+        }
+        scaler = StandardScaler()
+        for attr, name in scaler_files.items():
+            setattr(scaler, attr, np.load(os.path.join(bundle_dir, name), mmap_mode="r"))
+        scaler.n_features_in_ = len(manifest["feature_names"])
+        scaler.feature_names_in_ = np.asarray(manifest["feature_names"], dtype=object)
+    else:
+        transformer = (manifest.get("scaler_files") or {}).get("transformer", "transformer.joblib")
+        scaler = joblib.load(os.path.join(bundle_dir, transformer))
+
+    model = _with_engine(lgb.Booster(model_file=os.path.join(bundle_dir, manifest.get("model_file", "model.txt"))))
+
+    quantiles = manifest.get("quantiles") or {}
+    quantile_model = None
+    if quantiles:
+        paths = {alpha: os.path.join(bundle_dir, name) for alpha, name in quantiles.items()}
+        try:
+            engine = "numpy" if PREDICT_ENGINE == "numpy" else "lightgbm"
+            quantile_model = QuantileModel.from_files(paths, engine=engine)
+        except ValueError as e:
+            logger.warning(f"Quantile models unavailable on the numpy engine ({e}), using the LightGBM engine")
+            quantile_model = QuantileModel.from_files(paths, engine="lightgbm")
+
+    # Local models of the segments that beat the global model in training
+    segments = manifest.get("segments") or {}
+    segment_model = SegmentRoutedModel(
+        segments["column"],
+        {value: _with_engine(lgb.Booster(model_file=os.path.join(bundle_dir, name)))
+         for value, name in segments["models"].items()},
+        global_model=model,
+    ) if segments.get("models") else None
+
+    logger.info(f"Model bundle {manifest['version']} loaded from {bundle_dir}")
+    return {
+        "model": model,
+        "quantile_model": quantile_model,
+        "segment_model": segment_model,
+        "scaler": scaler,
+        "feature_names": manifest["feature_names"],
+        "metrics": manifest["metrics"],
+        "version": manifest["version"],
+    }
+
+
+def load_legacy_model():
+    """The pre-registry model pickle"""
+    model_path = os.path.join(LEGACY_MODEL_DIR, "lightgbm_model.pkl")
 
     if not os.path.exists(model_path):
         raise FileNotFoundError(f" Model file not found at: {model_path}")
@@ -49,24 +169,11 @@ def load_model():
     model = joblib.load(model_path)
     print(f" Model loaded from: {model_path}")
     return model
-def load_model():
-    # Relative path from this script to training's model folder
-    model_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../../training_pipeline/models/lightgbm_model.pkl")
-    )
 
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f" Model file not found at: {model_path}")
 
-    model = joblib.load(model_path)
-    print(f" Model loaded from: {model_path}")
-    return model
-
-def load_scaler():
-    # Relative path from this script to training's model folder
-    scaler_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../../training_pipeline/models/scaler.pkl")
-    )
+def load_legacy_scaler():
+    """The pre-registry scaler pickle"""
+    scaler_path = os.path.join(LEGACY_MODEL_DIR, "scaler.pkl")
 
     if not os.path.exists(scaler_path):
         raise FileNotFoundError(f" Model file not found at: {scaler_path}")
@@ -74,3 +181,18 @@ def load_scaler():
     scaler = joblib.load(scaler_path)
     print(f" Model loaded from: {scaler_path}")
     return scaler
+
+
+def load_model():
+    # Prefer the versioned bundle, fall back to the legacy pickle
+    try:
+        return load_bundle()["model"]
+    except FileNotFoundError:
+        return load_legacy_model()
+
+def load_scaler():
+    # Prefer the versioned bundle, fall back to the legacy pickle
+    try:
+        return load_bundle()["scaler"]
+    except FileNotFoundError:
+        return load_legacy_scaler()
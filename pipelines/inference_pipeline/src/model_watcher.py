@@ -0,0 +1,70 @@
+# src/model_watcher.py
+"""
+Background watcher that follows the registry's stage pointer and hands a
+freshly loaded bundle to a callback whenever the pointer moves.
+"""
+
+import logging
+import threading
+
+from src.model_utils import MODEL_DIR, MODEL_VERSION, load_bundle, pointer_path, resolve_bundle
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Polls the pointer file and swaps models without a restart
+
+    Attributes:
+        on_swap: Called with the new bundle dict after it is fully loaded
+        interval: Seconds between pointer checks
+        current_version: Version most recently handed to on_swap
+    """
+
+    def __init__(self, on_swap, current_version: str = None, interval: float = 10.0, model_dir: str = MODEL_DIR):
+        self.on_swap = on_swap
+        self.current_version = current_version
+        self.interval = interval
+        self.model_dir = model_dir
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_pointer(self):
+        try:
+            with open(pointer_path(self.model_dir)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def check(self) -> bool:
+        """Load and swap in the pointed-to version if it changed"""
+        version = self._read_pointer()
+        if not version or version == self.current_version:
+            return False
+        # Load fully before swapping so requests never see a half-loaded model
+        bundle = load_bundle(resolve_bundle(self.model_dir, version))
+        self.on_swap(bundle)
+        logger.info(f"Model swapped: {self.current_version} -> {version}")
+        self.current_version = version
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model reload failed, keeping {self.current_version}: {e}")
+
+    def start(self):
+        if MODEL_VERSION is not None:
+            logger.info(f"MODEL_VERSION={MODEL_VERSION} is pinned, not watching {self.model_dir}")
+            return self
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
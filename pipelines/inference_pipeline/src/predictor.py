@@ -1,18 +1,113 @@
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from src.featurengineering import engineer_features_for_inference
 
-def predict_sales(model, scaler: StandardScaler, raw_df: pd.DataFrame) -> pd.DataFrame:
+def feature_matrix(scaler: StandardScaler, raw_df: pd.DataFrame) -> np.ndarray:
     features_df = engineer_features_for_inference(raw_df)
 
     # Apply scaler from training
-    X_scaled = scaler.transform(features_df)
+    return scaler.transform(features_df)
 
-    # Predict
-    preds = model.predict(X_scaled)
 
+def scaled_features(artifacts, raw_df: pd.DataFrame) -> np.ndarray:
+    """feature_matrix with the snapshot's scaler, for PredictionExecutor.run"""
+    return feature_matrix(artifacts.scaler, raw_df)
+
+
+def segment_labels(artifacts, raw_df: pd.DataFrame):
+    """
+    Segment label per feature row for a segment-routed model, None when the
+    bundle has no local models or raw_df lacks the segment column
+    """
+    if artifacts.segment_model is None or artifacts.segment_model.column not in raw_df.columns:
+        return None
+    return raw_df[artifacts.segment_model.column].to_numpy(dtype=object)
+
+
+def score_features(artifacts, X_scaled: np.ndarray, segments=None) -> np.ndarray:
+    """
+    Point prediction followed by the quantile columns (if any) per row
+
+    Args:
+        artifacts: ServingArtifacts snapshot to predict with
+        X_scaled: Scaled feature matrix
+        segments: segment_labels of the rows, routing them to their
+            segment's local model; None scores with the global model
+
+    Returns:
+        Array of shape (n, 1 + len(artifacts.quantile_model.labels))
+    """
+    if artifacts.segment_model is not None and segments is not None:
+        preds = artifacts.segment_model.predict(X_scaled, segments)
+    else:
+        preds = artifacts.model.predict(X_scaled)
+    if artifacts.quantile_model is None:
+        return np.asarray(preds, dtype=np.float64).reshape(-1, 1)
+    return np.column_stack([preds, artifacts.quantile_model.predict(X_scaled)])
+
+
+def _prediction_frame(raw_df: pd.DataFrame, preds: np.ndarray, intervals=None, labels=()) -> pd.DataFrame:
     # Merge predictions back
     result = raw_df[["product_name", "created_at", "order_id"]].copy()
     result["predicted_sales"] = preds
 
+    # Prediction interval columns (predicted_p10, ...) from the same batch
+    if intervals is not None:
+        for i, label in enumerate(labels):
+            result[f"predicted_{label}"] = intervals[:, i]
+
     return result
+
+
+def predict_sales(model, scaler: StandardScaler, raw_df: pd.DataFrame, quantile_model=None) -> pd.DataFrame:
+    X_scaled = feature_matrix(scaler, raw_df)
+
+    # Predict
+    preds = model.predict(X_scaled)
+
+    intervals = quantile_model.predict(X_scaled) if quantile_model is not None else None
+    labels = quantile_model.labels if quantile_model is not None else ()
+    return _prediction_frame(raw_df, preds, intervals, labels)
+
+
+def prediction_frame(artifacts, data: pd.DataFrame, scores: np.ndarray = None) -> pd.DataFrame:
+    """
+    Actual vs predicted sales, one row per input row, sorted by product
+    then time
+
+    Args:
+        artifacts: ServingArtifacts snapshot to predict with
+        data: Recent raw rows, sorted by product then time (the order
+            engineer_features_for_inference puts the feature rows in)
+        scores: score_features output for data, when already computed
+            (e.g. by the micro-batcher); predicted here otherwise
+    """
+    # Prepare actual sales for comparison
+    actual = data[["product_name", "created_at", "sub_total"]].rename(columns={"sub_total": "actual_sales"})
+    labels = artifacts.quantile_model.labels if artifacts.quantile_model is not None else ()
+    # Predict (the scaler rejects empty input; an empty page has nothing to score)
+    if scores is None:
+        scores = (score_features(artifacts, scaled_features(artifacts, data), segment_labels(artifacts, data))
+                  if len(data) else np.empty((0, 1 + len(labels))))
+    predictions = _prediction_frame(data, scores[:, 0], scores[:, 1:], labels)
+
+    # Merge predicted + actual
+    combined = pd.merge(actual, predictions, on=["product_name", "created_at"], how="left")
+    return combined.sort_values(["product_name", "created_at"], kind="stable").reset_index(drop=True)
+
+
+def group_records(frame: pd.DataFrame) -> dict:
+    """{product_name: [records]} from a frame sorted by product_name"""
+    if frame.empty:
+        return {}
+    records = frame.to_dict(orient="records")
+    products = frame["product_name"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])
+    stops = np.r_[starts[1:], len(products)]
+    return {products[start]: records[start:stop] for start, stop in zip(starts, stops)}
+
+
+def predict_payload(artifacts, data: pd.DataFrame, scores: np.ndarray = None) -> dict:
+    """Actual vs predicted sales grouped by product_name, as served by /predict"""
+    return group_records(prediction_frame(artifacts, data, scores))
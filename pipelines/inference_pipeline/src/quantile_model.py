@@ -0,0 +1,51 @@
+# src/quantile_model.py
+"""
+Scores every quantile booster of a bundle (P10, P50, P90, ...) on the same
+scaled batch and returns non-crossing intervals.
+"""
+
+import lightgbm as lgb
+import numpy as np
+
+from src.tree_evaluator import FlatForest
+
+
+class QuantileModel:
+    """
+    Quantile boosters scored together
+
+    With engine="numpy" the boosters are stacked into one FlatForest and a
+    batch is traversed once for all levels; with "lightgbm" each booster's
+    compiled predict runs on the same array.
+
+    Attributes:
+        quantiles: Sorted quantile levels
+        labels: Column suffixes per level ('p10', 'p50', ...)
+    """
+
+    def __init__(self, boosters: dict, engine: str = "lightgbm"):
+        self.quantiles = sorted(boosters)
+        self.labels = [f"p{round(alpha * 100):02d}" for alpha in self.quantiles]
+        self.boosters = [boosters[alpha] for alpha in self.quantiles]
+        self.forest = None
+        if engine == "numpy":
+            self.forest = FlatForest.stack([FlatForest.from_booster(b) for b in self.boosters])
+
+    @classmethod
+    def from_files(cls, paths: dict, engine: str = "lightgbm") -> "QuantileModel":
+        """Load from {alpha: model.txt path}"""
+        return cls({float(alpha): lgb.Booster(model_file=path) for alpha, path in paths.items()}, engine)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Quantile predictions, shape (n_rows, n_quantiles)
+
+        Each row is sorted across levels (monotone rearrangement), since
+        separately trained quantile models can cross.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if self.forest is not None:
+            preds = self.forest.predict(X)
+        else:
+            preds = np.column_stack([booster.predict(X) for booster in self.boosters])
+        return np.sort(preds, axis=1)
@@ -0,0 +1,319 @@
+# src/reconciliation.py
+"""
+Coherent forecasts across the product hierarchy
+
+    total -> marketplace -> category -> sub_category -> sub_sub_category -> product
+
+The summing matrix S (all nodes x bottom series) is kept sparse and MinT is
+solved matrix-free: W is a shrunk residual covariance stored as diagonal +
+low rank, and the aggregation constraints are solved with conjugate
+gradients, so 100k+ products never need a dense n x n matrix.
+
+Usage:
+    python -m src.reconciliation --products 100000 --days 60
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, cg
+
+logger = logging.getLogger(__name__)
+
+# Top to bottom; every level's nodes are keyed by the full path above them
+HIERARCHY_LEVELS = ["marketplace_name", "category", "sub_category", "sub_sub_category", "product_name"]
+# Label of missing level values (only product_name is filled upstream)
+UNKNOWN_LEVEL = "(unknown)"
+
+
+class Hierarchy:
+    """
+    Nodes of the hierarchy and the sparse summing matrix
+
+    Node 0 is the grand total, followed by each level in order; the bottom
+    series are the last n_bottom nodes, in the same order as the columns of S.
+
+    Attributes:
+        S: CSR summing matrix, shape (n_nodes, n_bottom)
+        nodes: One row per node with its level and path columns
+        bottom: Path columns of each bottom series (column order of S)
+        node_codes: Node index of each bottom series' ancestor per level,
+            shape (n_bottom, n_levels + 1), column 0 being the total
+        parent: Parent node index per node (-1 for the total)
+    """
+
+    def __init__(self, S, nodes, bottom, node_codes, parent):
+        self.S = S
+        self.nodes = nodes
+        self.bottom = bottom
+        self.node_codes = node_codes
+        self.parent = parent
+
+    @property
+    def n_nodes(self) -> int:
+        return self.S.shape[0]
+
+    @property
+    def n_bottom(self) -> int:
+        return self.S.shape[1]
+
+    def aggregate(self, y_bottom) -> np.ndarray:
+        """Sum bottom-level values (n_bottom,) or (n_bottom, h) to every node"""
+        return self.S @ np.asarray(y_bottom, dtype=float)
+
+
+def build_hierarchy(keys: pd.DataFrame, levels=HIERARCHY_LEVELS) -> Hierarchy:
+    """
+    Build the hierarchy from the bottom series' identifying columns
+
+    Args:
+        keys: Rows with the level columns; duplicates are collapsed, so raw
+            sales rows can be passed directly. Missing values become the
+            node UNKNOWN_LEVEL under their parent
+        levels: Level columns, top to bottom
+
+    Returns:
+        Hierarchy whose bottom series are the unique full paths in keys
+    """
+    # groupby drops null keys (ngroup -1), so nulls get an explicit label
+    bottom = keys[list(levels)].astype(object).fillna(UNKNOWN_LEVEL)
+    bottom = bottom.drop_duplicates().sort_values(list(levels)).reset_index(drop=True)
+    n_bottom = len(bottom)
+
+    node_codes = np.zeros((n_bottom, len(levels) + 1), dtype=np.int64)
+    frames = [pd.DataFrame({"level": ["total"]})]
+    offset = 1
+    for depth, level in enumerate(levels, start=1):
+        path = list(levels[:depth])
+        codes = bottom.groupby(path, sort=True, observed=True).ngroup().to_numpy()
+        node_codes[:, depth] = codes + offset
+        level_nodes = bottom[path].drop_duplicates().reset_index(drop=True)
+        level_nodes.insert(0, "level", level)
+        frames.append(level_nodes)
+        offset += len(level_nodes)
+    nodes = pd.concat(frames, ignore_index=True)
+
+    rows = node_codes.T.ravel()
+    cols = np.tile(np.arange(n_bottom), len(levels) + 1)
+    S = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(offset, n_bottom))
+
+    parent = np.full(offset, -1, dtype=np.int64)
+    for depth in range(1, len(levels) + 1):
+        parent[node_codes[:, depth]] = node_codes[:, depth - 1]
+
+    return Hierarchy(S, nodes, bottom, node_codes, parent)
+
+
+def bottom_up(hierarchy: Hierarchy, y_hat) -> np.ndarray:
+    """Keep the bottom-level base forecasts and sum them up the tree"""
+    y_hat = np.asarray(y_hat, dtype=float)
+    return hierarchy.aggregate(y_hat[-hierarchy.n_bottom:])
+
+
+def top_down(hierarchy: Hierarchy, y_hat, history=None, method: str = "forecast_proportions") -> np.ndarray:
+    """
+    Split the total forecast down the tree
+
+    Args:
+        hierarchy: Hierarchy from build_hierarchy
+        y_hat: Base forecasts for every node, (n_nodes,) or (n_nodes, h)
+        history: Bottom-level actuals, shape (T, n_bottom); needed by the
+            historical-proportion methods
+        method: "forecast_proportions" (each node's share among its
+            siblings' base forecasts, level by level), "average_proportions"
+            or "proportions_of_averages" (shares from history)
+
+    Returns:
+        Coherent forecasts for every node
+    """
+    y_hat = np.asarray(y_hat, dtype=float)
+    total = y_hat[0]
+
+    if method == "forecast_proportions":
+        shares = np.ones((hierarchy.n_bottom,) + y_hat.shape[1:])
+        for depth in range(1, hierarchy.node_codes.shape[1]):
+            level_nodes = np.unique(hierarchy.node_codes[:, depth])
+            sibling_sums = np.zeros_like(y_hat)
+            np.add.at(sibling_sums, hierarchy.parent[level_nodes], y_hat[level_nodes])
+            node = hierarchy.node_codes[:, depth]
+            parent_sum = sibling_sums[hierarchy.parent[node]]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                shares *= np.where(parent_sum != 0, y_hat[node] / parent_sum, 0.0)
+    elif method in ("average_proportions", "proportions_of_averages"):
+        if history is None:
+            raise ValueError(f"{method} needs bottom-level history")
+        history = np.asarray(history, dtype=float)
+        totals = history.sum(axis=1)
+        if method == "average_proportions":
+            valid = totals != 0
+            p = (history[valid] / totals[valid, None]).mean(axis=0)
+        else:
+            p = history.mean(axis=0) / totals.mean()
+        shares = p.reshape((-1,) + (1,) * (y_hat.ndim - 1))
+    else:
+        raise ValueError(f"Unknown top-down method: {method}")
+
+    return hierarchy.aggregate(shares * total)
+
+
+def shrinkage_lambda(residuals) -> float:
+    """
+    Schäfer-Strimmer shrinkage intensity towards the diagonal
+
+    Same estimator as the MinT-shrink reference implementation, but every
+    pairwise sum is rewritten through the T x T Gram matrix, so the cost is
+    O(n T^2) instead of O(n^2 T) for n series and T observations.
+
+    Args:
+        residuals: In-sample base-forecast residuals, shape (T, n_nodes)
+    """
+    x = np.asarray(residuals, dtype=float)
+    T = x.shape[0]
+    scale = np.sqrt((x * x).sum(axis=0) / T)
+    keep = scale > 0
+    xs = x[:, keep] / scale[keep]
+
+    xs2 = xs * xs
+    gram = xs @ xs.T                                    # T x T
+    sum_w2 = float(np.sum(xs2.sum(axis=1) ** 2))        # sum_ij sum_t xs_ti^2 xs_tj^2
+    sum_g2 = float(np.sum(gram * gram))                 # sum_ij (sum_t xs_ti xs_tj)^2
+    col2 = xs2.sum(axis=0)                              # sum_t xs_ti^2 (= T)
+    diag_w2 = float(np.sum(xs2 * xs2))
+    diag_g2 = float(np.sum(col2 * col2))
+
+    var_offdiag = ((sum_w2 - diag_w2) - (sum_g2 - diag_g2) / T) / (T * (T - 1))
+    corr_offdiag = (sum_g2 - diag_g2) / T ** 2
+    if corr_offdiag <= 0:
+        return 1.0
+    return float(min(1.0, max(0.0, var_offdiag / corr_offdiag)))
+
+
+def mint_shrink(hierarchy: Hierarchy, y_hat, residuals, tol: float = 1e-10, maxiter: int = 1000) -> tuple:
+    """
+    MinT reconciliation with a shrunk residual covariance
+
+    W = lambda * diag(V) + (1 - lambda) * V, with V = E'E / T, is applied as
+    diagonal + rank-T without being formed. The reconciled forecasts are
+    y_hat - W C' (C W C')^-1 C y_hat, where C = [I, -S_agg] encodes "every
+    aggregate equals the sum of its bottom series"; the (n_agg x n_agg)
+    system is solved by conjugate gradients with a Jacobi preconditioner.
+
+    Args:
+        hierarchy: Hierarchy from build_hierarchy
+        y_hat: Base forecasts for every node, (n_nodes,) or (n_nodes, h)
+        residuals: In-sample base-forecast residuals, shape (T, n_nodes)
+        tol: Relative CG tolerance
+        maxiter: CG iteration cap
+
+    Returns:
+        (reconciled forecasts, lambda)
+    """
+    y_hat = np.asarray(y_hat, dtype=float)
+    E = np.asarray(residuals, dtype=float)
+    T, n_nodes = E.shape
+    if n_nodes != hierarchy.n_nodes:
+        raise ValueError(f"residuals have {n_nodes} columns, hierarchy has {hierarchy.n_nodes} nodes")
+
+    lam = shrinkage_lambda(E)
+    variance = (E * E).sum(axis=0) / T
+    # W = diag + U'U: lam * diag(V) plus (1 - lam) * V as a rank-T factor.
+    # A tiny ridge keeps W definite when lam is 0 or a series has no variance.
+    diag = lam * variance + 1e-8 * max(float(variance.mean()), 1e-12)
+    low_rank = E * np.sqrt((1.0 - lam) / T)
+
+    def apply_W(v):
+        return diag[:, None] * v + low_rank.T @ (low_rank @ v)
+
+    n_agg = n_nodes - hierarchy.n_bottom
+    S_agg = hierarchy.S[:n_agg]
+
+    def apply_Ct(u):                                    # (n_agg, k) -> (n_nodes, k)
+        return np.vstack([u, -(S_agg.T @ u)])
+
+    def apply_C(v):                                     # (n_nodes, k) -> (n_agg, k)
+        return v[:n_agg] - S_agg @ v[n_agg:]
+
+    def matvec(u):
+        return apply_C(apply_W(apply_Ct(u.reshape(-1, 1)))).ravel()
+
+    # diag(C W C') for the preconditioner: W's diagonal pushed through C
+    w_diag = diag + (low_rank * low_rank).sum(axis=0)
+    S_sq = S_agg.multiply(S_agg)
+    precond_diag = w_diag[:n_agg] + S_sq @ w_diag[n_agg:]
+    A = LinearOperator((n_agg, n_agg), matvec=matvec, dtype=float)
+    M = LinearOperator((n_agg, n_agg), matvec=lambda u: u / precond_diag, dtype=float)
+
+    columns = y_hat.reshape(n_nodes, -1)
+    reconciled = np.empty_like(columns)
+    for j in range(columns.shape[1]):
+        gap = apply_C(columns[:, j:j + 1]).ravel()
+        u, info = cg(A, gap, rtol=tol, maxiter=maxiter, M=M)
+        if info > 0:
+            logger.warning(f"MinT CG did not converge in {maxiter} iterations")
+        reconciled[:, j] = columns[:, j] - apply_W(apply_Ct(u.reshape(-1, 1))).ravel()
+    return reconciled.reshape(y_hat.shape), lam
+
+
+def reconcile(hierarchy: Hierarchy, y_hat, method: str = "bottom_up", residuals=None, history=None) -> np.ndarray:
+    """
+    Coherent forecasts for every node
+
+    Args:
+        hierarchy: Hierarchy from build_hierarchy
+        y_hat: Base forecasts for every node (nodes order), (n_nodes,) or (n_nodes, h)
+        method: "bottom_up", "top_down" or "mint_shrink"
+        residuals: (T, n_nodes) in-sample residuals, for mint_shrink
+        history: (T, n_bottom) bottom actuals, for historical top-down shares
+    """
+    if method == "bottom_up":
+        return bottom_up(hierarchy, y_hat)
+    if method == "top_down":
+        return top_down(hierarchy, y_hat, history=history,
+                        method="forecast_proportions" if history is None else "average_proportions")
+    if method == "mint_shrink":
+        if residuals is None:
+            raise ValueError("mint_shrink needs in-sample residuals")
+        return mint_shrink(hierarchy, y_hat, residuals)[0]
+    raise ValueError(f"Unknown reconciliation method: {method}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Time reconciliation on a synthetic hierarchy")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.products
+    keys = pd.DataFrame({
+        "marketplace_name": rng.integers(0, 3, n).astype(str),
+        "category": rng.integers(0, 20, n).astype(str),
+        "sub_category": rng.integers(0, 10, n).astype(str),
+        "sub_sub_category": rng.integers(0, 5, n).astype(str),
+        "product_name": np.arange(n).astype(str),
+    })
+
+    start = time.perf_counter()
+    hierarchy = build_hierarchy(keys)
+    print(f"build_hierarchy: {hierarchy.n_nodes} nodes, {hierarchy.n_bottom} bottom, "
+          f"S nnz={hierarchy.S.nnz} in {time.perf_counter() - start:.2f}s")
+
+    truth = hierarchy.aggregate(rng.gamma(2.0, 5.0, size=n))
+    y_hat = truth * rng.normal(1.0, 0.1, size=hierarchy.n_nodes)
+    residuals = (truth[None, :] * rng.normal(0.0, 0.1, size=(args.days, hierarchy.n_nodes)))
+
+    for method in ("bottom_up", "top_down", "mint_shrink"):
+        start = time.perf_counter()
+        reconciled = reconcile(hierarchy, y_hat, method=method, residuals=residuals)
+        gap = np.abs(hierarchy.aggregate(reconciled[-hierarchy.n_bottom:]) - reconciled).max()
+        rmse = np.sqrt(np.mean((reconciled - truth) ** 2))
+        print(f"{method:>12}: {time.perf_counter() - start:.2f}s  coherence gap={gap:.2e}  rmse={rmse:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# src/result_cache.py
+"""
+Cache of encoded prediction responses. Entries belong to a generation
+(model version + feature window revision); the first lookup with a new
+generation drops everything, so a model swap or a data refresh never
+serves stale predictions. Memory is bounded LRU by body size, and evicted
+entries can spill to a bounded directory on disk.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    media_type: str
+    headers: dict = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body)
+
+
+def cache_key(*parts) -> str:
+    """Stable key from request parameters"""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Memory-bounded LRU of CachedResponse with optional disk spill
+
+    Attributes:
+        max_bytes: Total body bytes kept in memory
+        spill_dir: This cache's own subdirectory of the configured spill
+            directory (removed at exit), None to drop evicted entries
+        spill_max_bytes: Total body bytes kept in spill_dir
+
+    With a spill directory get() and put() may read or write files, so
+    async callers should run them in a thread pool.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, spill_dir: str = None, spill_max_bytes: int = 2**30):
+        self.max_bytes = max_bytes
+        self.spill_dir = None
+        self.spill_max_bytes = spill_max_bytes
+        self.generation = None
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.invalidations = 0
+        if spill_dir:
+            # A private subdirectory: the configured one may be shared with
+            # other workers or hold unrelated files, none of which are touched
+            os.makedirs(spill_dir, exist_ok=True)
+            self._spill_tmp = tempfile.TemporaryDirectory(prefix="result-cache-", dir=spill_dir)
+            self.spill_dir = self._spill_tmp.name
+
+    def _check_generation(self, generation):
+        if generation == self.generation:
+            return
+        if self.generation is not None:
+            self.invalidations += 1
+            logger.info(f"Result cache invalidated: generation {tuple(map(str, generation))}")
+        self.generation = generation
+        self._memory.clear()
+        self._memory_bytes = 0
+        for key in self._disk:
+            try:
+                os.remove(self._spill_path(key))
+            except OSError:
+                pass
+        self._disk.clear()
+        self._disk_bytes = 0
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+    def _spill(self, key: str, entry: CachedResponse):
+        if not self.spill_dir or entry.nbytes > self.spill_max_bytes:
+            return
+        with open(self._spill_path(key), "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._disk[key] = entry.nbytes
+        self._disk_bytes += entry.nbytes
+        self.spills += 1
+        while self._disk_bytes > self.spill_max_bytes:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._spill_path(old_key))
+            except OSError:
+                pass
+
+    def _unspill(self, key: str):
+        size = self._disk.pop(key)
+        self._disk_bytes -= size
+        path = self._spill_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.remove(path)
+        except (OSError, pickle.UnpicklingError) as e:
+            logger.warning(f"Dropping unreadable spilled result {key}: {e}")
+            return None
+        return entry
+
+    def get(self, generation, key: str):
+        """Cached entry for key in this generation, or None"""
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+            if key in self._disk:
+                entry = self._unspill(key)
+                if entry is not None:
+                    self.disk_hits += 1
+                    self._insert(key, entry)
+                    return entry
+            self.misses += 1
+            return None
+
+    def put(self, generation, key: str, entry: CachedResponse):
+        """Store entry unless the generation moved on while it was computed"""
+        with self._lock:
+            if generation != self.generation or entry.nbytes > self.max_bytes:
+                return
+            self._insert(key, entry)
+
+    def _insert(self, key: str, entry: CachedResponse):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = entry
+        self._memory_bytes += entry.nbytes
+        while self._memory_bytes > self.max_bytes:
+            old_key, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+            self.evictions += 1
+            self._spill(old_key, old)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "generation": [str(part) for part in self.generation] if self.generation else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+            "entries": len(self._memory),
+            "bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,52 @@
+# src/segment_model.py
+"""
+Routes rows to the local booster of their segment (marketplace, category,
+...) and scores every other row with the global model.
+"""
+
+import numpy as np
+
+
+class SegmentRoutedModel:
+    """
+    Local models per segment value with the global model as fallback
+
+    Rows whose segment has no local model (including missing labels) are
+    scored by the global model, so a segment-routed bundle can serve any
+    input the global model can.
+
+    Attributes:
+        column: Raw column holding the segment label (e.g. marketplace_name)
+        models: Dictionary of {segment value: model with predict(X)}
+        global_model: Model for rows of every other segment
+    """
+
+    def __init__(self, column: str, models: dict, global_model):
+        self.column = column
+        self.models = models
+        self.global_model = global_model
+
+    def predict(self, X, segments=None) -> np.ndarray:
+        """
+        Point predictions for X
+
+        Args:
+            X: Scaled feature matrix
+            segments: Segment label per row of X; None scores every row
+                with the global model
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if segments is None or not self.models:
+            return np.asarray(self.global_model.predict(X), dtype=np.float64)
+        # The manifest keys segments by their string form
+        segments = np.asarray(segments, dtype=object).astype(str)
+        preds = np.empty(len(X), dtype=np.float64)
+        routed = np.zeros(len(X), dtype=bool)
+        for value, model in self.models.items():
+            rows = segments == str(value)
+            if rows.any():
+                preds[rows] = model.predict(X[rows])
+                routed |= rows
+        if not routed.all():
+            preds[~routed] = self.global_model.predict(X[~routed])
+        return preds
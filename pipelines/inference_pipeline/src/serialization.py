@@ -0,0 +1,90 @@
+# src/serialization.py
+"""
+Response encoding for the prediction endpoints: orjson when installed
+(stdlib json otherwise), newline-delimited JSON for streaming and Arrow
+IPC / Parquet for bulk consumers.
+"""
+
+import io
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _default(obj):
+    """Types neither encoder handles natively (pandas timestamps, numpy scalars)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if obj is pd.NaT:
+        return None
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _nan_to_none(obj):
+    """Copy of obj with NaN/inf floats replaced by None, as orjson writes them"""
+    if isinstance(obj, dict):
+        return {key: _nan_to_none(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_nan_to_none(value) for value in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    if isinstance(obj, np.ndarray):
+        return _nan_to_none(obj.tolist())
+    return obj
+
+
+def dumps(obj) -> bytes:
+    # NaN and inf become null with either encoder; bare NaN is not valid JSON
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_nan_to_none(obj), default=_default, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse through dumps(); return it directly to skip jsonable_encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def ndjson_lines(payload: dict):
+    """One {"product_name": ..., "records": [...]} line per product"""
+    for product, records in payload.items():
+        yield dumps({"product_name": product, "records": records}) + b"\n"
+
+
+def encode_frame(frame: pd.DataFrame, fmt: str) -> bytes:
+    """Serialize a flat frame as an Arrow IPC stream or Parquet file"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    return sink.getvalue()
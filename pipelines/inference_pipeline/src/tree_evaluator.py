@@ -0,0 +1,222 @@
+# src/tree_evaluator.py
+"""
+Pure-NumPy evaluator for LightGBM boosters.
+
+The booster's trees are exported into flat node arrays (feature, threshold,
+children, leaf values) and a whole batch is scored level by level across
+all trees at once, skipping LightGBM's per-call overhead on small batches.
+"""
+
+import lightgbm as lgb
+import numpy as np
+
+# LightGBM missing_type encoding
+_MISSING_NONE, _MISSING_ZERO, _MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {"None": _MISSING_NONE, "Zero": _MISSING_ZERO, "NaN": _MISSING_NAN}
+# Same cut-off as LightGBM's IsZero()
+_ZERO_THRESHOLD = 1e-35
+
+_IDENTITY_OBJECTIVES = ("regression", "regression_l1", "huber", "fair", "quantile", "mape")
+_EXP_OBJECTIVES = ("poisson", "gamma", "tweedie")
+
+
+class FlatForest:
+    """
+    Flattened tree ensemble with a vectorized predict
+
+    Children of a node are stored next to each other, so a step is
+    child = first_child[node] + went_right. Leaves point to themselves with
+    an infinite threshold, so every (row, tree) pair can take the same
+    number of steps without branching.
+
+    Attributes:
+        feature: Split feature per node (0 for leaves)
+        threshold: Split threshold per node (+inf for leaves)
+        first_child: Index of the left child; the right child follows it
+        nan_left: Direction taken by NaN inputs per node
+        zero_left: Direction taken by zero inputs on missing_type=Zero nodes
+        value: Leaf value per node (0 for internal nodes)
+        roots: Root node index per tree
+        max_depth: Deepest leaf, i.e. number of steps needed
+        transform: "identity" or "exp", applied to the raw score
+        output_starts: First tree of each output for stacked forests, None
+            for a single output
+    """
+
+    def __init__(self, feature, threshold, first_child, nan_left, zero_left, value,
+                 roots, max_depth, transform="identity", average_output=False, output_starts=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.first_child = first_child
+        self.nan_left = nan_left
+        self.zero_left = zero_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.transform = transform
+        self.average_output = average_output
+        self.output_starts = output_starts
+        self.has_zero_missing = bool(zero_left is not None)
+
+    @classmethod
+    def from_booster(cls, booster: lgb.Booster) -> "FlatForest":
+        """
+        Export every tree of a single-output LightGBM booster
+
+        Raises:
+            ValueError: Multi-output boosters, unsupported objectives and
+                categorical splits, which only LightGBM itself can score
+        """
+        dump = booster.dump_model()
+        if dump["num_tree_per_iteration"] != 1:
+            raise ValueError("Only single-output boosters can be flattened")
+
+        objective = dump.get("objective", "regression").split(" ")[0]
+        if objective in _EXP_OBJECTIVES:
+            transform = "exp"
+        elif objective in _IDENTITY_OBJECTIVES:
+            transform = "identity"
+        else:
+            raise ValueError(f"Objective {objective!r} is not supported")
+
+        feature, threshold, first_child, nan_left, zero_left, value = [], [], [], [], [], []
+        zero_missing = False
+
+        def allocate():
+            for column in (feature, threshold, first_child, nan_left, zero_left, value):
+                column.append(None)
+            return len(feature) - 1
+
+        roots, max_depth = [], 0
+        for tree in dump["tree_info"]:
+            root = allocate()
+            roots.append(root)
+            stack = [(tree["tree_structure"], root, 0)]
+            while stack:
+                node, index, depth = stack.pop()
+                if "split_feature" not in node:
+                    max_depth = max(max_depth, depth)
+                    feature[index], threshold[index] = 0, np.inf
+                    first_child[index] = index
+                    nan_left[index] = zero_left[index] = True
+                    value[index] = node.get("leaf_value", 0.0)
+                    continue
+                if node["decision_type"] != "<=":
+                    raise ValueError("Categorical splits are not supported")
+
+                missing = _MISSING_TYPES[node["missing_type"]]
+                thr = float(node["threshold"])
+                zero_missing |= missing == _MISSING_ZERO
+                feature[index], threshold[index], value[index] = node["split_feature"], thr, 0.0
+                # LightGBM: NaN is read as 0 unless missing_type is NaN, and
+                # missing values (NaN, or zero for Zero) take the default side
+                zero_left[index] = node["default_left"] if missing == _MISSING_ZERO else 0.0 <= thr
+                nan_left[index] = node["default_left"] if missing != _MISSING_NONE else 0.0 <= thr
+
+                left, right = allocate(), allocate()
+                first_child[index] = left
+                stack.append((node["left_child"], left, depth + 1))
+                stack.append((node["right_child"], right, depth + 1))
+
+        return cls(
+            feature=np.asarray(feature, dtype=np.intp),
+            threshold=np.asarray(threshold, dtype=np.float64),
+            first_child=np.asarray(first_child, dtype=np.intp),
+            nan_left=np.asarray(nan_left, dtype=bool),
+            zero_left=np.asarray(zero_left, dtype=bool) if zero_missing else None,
+            value=np.asarray(value, dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            transform=transform,
+            average_output=bool(dump.get("average_output", False)),
+        )
+
+    @classmethod
+    def stack(cls, forests: list) -> "FlatForest":
+        """
+        Join forests into one multi-output forest, so a single traversal of
+        the batch scores every model (e.g. one per quantile)
+        """
+        if len({(f.transform, f.average_output) for f in forests}) != 1:
+            raise ValueError("Stacked forests must share transform and averaging")
+        offsets = np.cumsum([0] + [len(f.feature) for f in forests[:-1]])
+        has_zero_missing = any(f.has_zero_missing for f in forests)
+        return cls(
+            feature=np.concatenate([f.feature for f in forests]),
+            threshold=np.concatenate([f.threshold for f in forests]),
+            first_child=np.concatenate([f.first_child + o for f, o in zip(forests, offsets)]),
+            nan_left=np.concatenate([f.nan_left for f in forests]),
+            # Nodes without a Zero missing type send zero the plain way
+            zero_left=np.concatenate([
+                f.zero_left if f.zero_left is not None else f.threshold >= 0.0 for f in forests
+            ]) if has_zero_missing else None,
+            value=np.concatenate([f.value for f in forests]),
+            roots=np.concatenate([f.roots + o for f, o in zip(forests, offsets)]),
+            max_depth=max(f.max_depth for f in forests),
+            transform=forests[0].transform,
+            average_output=forests[0].average_output,
+            output_starts=np.cumsum([0] + [len(f.roots) for f in forests[:-1]]),
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached by every (row, tree) pair, shape (n_rows, n_trees)"""
+        n_rows, n_features = X.shape
+        node = np.tile(self.roots, (n_rows, 1))
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        flat_X = X.ravel()
+
+        # One step per level for every (row, tree) pair; leaves loop in place
+        for _ in range(self.max_depth):
+            fval = flat_X[row_offset + self.feature[node]]
+            go_left = fval <= self.threshold[node]
+            is_nan = np.isnan(fval)
+            if is_nan.any():
+                go_left |= is_nan & self.nan_left[node]
+            if self.has_zero_missing:
+                is_zero = np.abs(fval) <= _ZERO_THRESHOLD
+                go_left = np.where(is_zero, self.zero_left[node], go_left)
+            node = self.first_child[node] + ~go_left
+        return node
+
+    def predict_raw(self, X, chunk_size: int = 8192) -> np.ndarray:
+        """Raw scores, shape (n_rows,) or (n_rows, n_outputs) when stacked"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.output_starts is None:
+            out = np.empty(len(X), dtype=np.float64)
+        else:
+            out = np.empty((len(X), len(self.output_starts)), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            leaf_values = self.value[self._leaves(X[start:start + chunk_size])]
+            if self.output_starts is None:
+                out[start:start + chunk_size] = leaf_values.sum(axis=1)
+            else:
+                out[start:start + chunk_size] = np.add.reduceat(leaf_values, self.output_starts, axis=1)
+        if self.average_output:
+            if self.output_starts is None:
+                out /= len(self.roots)
+            else:
+                out /= np.diff(np.append(self.output_starts, len(self.roots)))
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        raw = self.predict_raw(X)
+        return np.exp(raw) if self.transform == "exp" else raw
+
+
+class SmallBatchRouter:
+    """
+    Scores small batches with FlatForest and larger ones with the booster,
+    whose compiled predict wins once per-call overhead stops dominating.
+    """
+
+    def __init__(self, booster: lgb.Booster, max_numpy_batch: int = 32):
+        self.booster = booster
+        self.forest = FlatForest.from_booster(booster)
+        self.max_numpy_batch = max_numpy_batch
+
+    def predict(self, X) -> np.ndarray:
+        if len(X) <= self.max_numpy_batch:
+            return self.forest.predict(X)
+        return self.booster.predict(X)
@@ -0,0 +1,31 @@
+import pytest
+
+from src import artifacts
+from src.artifacts import load_artifacts
+
+
+@pytest.fixture
+def bundle_calls(monkeypatch):
+    calls = []
+
+    def load_bundle(bundle_dir=None):
+        calls.append(bundle_dir)
+        raise FileNotFoundError("no production pointer")
+
+    monkeypatch.setattr(artifacts, "load_bundle", load_bundle)
+    monkeypatch.setattr(artifacts, "load_legacy_model", lambda: "legacy model")
+    monkeypatch.setattr(artifacts, "load_legacy_scaler", lambda: "legacy scaler")
+    return calls
+
+
+def test_legacy_fallback_reads_the_bundle_once(bundle_calls):
+    loaded = load_artifacts()
+
+    assert bundle_calls == [None]
+    assert (loaded.model, loaded.scaler, loaded.version) == ("legacy model", "legacy scaler", None)
+
+
+def test_explicit_bundle_does_not_fall_back(bundle_calls):
+    with pytest.raises(FileNotFoundError):
+        load_artifacts("/models/v1")
+    assert bundle_calls == ["/models/v1"]
@@ -0,0 +1,86 @@
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import batch_scoring
+from src.batch_scoring import ForecastStore, run_batch_scoring
+from src.featurengineering import engineer_features_for_inference
+
+
+def _sales(n_products=12, days=30, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for p in range(n_products):
+        # Products stop selling on different days, so chunks have different newest rows
+        created_at = pd.Timestamp("2026-09-01") + pd.to_timedelta(np.arange(days - p), unit="D")
+        frames.append(pd.DataFrame({
+            "order_id": p * 1000 + np.arange(len(created_at)),
+            "created_at": created_at + pd.Timedelta(hours=int(rng.integers(0, 24))),
+            "product_name": f"prod_{p:02d}",
+            "marketplace_name": ["amz", "ebay", "etsy"][p % 3],
+            "quantity": rng.integers(1, 5, len(created_at)).astype(float),
+            "sales_price": rng.uniform(5, 50),
+            "sub_total": rng.gamma(2.0, 20.0, len(created_at)),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def bundle_dir(tmp_path_factory):
+    data = _sales()
+    features = engineer_features_for_inference(data.sort_values(["product_name", "created_at"]).copy())
+    X = features.to_numpy(dtype=float)
+    bundle_dir = tmp_path_factory.mktemp("bundle")
+    lgb.train({"objective": "regression", "verbose": -1, "min_data_in_leaf": 5},
+              lgb.Dataset(X, data["sub_total"].to_numpy()), num_boost_round=10
+              ).save_model(os.path.join(bundle_dir, "model.txt"))
+    np.save(os.path.join(bundle_dir, "scaler_mean.npy"), X.mean(axis=0))
+    np.save(os.path.join(bundle_dir, "scaler_scale.npy"), X.std(axis=0) + 1e-9)
+    with open(os.path.join(bundle_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "format": 2, "version": "test", "feature_names": list(features.columns), "model_file": "model.txt",
+            "scaler": "standard", "scaler_files": {"mean_": "scaler_mean.npy", "scale_": "scaler_scale.npy"},
+            "metrics": {},
+        }, f)
+    return str(bundle_dir)
+
+
+def _store_frame(path, products):
+    forecasts = ForecastStore(path).lookup(products)
+    return pd.DataFrame([{"product_name": product, **record}
+                         for product, records in sorted(forecasts.items()) for record in records])
+
+
+def test_chunking_does_not_change_forecasts(tmp_path, bundle_dir):
+    data = _sales()
+    products = sorted(data["product_name"].unique())
+    whole, single = str(tmp_path / "whole.sqlite"), str(tmp_path / "single.sqlite")
+
+    run_batch_scoring(data, horizon=4, out_path=whole, bundle_dir=bundle_dir, workers=1, chunk_products=1000)
+    meta = run_batch_scoring(data, horizon=4, out_path=single, bundle_dir=bundle_dir, workers=1, chunk_products=1)
+
+    expected = _store_frame(whole, products)
+    pd.testing.assert_frame_equal(_store_frame(single, products), expected)
+    assert meta["rows"] == len(expected) == 4 * len(products)
+    # Every product shares the run's forecast dates
+    assert expected.groupby("step")["forecast_date"].nunique().eq(1).all()
+
+
+def test_failed_run_leaves_no_partial_store(tmp_path, bundle_dir, monkeypatch):
+    out_path = str(tmp_path / "forecasts.sqlite")
+    run_batch_scoring(_sales(), horizon=2, out_path=out_path, bundle_dir=bundle_dir, workers=1)
+    published = ForecastStore(out_path).meta()
+
+    def failing_insert(conn, forecasts, value_columns):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(batch_scoring, "_insert", failing_insert)
+    with pytest.raises(RuntimeError):
+        run_batch_scoring(_sales(seed=1), horizon=3, out_path=out_path, bundle_dir=bundle_dir, workers=1)
+
+    assert os.listdir(tmp_path) == ["forecasts.sqlite"]
+    assert ForecastStore(out_path).meta() == published
@@ -0,0 +1,84 @@
+import asyncio
+
+import numpy as np
+
+from src.batching import MicroBatcher
+
+
+class _Recorder:
+    """run_batch that scores row i as 10 * X[i, 0] and records every call"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, artifacts, X):
+        self.calls.append((artifacts, len(X)))
+        if self.fail:
+            raise RuntimeError("scoring failed")
+        return np.column_stack([10 * X[:, 0], -X[:, 0]])
+
+
+def _request(start, n_rows):
+    return np.arange(start, start + n_rows, dtype=float).reshape(-1, 1)
+
+
+def test_results_are_split_per_request():
+    run_batch = _Recorder()
+    batcher = MicroBatcher(run_batch, max_wait_ms=50)
+    requests = [_request(0, 3), _request(100, 1), _request(200, 7)]
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("v1", X) for X in requests))
+
+    results = asyncio.run(main())
+    assert run_batch.calls == [("v1", 11)]
+    for X, scores in zip(requests, results):
+        assert scores.shape == (len(X), 2)
+        assert np.array_equal(scores[:, 0], 10 * X[:, 0])
+    assert batcher.stats()["batch_requests_max"] == 3
+
+
+def test_snapshots_are_never_mixed():
+    run_batch = _Recorder()
+    batcher = MicroBatcher(run_batch, max_wait_ms=50)
+    old, new = object(), object()
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit(old, _request(0, 2)),
+            batcher.submit(new, _request(10, 3)),
+            batcher.submit(old, _request(20, 4)),
+        )
+
+    results = asyncio.run(main())
+    assert sorted((id(a), n) for a, n in run_batch.calls) == sorted([(id(old), 6), (id(new), 3)])
+    assert np.array_equal(results[1][:, 0], [100, 110, 120])
+    assert np.array_equal(results[2][:, 0], [200, 210, 220, 230])
+
+
+def test_max_batch_size_splits_batches():
+    run_batch = _Recorder()
+    batcher = MicroBatcher(run_batch, max_batch_size=5, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("v1", _request(10 * i, 3)) for i in range(4)))
+
+    results = asyncio.run(main())
+    assert all(n <= 6 for _, n in run_batch.calls)
+    assert sum(n for _, n in run_batch.calls) == 12
+    for i, scores in enumerate(results):
+        assert np.array_equal(scores[:, 0], 10 * _request(10 * i, 3)[:, 0])
+
+
+def test_failure_reaches_every_request_of_the_batch():
+    batcher = MicroBatcher(_Recorder(fail=True), max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit("v1", _request(0, 2)), batcher.submit("v1", _request(5, 2)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import feature_cache
+from src.feature_cache import FeatureCache
+
+COLUMNS = ["order_id", "created_at", "product_name", "marketplace_name", "category", "sub_total"]
+START = pd.Timestamp("2026-01-01")
+
+
+def _rows(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Feature group stand-in: read_rows_since filters one in-memory frame"""
+    store = {"rows": _rows([
+        (i, START + pd.Timedelta(hours=i), f"p{i % 3}", "amz", "A" if i % 2 else None, float(i))
+        for i in range(12)
+    ])}
+
+    def read_rows_since(fs, name, version, since=None, columns=None):
+        rows = store["rows"]
+        return (rows if since is None else rows[rows["created_at"] > since]).copy()
+
+    monkeypatch.setattr(feature_cache, "read_rows_since", read_rows_since)
+    return store
+
+
+@pytest.fixture
+def cache(store):
+    cache = FeatureCache(None, "sales_record", days=3, overlap=3 * 3600)
+    cache.load()
+    return cache
+
+
+def _add(store, rows):
+    store["rows"] = pd.concat([store["rows"], _rows(rows)], ignore_index=True)
+
+
+def test_late_row_inside_overlap_is_merged(store, cache):
+    watermark = cache.snapshot().watermark
+    # Committed after the last refresh, but created an hour before the watermark
+    _add(store, [(100, watermark - pd.Timedelta(hours=1), "p0", "amz", "A", 5.0)])
+
+    assert cache.refresh() == 1
+    window = cache.snapshot()
+    p0 = window.rows("p0")
+    assert 100 in p0["order_id"].tolist()
+    assert len(p0) == 3
+    assert p0["created_at"].is_monotonic_increasing
+    # Late rows don't move the watermark
+    assert window.watermark == watermark
+
+
+def test_overlap_rereads_are_not_duplicated(store, cache):
+    _add(store, [(100, cache.snapshot().watermark + pd.Timedelta(hours=1), "p1", "amz", "A", 5.0)])
+    assert cache.refresh() == 1
+    frame = cache.snapshot().frame
+
+    # The next refresh reads the same rows again through the overlap
+    assert cache.refresh() == 0
+    pd.testing.assert_frame_equal(cache.snapshot().frame, frame)
+    assert not frame.duplicated(["product_name", "order_id"]).any()
+
+
+def test_reread_row_takes_the_fresh_copy(store, cache):
+    store["rows"].loc[store["rows"]["order_id"] == 11, "sub_total"] = 99.0
+    _add(store, [(100, cache.snapshot().watermark + pd.Timedelta(hours=1), "p2", "amz", "A", 5.0)])
+
+    cache.refresh()
+    p2 = cache.snapshot().rows("p2")
+    assert p2.loc[p2["order_id"] == 11, "sub_total"].tolist() == [99.0]
+
+
+def test_new_products_and_missing_categories_stay_categorical(store, cache):
+    untouched = cache.snapshot().rows("p1").reset_index(drop=True)
+    watermark = cache.snapshot().watermark
+    _add(store, [
+        (100, watermark + pd.Timedelta(hours=1), "p9", "ebay", None, 7.0),
+        (101, watermark + pd.Timedelta(hours=2), "p0", "amz", "B", 8.0),
+    ])
+
+    assert cache.refresh() == 2
+    window = cache.snapshot()
+    frame = window.frame
+    for col in ("product_name", "marketplace_name", "category"):
+        assert isinstance(frame[col].dtype, pd.CategoricalDtype)
+    assert frame["category"].cat.categories.tolist() == ["A", "B"]
+    assert frame["category"].isna().any()
+    assert window.products.tolist() == ["p0", "p1", "p2", "p9"]
+    assert window.rows_for(["p9", "missing"])["order_id"].tolist() == [100]
+    pd.testing.assert_frame_equal(window.rows("p1").reset_index(drop=True), untouched, check_categorical=False)
+    # Offsets still cover the frame exactly once
+    covered = np.concatenate([np.arange(start, stop) for start, stop in window.offsets.values()])
+    assert sorted(covered.tolist()) == list(range(len(frame)))
+
+
+def test_columns_follow_the_serving_model(store, monkeypatch):
+    reads = []
+    read = feature_cache.read_rows_since
+
+    def recording_read(fs, name, version, since=None, columns=None):
+        reads.append((since is None, columns))
+        rows = read(fs, name, version, since=since)
+        return rows[columns] if columns else rows
+
+    monkeypatch.setattr(feature_cache, "read_rows_since", recording_read)
+    needed = {"columns": ["order_id", "created_at", "product_name", "sub_total"]}
+    cache = FeatureCache(None, "sales_record", days=3, overlap=3 * 3600, columns=lambda: needed["columns"])
+    cache.load()
+    watermark = cache.snapshot().watermark
+
+    # Same columns: incremental read with the current projection
+    _add(store, [(100, watermark + pd.Timedelta(hours=1), "p0", "amz", "A", 5.0)])
+    assert cache.refresh() == 1
+    # A newly swapped model needs category: full reload with the wider projection
+    needed["columns"] = needed["columns"] + ["category"]
+    cache.refresh()
+
+    assert reads == [(True, ["order_id", "created_at", "product_name", "sub_total"]),
+                     (False, ["order_id", "created_at", "product_name", "sub_total"]),
+                     (True, ["order_id", "created_at", "product_name", "sub_total", "category"])]
+    assert "category" in cache.snapshot().frame.columns
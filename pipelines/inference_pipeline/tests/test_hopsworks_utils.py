@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.hopsworks_utils import latest_rows_per_product
+
+
+def _reference(df, n):
+    return df.sort_values("created_at", kind="stable").groupby("product_name").tail(n)
+
+
+def _rows(n_products=50, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for p in range(n_products):
+        # Mix of evenly spaced, bursty and very short histories
+        size = int(rng.choice([1, 3, 40, 200]))
+        offsets = np.sort(rng.choice(10**7, size=size, replace=False))
+        if p % 4 == 0:
+            offsets[-min(size, 5):] = offsets[-1] + np.arange(min(size, 5))
+        frames.append(pd.DataFrame({
+            "product_name": f"prod_{p}",
+            "created_at": pd.Timestamp("2025-01-01") + pd.to_timedelta(np.unique(offsets), unit="s"),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df["sub_total"] = rng.normal(size=len(df))
+    # Shuffled, as rows come back from the feature store
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("n", [1, 5, 25, 500])
+def test_matches_sort_and_tail(n):
+    df = _rows()
+    result = latest_rows_per_product(df, n)
+    expected = _reference(df, n)
+    assert sorted(result.index) == sorted(expected.index)
+    # Rows keep the input order
+    assert result.index.is_monotonic_increasing
+
+
+def test_empty_frame():
+    df = _rows().iloc[:0]
+    assert latest_rows_per_product(df, 5).empty
+
+
+def test_tz_aware_created_at():
+    df = _rows()
+    df["created_at"] = df["created_at"].dt.tz_localize("UTC").dt.tz_convert("Europe/Berlin")
+    result = latest_rows_per_product(df, 5)
+    assert sorted(result.index) == sorted(_reference(df, 5).index)
+    assert str(result["created_at"].dt.tz) == "Europe/Berlin"
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from src.featurengineering import engineer_features_for_inference
+from src.horizon import forecast_horizon
+
+
+def _raw(tz=None):
+    created_at = pd.to_datetime(["2026-10-01 10:00", "2026-10-05 13:00", "2026-09-20 08:00"])
+    return pd.DataFrame({
+        "order_id": [1, 2, 3],
+        "created_at": created_at.tz_localize(tz) if tz else created_at,
+        "product_name": ["kettle", "kettle", "toaster"],
+        "marketplace_name": ["amz", "amz", "ebay"],
+        "sub_total": [10.0, 20.0, 30.0],
+        "quantity": [1, 2, 3],
+        "sales_price": [10.0, 10.0, 10.0],
+    })
+
+
+class _DayOfWeek:
+    """Predicts the (unscaled) day_of_week feature, exposing the forecast calendar"""
+
+    def __init__(self, column):
+        self.column = column
+
+    def predict(self, X):
+        return np.asarray(X)[:, self.column]
+
+
+def _identity_scaler(feature_names):
+    scaler = StandardScaler()
+    scaler.mean_ = np.zeros(len(feature_names))
+    scaler.scale_ = np.ones(len(feature_names))
+    scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    return scaler
+
+
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_every_product_starts_at_the_watermark_day(tz):
+    raw = _raw(tz)
+    feature_names = list(engineer_features_for_inference(raw.copy()).columns)
+    model = _DayOfWeek(feature_names.index("day_of_week"))
+
+    forecasts = forecast_horizon(model, _identity_scaler(feature_names), raw, horizon=3)
+
+    # The watermark is 2026-10-05 13:00, so step 1 is 2026-10-06 for both products,
+    # including the toaster last seen on 2026-09-20
+    expected = pd.to_datetime(["2026-10-06", "2026-10-07", "2026-10-08"])
+    for _, group in forecasts.groupby("product_name"):
+        dates = pd.DatetimeIndex(group.sort_values("step")["forecast_date"])
+        assert (dates.tz_localize(None) if tz else dates).equals(expected)
+        assert group.sort_values("step")["predicted_sales"].tolist() == list(expected.dayofweek)
+
+
+def test_explicit_origin_is_normalised():
+    raw = _raw()
+    feature_names = list(engineer_features_for_inference(raw.copy()).columns)
+
+    forecasts = forecast_horizon(_DayOfWeek(0), _identity_scaler(feature_names), raw, horizon=2,
+                                 origin="2026-11-01 17:30")
+
+    assert set(forecasts["forecast_date"]) == set(pd.to_datetime(["2026-11-02", "2026-11-03"]))
@@ -0,0 +1,57 @@
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.model_utils import resolve_bundle
+from src.model_watcher import ModelWatcher
+
+
+def _write_bundle(model_dir, version):
+    bundle_dir = os.path.join(model_dir, version)
+    os.makedirs(bundle_dir)
+    X = np.random.default_rng(0).normal(size=(100, 2))
+    lgb.train({"objective": "regression", "verbose": -1, "min_data_in_leaf": 5},
+              lgb.Dataset(X, X[:, 0]), num_boost_round=3).save_model(os.path.join(bundle_dir, "model.txt"))
+    np.save(os.path.join(bundle_dir, "scaler_mean.npy"), np.zeros(2))
+    np.save(os.path.join(bundle_dir, "scaler_scale.npy"), np.ones(2))
+    with open(os.path.join(bundle_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "format": 2, "version": version, "feature_names": ["a", "b"], "model_file": "model.txt",
+            "scaler": "standard", "scaler_files": {"mean_": "scaler_mean.npy", "scale_": "scaler_scale.npy"},
+            "metrics": {},
+        }, f)
+
+
+def _point(model_dir, stage, version):
+    with open(os.path.join(model_dir, stage), "w") as f:
+        f.write(version)
+
+
+def test_latest_pointer_is_never_served(tmp_path):
+    model_dir = str(tmp_path)
+    _write_bundle(model_dir, "unapproved")
+    _point(model_dir, "latest", "unapproved")
+    swapped = []
+    watcher = ModelWatcher(swapped.append, model_dir=model_dir)
+
+    with pytest.raises(FileNotFoundError):
+        resolve_bundle(model_dir, version=None)
+    assert not watcher.check()
+    assert swapped == []
+
+
+def test_watcher_follows_production(tmp_path):
+    model_dir = str(tmp_path)
+    for version in ("approved", "unapproved"):
+        _write_bundle(model_dir, version)
+    _point(model_dir, "production", "approved")
+    _point(model_dir, "latest", "unapproved")
+    swapped = []
+    watcher = ModelWatcher(swapped.append, model_dir=model_dir)
+
+    assert resolve_bundle(model_dir, version=None) == os.path.join(model_dir, "approved")
+    assert watcher.check()
+    assert [bundle["version"] for bundle in swapped] == ["approved"]
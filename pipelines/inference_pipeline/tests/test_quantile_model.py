@@ -0,0 +1,32 @@
+import lightgbm as lgb
+import numpy as np
+
+from src.quantile_model import QuantileModel
+
+
+def _boosters():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 3))
+    y = 10 * X[:, 0] + rng.normal(scale=5.0, size=len(X))
+    return X, {
+        alpha: lgb.train({"objective": "quantile", "alpha": alpha, "verbosity": -1, "num_leaves": 15},
+                         lgb.Dataset(X, y), num_boost_round=20)
+        for alpha in (0.9, 0.1, 0.5)
+    }
+
+
+def test_levels_sorted_and_engines_agree():
+    X, boosters = _boosters()
+    lightgbm = QuantileModel(boosters, engine="lightgbm")
+    numpy = QuantileModel(boosters, engine="numpy")
+
+    assert lightgbm.labels == ["p10", "p50", "p90"]
+    np.testing.assert_allclose(numpy.predict(X[:200]), lightgbm.predict(X[:200]), rtol=1e-9, atol=1e-9)
+
+
+def test_intervals_never_cross():
+    X, boosters = _boosters()
+    preds = QuantileModel(boosters).predict(X * 50)
+
+    assert preds.shape == (len(X), 3)
+    assert (np.diff(preds, axis=1) >= 0).all()
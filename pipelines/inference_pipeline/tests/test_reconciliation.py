@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reconciliation import UNKNOWN_LEVEL, build_hierarchy, mint_shrink, reconcile, shrinkage_lambda
+
+
+def _keys(n_products=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "marketplace_name": rng.choice(["amz", "ebay"], n_products),
+        "category": rng.choice(["A", "B", "C"], n_products),
+        "sub_category": rng.choice(["x", "y"], n_products),
+        "sub_sub_category": rng.choice(["p", "q"], n_products),
+        "product_name": [f"prod_{i}" for i in range(n_products)],
+    })
+
+
+def _dense_shrinkage_lambda(E):
+    """hts' shrink.estim with n x n matrices"""
+    T = E.shape[0]
+    cov = E.T @ E / T
+    xs = E / np.sqrt(np.diag(cov))
+    v = (xs ** 2).T @ (xs ** 2) - (xs.T @ xs) ** 2 / T
+    v /= T * (T - 1)
+    np.fill_diagonal(v, 0)
+    corr = cov / np.sqrt(np.outer(np.diag(cov), np.diag(cov)))
+    np.fill_diagonal(corr, 0)
+    return min(1.0, max(0.0, v.sum() / (corr ** 2).sum())), cov
+
+
+def _dense_mint_shrink(S, y_hat, E):
+    """S (S' W^-1 S)^-1 S' W^-1 y_hat with the shrunk covariance formed"""
+    lam, cov = _dense_shrinkage_lambda(E)
+    W = lam * np.diag(np.diag(cov)) + (1 - lam) * cov
+    W_inv = np.linalg.inv(W)
+    return S @ np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv @ y_hat), lam
+
+
+def _problem(n_products=30, T=80, seed=2):
+    hierarchy = build_hierarchy(_keys(n_products, seed))
+    rng = np.random.default_rng(seed)
+    truth = hierarchy.aggregate(rng.gamma(2.0, 10.0, hierarchy.n_bottom))
+    y_hat = truth * rng.normal(1.0, 0.1, hierarchy.n_nodes)
+    # Correlated residuals: bottom noise summed up the tree plus node noise
+    bottom_noise = rng.normal(size=(T, hierarchy.n_bottom))
+    E = (hierarchy.S @ bottom_noise.T).T + rng.normal(scale=0.5, size=(T, hierarchy.n_nodes))
+    return hierarchy, y_hat, E
+
+
+def test_shrinkage_lambda_matches_dense():
+    _, _, E = _problem()
+    assert shrinkage_lambda(E) == pytest.approx(_dense_shrinkage_lambda(E)[0], rel=1e-10)
+
+
+def test_mint_shrink_matches_dense_solution():
+    hierarchy, y_hat, E = _problem()
+    expected, expected_lam = _dense_mint_shrink(hierarchy.S.toarray(), y_hat, E)
+
+    reconciled, lam = mint_shrink(hierarchy, y_hat, E, tol=1e-12)
+    assert lam == pytest.approx(expected_lam, rel=1e-10)
+    assert np.allclose(reconciled, expected, rtol=1e-6, atol=1e-6)
+    assert np.allclose(hierarchy.aggregate(reconciled[-hierarchy.n_bottom:]), reconciled, atol=1e-6)
+
+
+def test_mint_shrink_multiple_horizons():
+    hierarchy, y_hat, E = _problem()
+    Y = np.column_stack([y_hat, 2 * y_hat])
+    reconciled, _ = mint_shrink(hierarchy, Y, E, tol=1e-12)
+    assert reconciled.shape == Y.shape
+    assert np.allclose(reconciled[:, 1], 2 * reconciled[:, 0], rtol=1e-6)
+
+
+def test_null_levels_become_unknown_nodes():
+    keys = _keys()
+    keys.loc[3, "sub_sub_category"] = np.nan
+    keys.loc[7, "category"] = None
+    hierarchy = build_hierarchy(keys)
+
+    assert hierarchy.n_bottom == len(keys)
+    # Every bottom series sums into exactly one node per level
+    assert (np.asarray(hierarchy.S.sum(axis=0)).ravel() == 6).all()
+    assert hierarchy.node_codes.min() >= 0
+    assert UNKNOWN_LEVEL in set(hierarchy.bottom["sub_sub_category"])
+    assert UNKNOWN_LEVEL in set(hierarchy.bottom["category"])
+    y = np.arange(hierarchy.n_bottom, dtype=float)
+    assert hierarchy.aggregate(y)[0] == pytest.approx(y.sum())
+
+
+def test_null_categorical_level_reconciles():
+    keys = _keys()
+    keys["sub_sub_category"] = keys["sub_sub_category"].astype("category")
+    keys.loc[0, "sub_sub_category"] = np.nan
+    hierarchy = build_hierarchy(keys)
+
+    y_hat = np.random.default_rng(1).gamma(2.0, 10.0, hierarchy.n_nodes)
+    for method in ("bottom_up", "top_down"):
+        coherent = reconcile(hierarchy, y_hat, method=method)
+        assert np.allclose(hierarchy.aggregate(coherent[-hierarchy.n_bottom:]), coherent)
@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+
+from src import feature_cache
+from src.feature_cache import FeatureCache
+from src.result_cache import CachedResponse, ResultCache
+
+
+def _entry(size=100, fill=b"x"):
+    return CachedResponse(fill * size, "application/json")
+
+
+def test_generation_switch_drops_entries():
+    cache = ResultCache(max_bytes=10_000)
+    cache.get(("v1", "w1"), "a")
+    cache.put(("v1", "w1"), "a", _entry())
+    assert cache.get(("v1", "w1"), "a") == _entry()
+
+    # New feature window: everything cached for the old one is gone
+    assert cache.get(("v1", "w2"), "a") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_put_for_an_old_generation_is_ignored():
+    cache = ResultCache(max_bytes=10_000)
+    cache.get(("v1", "w1"), "a")
+    cache.get(("v2", "w1"), "b")
+    # A response computed under v1 finishing after the swap to v2
+    cache.put(("v1", "w1"), "a", _entry())
+    assert cache.get(("v2", "w1"), "a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResultCache(max_bytes=250)
+    generation = ("v1", "w1")
+    cache.get(generation, "a")
+    for key in "abc":
+        cache.put(generation, key, _entry())
+    assert cache.get(generation, "a") is None
+    assert cache.get(generation, "c") is not None
+    assert cache.stats()["bytes"] == 200
+
+
+def test_spill_is_private_and_dropped_on_switch(tmp_path):
+    unrelated = tmp_path / "keep.txt"
+    unrelated.write_text("not the cache's")
+    cache = ResultCache(max_bytes=150, spill_dir=str(tmp_path), spill_max_bytes=10_000)
+    assert os.path.dirname(cache.spill_dir) == str(tmp_path)
+
+    generation = ("v1", "w1")
+    cache.get(generation, "a")
+    cache.put(generation, "a", _entry(fill=b"a"))
+    cache.put(generation, "b", _entry(fill=b"b"))
+    assert len(os.listdir(cache.spill_dir)) == 1
+    assert cache.get(generation, "a") == _entry(fill=b"a")
+    assert cache.stats()["disk_hits"] == 1
+
+    cache.get(("v2", "w1"), "a")
+    assert os.listdir(cache.spill_dir) == []
+    assert cache.stats()["disk_entries"] == 0
+    assert unrelated.read_text() == "not the cache's"
+
+
+def test_late_row_invalidates_without_moving_the_watermark(monkeypatch):
+    rows = pd.DataFrame({
+        "order_id": range(6),
+        "created_at": pd.Timestamp("2026-01-01") + pd.to_timedelta(range(6), unit="h"),
+        "product_name": ["p0", "p1"] * 3,
+        "sub_total": [float(i) for i in range(6)],
+    })
+    store = {"rows": rows}
+    monkeypatch.setattr(feature_cache, "read_rows_since", lambda fs, name, version, since=None, columns=None: (
+        store["rows"] if since is None else store["rows"][store["rows"]["created_at"] > since]
+    ).copy())
+    features = FeatureCache(None, "sales_record", days=5, overlap=3 * 3600)
+    window = features.load()
+    cache = ResultCache(max_bytes=10_000)
+    cache.get(("v1", window.revision), "a")
+    cache.put(("v1", window.revision), "a", _entry())
+
+    # Refresh with nothing new keeps the window, and the cached response
+    assert features.refresh() == 0
+    assert cache.get(("v1", features.snapshot().revision), "a") == _entry()
+
+    # A late row lands an hour before the watermark
+    late = pd.DataFrame({"order_id": [100], "created_at": [window.watermark - pd.Timedelta(hours=1)],
+                         "product_name": ["p0"], "sub_total": [9.0]})
+    store["rows"] = pd.concat([rows, late], ignore_index=True)
+    assert features.refresh() == 1
+    refreshed = features.snapshot()
+
+    assert refreshed.watermark == window.watermark
+    assert refreshed.revision != window.revision
+    assert cache.get(("v1", refreshed.revision), "a") is None
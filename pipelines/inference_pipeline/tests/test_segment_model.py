@@ -0,0 +1,75 @@
+import json
+import os
+from types import SimpleNamespace
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from src.model_utils import load_bundle
+from src.predictor import score_features, segment_labels
+from src.segment_model import SegmentRoutedModel
+
+
+class _Constant:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value, dtype=np.float64)
+
+
+def _routed():
+    return SegmentRoutedModel("marketplace_name", {"amz": _Constant(1.0), "ebay": _Constant(2.0)}, _Constant(-1.0))
+
+
+def test_rows_go_to_their_segment_model_others_to_global():
+    X = np.zeros((5, 3))
+    segments = np.array(["amz", "ebay", "etsy", None, "amz"], dtype=object)
+
+    assert _routed().predict(X, segments).tolist() == [1.0, 2.0, -1.0, -1.0, 1.0]
+
+
+def test_without_segments_every_row_uses_global():
+    assert _routed().predict(np.zeros((3, 3))).tolist() == [-1.0, -1.0, -1.0]
+
+
+def test_score_features_routes_by_raw_segment_column():
+    artifacts = SimpleNamespace(model=_Constant(-1.0), segment_model=_routed(), quantile_model=None)
+    raw = pd.DataFrame({"marketplace_name": ["ebay", "walmart"]})
+
+    scores = score_features(artifacts, np.zeros((2, 3)), segment_labels(artifacts, raw))
+    assert scores[:, 0].tolist() == [2.0, -1.0]
+    # Frames without the segment column fall back to the global model
+    assert segment_labels(artifacts, raw.drop(columns="marketplace_name")) is None
+
+
+def _booster(X, y):
+    return lgb.train({"objective": "regression", "verbose": -1, "min_data_in_leaf": 5},
+                     lgb.Dataset(X, y), num_boost_round=5)
+
+
+def test_bundle_segments_load_as_routed_model(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 2))
+    global_booster = _booster(X, X[:, 0])
+    local_booster = _booster(X, 100 + X[:, 0])
+    global_booster.save_model(os.path.join(tmp_path, "model.txt"))
+    local_booster.save_model(os.path.join(tmp_path, "segment_000.txt"))
+    np.save(os.path.join(tmp_path, "scaler_mean.npy"), np.zeros(2))
+    np.save(os.path.join(tmp_path, "scaler_scale.npy"), np.ones(2))
+    with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+        json.dump({
+            "format": 2, "version": "v1", "feature_names": ["a", "b"], "model_file": "model.txt",
+            "scaler": "standard", "scaler_files": {"mean_": "scaler_mean.npy", "scale_": "scaler_scale.npy"},
+            "metrics": {}, "quantiles": {},
+            "segments": {"column": "marketplace_name", "models": {"amz": "segment_000.txt"}},
+        }, f)
+
+    bundle = load_bundle(str(tmp_path))
+    routed = bundle["segment_model"]
+    preds = routed.predict(X[:4], np.array(["amz", "ebay", "amz", None], dtype=object))
+
+    assert routed.column == "marketplace_name"
+    np.testing.assert_allclose(preds[[0, 2]], local_booster.predict(X[[0, 2]]))
+    np.testing.assert_allclose(preds[[1, 3]], global_booster.predict(X[[1, 3]]))
@@ -0,0 +1,86 @@
+import io
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src import serialization
+from src.predictor import predict_payload, prediction_frame
+from src.serialization import dumps, encode_frame, ndjson_lines
+
+PAYLOAD = {
+    "kettle": [{
+        "created_at": pd.Timestamp("2026-10-01 10:00"),
+        "predicted_sales": np.float32(1.5),
+        "predicted_p10": float("nan"),
+        "predicted_p90": np.float64("inf"),
+        "quantity": np.int64(3),
+        "history": np.array([1.0, np.nan]),
+    }],
+    7: [],
+}
+EXPECTED = {
+    "kettle": [{
+        "created_at": "2026-10-01T10:00:00",
+        "predicted_sales": 1.5,
+        "predicted_p10": None,
+        "predicted_p90": None,
+        "quantity": 3,
+        "history": [1.0, None],
+    }],
+    "7": [],
+}
+
+
+def test_orjson_writes_nan_as_null():
+    assert serialization.orjson is not None
+    assert json.loads(dumps(PAYLOAD)) == EXPECTED
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(dumps(PAYLOAD)) == EXPECTED
+
+
+def test_ndjson_one_line_per_product():
+    lines = list(ndjson_lines({"kettle": [{"predicted_sales": float("nan")}], "toaster": []}))
+
+    assert [json.loads(line) for line in lines] == [
+        {"product_name": "kettle", "records": [{"predicted_sales": None}]},
+        {"product_name": "toaster", "records": []},
+    ]
+    assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+
+
+def test_columnar_formats_round_trip():
+    frame = pd.DataFrame({"product_name": ["kettle", "toaster"], "predicted_sales": [1.0, np.nan]})
+
+    arrow = pa.ipc.open_stream(encode_frame(frame, "arrow")).read_all().to_pandas()
+    parquet = pq.read_table(io.BytesIO(encode_frame(frame, "parquet"))).to_pandas()
+
+    pd.testing.assert_frame_equal(arrow, frame)
+    pd.testing.assert_frame_equal(parquet, frame)
+    with pytest.raises(ValueError):
+        encode_frame(frame, "csv")
+
+
+def test_empty_page_has_the_full_schema():
+    artifacts = SimpleNamespace(quantile_model=SimpleNamespace(labels=["p10", "p90"]))
+    empty = pd.DataFrame({
+        "order_id": pd.Series(dtype="int64"),
+        "created_at": pd.Series(dtype="datetime64[ns]"),
+        "product_name": pd.Series(dtype=object),
+        "sub_total": pd.Series(dtype="float64"),
+    })
+
+    frame = prediction_frame(artifacts, empty)
+
+    assert frame.empty
+    assert list(frame.columns) == ["product_name", "created_at", "actual_sales", "order_id",
+                                   "predicted_sales", "predicted_p10", "predicted_p90"]
+    assert predict_payload(artifacts, empty) == {}
+    assert pa.ipc.open_stream(encode_frame(frame, "arrow")).read_all().num_rows == 0
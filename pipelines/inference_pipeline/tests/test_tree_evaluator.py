@@ -0,0 +1,73 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.tree_evaluator import FlatForest, SmallBatchRouter
+
+
+def _data(n_rows=2000, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.05] = 0.0
+    y = np.nan_to_num(X[:, 0]) * 3 + np.nan_to_num(X[:, 1]) ** 2 + rng.normal(size=n_rows)
+    return X, y
+
+
+def _booster(X, y, **params):
+    return lgb.train({"verbosity": -1, "num_leaves": 15, **params}, lgb.Dataset(X, label=y), num_boost_round=40)
+
+
+@pytest.mark.parametrize("params", [
+    {"objective": "regression"},
+    {"objective": "quantile", "alpha": 0.9},
+    {"objective": "regression", "zero_as_missing": True},
+    {"objective": "regression", "boosting": "rf", "bagging_fraction": 0.8, "bagging_freq": 1},
+])
+def test_matches_booster_predict(params):
+    X, y = _data()
+    booster = _booster(X, y, **params)
+    forest = FlatForest.from_booster(booster)
+    X_new, _ = _data(500, seed=1)
+    assert np.allclose(forest.predict(X_new), booster.predict(X_new), rtol=1e-9, atol=1e-9)
+
+
+def test_exp_objective_matches_booster_predict():
+    X, y = _data()
+    booster = _booster(X, np.abs(y) + 0.1, objective="poisson")
+    forest = FlatForest.from_booster(booster)
+    assert np.allclose(forest.predict(X[:300]), booster.predict(X[:300]), rtol=1e-9)
+
+
+def test_stacked_forests_score_every_booster():
+    X, y = _data()
+    boosters = [_booster(X, y, objective="quantile", alpha=a) for a in (0.1, 0.5, 0.9)]
+    stacked = FlatForest.stack([FlatForest.from_booster(b) for b in boosters])
+    expected = np.column_stack([b.predict(X[:200]) for b in boosters])
+    assert np.allclose(stacked.predict(X[:200]), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_router_single_row():
+    X, y = _data()
+    booster = _booster(X, y)
+    router = SmallBatchRouter(booster, max_numpy_batch=4)
+    assert np.allclose(router.predict(X[:1]), booster.predict(X[:1]))
+    assert np.allclose(router.predict(X[:100]), booster.predict(X[:100]))
+
+
+def test_unsupported_booster_raises_value_error():
+    X, y = _data()
+    booster = _booster(X, (y > 0).astype(int), objective="binary")
+    with pytest.raises(ValueError, match="not supported"):
+        FlatForest.from_booster(booster)
+
+
+def test_model_utils_falls_back_to_lightgbm_engine(monkeypatch):
+    from src import model_utils
+
+    X, y = _data()
+    booster = _booster(X, (y > 0).astype(int), objective="binary")
+    monkeypatch.setattr(model_utils, "PREDICT_ENGINE", "numpy")
+    assert model_utils._with_engine(booster) is booster
+    regression = _booster(X, y)
+    assert isinstance(model_utils._with_engine(regression), FlatForest)
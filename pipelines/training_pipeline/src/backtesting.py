@@ -0,0 +1,208 @@
+# src/backtesting.py
+"""
+Rolling-origin backtests: the model is retrained at K cutoffs and scored on
+the days right after each one, with all cutoffs fitted in parallel on
+subsets of one binned lgb.Dataset.
+
+Features are engineered once for the whole history; every test row keeps
+its real lag values, so a horizon of h days measures how a model ages h
+days after its cutoff, not a recursive multi-step forecast.
+
+Usage:
+    python -m src.backtesting --cutoffs 4 --horizon-days 7 --window expanding
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.evaluation_engine import segment_metrics
+from src.resources import split_thread_budget
+from src.tuning import build_dataset, to_native_params
+
+logger = logging.getLogger(__name__)
+
+_DAY = pd.Timedelta(days=1)
+
+
+def rolling_origin_splits(timestamps, n_cutoffs: int = 4, horizon_days: int = 7, step_days: int = None,
+                          window: str = "expanding", train_days: int = None) -> list:
+    """
+    Train/test row ranges for K forecast origins over time-sorted rows
+
+    Args:
+        timestamps: Row timestamps, sorted oldest to newest
+        n_cutoffs: Number of forecast origins (K)
+        horizon_days: Days scored after each cutoff
+        step_days: Days between consecutive cutoffs, defaults to horizon_days
+        window: "expanding" trains on all history before the cutoff,
+            "rolling" on the last train_days only
+        train_days: Length of the rolling training window
+
+    Returns:
+        List of (cutoff, train_rows, test_rows) with contiguous row slices,
+        oldest cutoff first; cutoffs without training or test rows are skipped
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown window: {window}")
+    if window == "rolling" and not train_days:
+        raise ValueError("A rolling window needs train_days")
+
+    ts = pd.to_datetime(pd.Series(timestamps)).to_numpy()
+    step = (step_days or horizon_days) * _DAY
+    last_cutoff = pd.Timestamp(ts[-1]).normalize() - (horizon_days - 1) * _DAY
+
+    splits = []
+    for k in reversed(range(n_cutoffs)):
+        cutoff = last_cutoff - k * step
+        test_start = np.searchsorted(ts, cutoff.to_datetime64(), side="left")
+        test_end = np.searchsorted(ts, (cutoff + horizon_days * _DAY).to_datetime64(), side="left")
+        train_start = 0
+        if window == "rolling":
+            train_start = np.searchsorted(ts, (cutoff - train_days * _DAY).to_datetime64(), side="left")
+        if test_start <= train_start or test_end <= test_start:
+            logger.warning(f"Skipping cutoff {cutoff.date()}: no training or test rows")
+            continue
+        splits.append((cutoff, slice(train_start, test_start), slice(test_start, test_end)))
+    return splits
+
+
+def _fit_and_score(train_set, X_test, native, num_boost_round):
+    start = time.perf_counter()
+    booster = lgb.train(native, train_set, num_boost_round=num_boost_round)
+    return booster.predict(X_test), time.perf_counter() - start
+
+
+def run_backtest(X, y, meta: pd.DataFrame, params: dict = None, n_cutoffs: int = 4, horizon_days: int = 7,
+                 step_days: int = None, window: str = "expanding", train_days: int = None,
+                 segment_cols=("marketplace_name", "category"), cpu_budget: int = 0) -> dict:
+    """
+    Retrain at each cutoff in parallel and score the following horizon
+
+    Args:
+        X: Engineered feature matrix, rows ordered oldest to newest
+        y: Target values aligned with X
+        meta: Row-aligned identifiers with created_at (engineer_features
+            with return_meta=True)
+        params: sklearn-style LGBMRegressor params (e.g. best_params)
+        n_cutoffs, horizon_days, step_days, window, train_days: see
+            rolling_origin_splits
+        segment_cols: meta columns to break the metrics down by
+        cpu_budget: Cores to use, 0 for all available
+
+    Returns:
+        Dictionary with 'predictions' (one row per scored row), 'metrics'
+        (segment_metrics rows for cutoff, horizon_day, each segment column
+        and each segment x horizon_day) and 'fits' (per-cutoff timings)
+    """
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=float)
+    splits = rolling_origin_splits(meta["created_at"], n_cutoffs, horizon_days, step_days, window, train_days)
+    if not splits:
+        raise ValueError("No usable cutoffs for this history and horizon")
+
+    outer, inner = split_thread_budget(budget=cpu_budget, n_tasks=len(splits))
+    native, num_boost_round = to_native_params(dict(params or {}))
+    native["num_threads"] = inner
+
+    # Bin once; every cutoff trains on a subset that reuses the bin mappers
+    full_set = build_dataset(X, y)
+    train_sets = [
+        full_set.subset(np.arange(train.start, train.stop)).construct()
+        for _, train, _ in splits
+    ]
+    logger.info(f"Backtesting {len(splits)} cutoffs ({window} window): {outer} jobs x {inner} threads")
+    outputs = Parallel(n_jobs=outer, prefer="threads")(
+        delayed(_fit_and_score)(train_set, X[test], native, num_boost_round)
+        for train_set, (_, _, test) in zip(train_sets, splits)
+    )
+
+    frames, fits = [], []
+    for (cutoff, train, test), (y_pred, seconds) in zip(splits, outputs):
+        test_meta = meta.iloc[test].reset_index(drop=True)
+        created_at = pd.to_datetime(test_meta["created_at"])
+        frame = pd.DataFrame({
+            "cutoff": cutoff,
+            "created_at": created_at,
+            "horizon_day": ((created_at - cutoff) // _DAY).astype(int) + 1,
+            "y_true": y[test],
+            "y_pred": y_pred,
+        })
+        for col in segment_cols:
+            if col in test_meta.columns:
+                frame[col] = test_meta[col].to_numpy()
+        frames.append(frame)
+        fits.append({
+            "cutoff": cutoff,
+            "train_rows": train.stop - train.start,
+            "test_rows": test.stop - test.start,
+            "seconds": round(seconds, 2),
+        })
+    predictions = pd.concat(frames, ignore_index=True)
+
+    segments = {
+        "cutoff": predictions["cutoff"].dt.strftime("%Y-%m-%d"),
+        "horizon_day": predictions["horizon_day"],
+    }
+    for col in segment_cols:
+        if col in predictions.columns:
+            segments[col] = predictions[col]
+            segments[f"{col}_x_horizon_day"] = (
+                predictions[col].astype(str) + " | h" + predictions["horizon_day"].astype(str)
+            )
+    metrics = segment_metrics(predictions["y_true"], predictions["y_pred"], segments)
+
+    return {"predictions": predictions, "metrics": metrics, "fits": pd.DataFrame(fits)}
+
+
+def main():
+    from dotenv import load_dotenv
+
+    from src.config import TRAINING_CONFIG
+    from src.feature_engineering import engineer_features
+    from src.hopsworks_config import get_sales_data, init_hopsworks
+    from src.model_registry import LocalModelRegistry
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cutoffs", type=int, default=4)
+    parser.add_argument("--horizon-days", type=int, default=7)
+    parser.add_argument("--step-days", type=int, default=None)
+    parser.add_argument("--window", choices=["expanding", "rolling"], default="expanding")
+    parser.add_argument("--train-days", type=int, default=None)
+    parser.add_argument("--out-dir", default=os.path.join(TRAINING_CONFIG["model_dir"], "backtest"))
+    args = parser.parse_args()
+
+    load_dotenv()
+    _, fs = init_hopsworks(
+        api_key=os.environ["HOPSWORKS_API_KEY"],
+        project_name=os.environ["HOPSWORKS_PROJECT_NAME"]
+    )
+    X, y, _, _, meta = engineer_features(get_sales_data(fs), return_meta=True)
+
+    # Backtest the production model's hyperparameters when there is one
+    registry = LocalModelRegistry(TRAINING_CONFIG["registry_dir"], TRAINING_CONFIG["model_name"])
+    params = registry.load()["params"] if registry.versions() else {}
+
+    results = run_backtest(
+        X, y, meta, params=params, n_cutoffs=args.cutoffs, horizon_days=args.horizon_days,
+        step_days=args.step_days, window=args.window, train_days=args.train_days,
+        cpu_budget=TRAINING_CONFIG["cpu_budget"],
+    )
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name in ("predictions", "metrics", "fits"):
+        results[name].to_csv(os.path.join(args.out_dir, f"{name}.csv"), index=False)
+
+    print(results["fits"].to_string(index=False))
+    by_horizon = results["metrics"][results["metrics"]["segment_type"] == "horizon_day"]
+    print(by_horizon[["segment", "n", "rmse", "mae", "bias"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
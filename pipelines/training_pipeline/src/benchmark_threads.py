@@ -0,0 +1,77 @@
+# src/benchmark_threads.py
+"""
+Trial throughput for different (outer jobs x LightGBM threads) splits.
+
+Usage:
+    python -m src.benchmark_threads --rows 200000 --features 20 --trials 24
+"""
+
+import argparse
+import time
+
+import lightgbm as lgb
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.resources import available_cpus
+from src.tuning import build_dataset
+
+
+def candidate_splits(budget: int) -> list:
+    """Every (outer, inner) pair with outer * inner == budget"""
+    return [(outer, budget // outer) for outer in range(1, budget + 1) if budget % outer == 0]
+
+
+def _trial(dataset, num_threads, seed, rounds):
+    params = {
+        "objective": "regression",
+        "num_leaves": 31,
+        "learning_rate": 0.1,
+        "num_threads": num_threads,
+        "seed": seed,
+        "verbosity": -1,
+    }
+    lgb.train(params, dataset, num_boost_round=rounds)
+
+
+def benchmark_splits(X, y, splits, n_trials=24, rounds=100) -> list:
+    """Time n_trials fits on a shared Dataset for each (outer, inner) split"""
+    dataset = build_dataset(X, y)
+    results = []
+    for outer, inner in splits:
+        start = time.perf_counter()
+        Parallel(n_jobs=outer, prefer="threads")(
+            delayed(_trial)(dataset, inner, seed, rounds) for seed in range(n_trials)
+        )
+        elapsed = time.perf_counter() - start
+        results.append({
+            "outer_jobs": outer,
+            "inner_threads": inner,
+            "seconds": round(elapsed, 2),
+            "trials_per_sec": round(n_trials / elapsed, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--trials", type=int, default=24)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=0, help="cores to use, 0 = all available")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(args.rows, args.features))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=args.rows)
+
+    budget = args.budget or available_cpus()
+    print(f"Budget: {budget} cores, {args.trials} trials of {args.rounds} rounds on {args.rows}x{args.features}")
+    print(f"{'outer':>6} {'inner':>6} {'seconds':>9} {'trials/s':>9}")
+    for row in benchmark_splits(X, y, candidate_splits(budget), args.trials, args.rounds):
+        print(f"{row['outer_jobs']:>6} {row['inner_threads']:>6} {row['seconds']:>9} {row['trials_per_sec']:>9}")
+
+
+if __name__ == "__main__":
+    main()
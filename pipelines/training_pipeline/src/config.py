@@ -0,0 +1,46 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRAINING_CONFIG = {
+    # "full" retrains from scratch, "incremental" continues the last model
+    "mode": os.getenv("TRAINING_MODE", "full"),
+    "model_dir": os.getenv("MODEL_DIR", "models"),
+    # Local model registry (bundles, index.json, stage pointers)
+    "registry_dir": os.getenv("MODEL_REGISTRY_DIR", "models/registry"),
+    "model_name": os.getenv("MODEL_NAME", "lightgbm_model"),
+    # Promote new versions to production when the deployment report approves them
+    "auto_promote": os.getenv("AUTO_PROMOTE", "1") == "1",
+    "state_file": os.getenv("TRAINING_STATE_FILE", "models/training_state.json"),
+    "full_retrain_every_days": int(os.getenv("FULL_RETRAIN_EVERY_DAYS", "7")),
+    "incremental_rounds": int(os.getenv("INCREMENTAL_ROUNDS", "50")),
+    "incremental_min_rows": int(os.getenv("INCREMENTAL_MIN_ROWS", "50")),
+    # Mean shift of a scaled feature, in training standard deviations
+    "drift_threshold": float(os.getenv("DRIFT_THRESHOLD", "0.5")),
+    # Core budget split between parallel trials and LightGBM threads;
+    # 0 means derive from the cgroup/affinity limit (see src/resources.py)
+    "cpu_budget": int(os.getenv("CPU_BUDGET", "0")),
+    "outer_jobs": int(os.getenv("TUNING_OUTER_JOBS", "0")),
+    "inner_threads": int(os.getenv("LIGHTGBM_THREADS", "0")),
+    # SQLite file of cached CV fold scores; empty string disables the cache
+    "trial_cache": os.getenv("TRIAL_CACHE_PATH", "models/trial_cache.sqlite"),
+    # Optional local models per segment column (e.g. "marketplace_name",
+    # "category"); those beating the global model on their holdout rows are
+    # saved in the bundle and served for their segment. Segments below the
+    # row minimum stay on the global model
+    "segment_by": os.getenv("SEGMENT_BY", ""),
+    "segment_min_rows": int(os.getenv("SEGMENT_MIN_ROWS", "500")),
+    # Evaluation plots are rendered off the critical path into plot_dir
+    "plot_dir": os.getenv("PLOT_DIR", "models/plots"),
+    "plot_formats": tuple(f for f in os.getenv("PLOT_FORMATS", "png,svgz").split(",") if f),
+    "plot_mode": os.getenv("PLOT_MODE", "auto"),
+    # Experiment logging: "comet" or "noop"; events that cannot be sent are
+    # spooled here and replayed with `python -m src.logger replay`
+    "experiment_backend": os.getenv("EXPERIMENT_BACKEND", "comet"),
+    "experiment_spool_dir": os.getenv("EXPERIMENT_SPOOL_DIR", "models/experiment_spool"),
+    "experiment_batch_size": int(os.getenv("EXPERIMENT_BATCH_SIZE", "100")),
+    "experiment_flush_seconds": float(os.getenv("EXPERIMENT_FLUSH_SECONDS", "2")),
+    # Quantile levels for prediction intervals (full retrains only); empty disables
+    "quantiles": tuple(float(q) for q in os.getenv("QUANTILES", "0.1,0.5,0.9").split(",") if q),
+}
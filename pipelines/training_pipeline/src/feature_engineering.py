@@ -1,7 +1,14 @@
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 
-def engineer_features(df: pd.DataFrame):
+# Identifying columns kept alongside the features when return_meta=True
+META_COLS = [
+    'created_at', 'product_name', 'marketplace_name',
+    'category', 'sub_category', 'sub_sub_category'
+]
+
+
+def engineer_features(df: pd.DataFrame, scaler: StandardScaler = None, return_meta: bool = False):
     df = df.copy()
 
     # Convert date
@@ -20,6 +27,13 @@ def engineer_features(df: pd.DataFrame):
     df.sort_values(['product_name', 'created_at'], inplace=True)
     df['prev_day_sales'] = df.groupby('product_name')['sub_total'].shift(1).fillna(0)
 
+    # Back to chronological order so downstream splits and CV folds never
+    # train on rows newer than the ones they are scored on
+    df.sort_values('created_at', kind='stable', inplace=True)
+
+    # Row-aligned identifiers for callers that slice by time or segment
+    meta = df[[col for col in META_COLS if col in df.columns]].reset_index(drop=True)
+
     # Drop unnecessary columns if they exist
     drop_cols = ['order_id', 'created_at', 'product_name', 'marketplace_name']
     df.drop(columns=[col for col in drop_cols if col in df.columns], inplace=True)
@@ -32,9 +46,14 @@ def engineer_features(df: pd.DataFrame):
     y = df['sub_total']
     X = df.drop('sub_total', axis=1)
 
-    # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    # Scale features (reuse a fitted scaler when continuing an existing model)
+    if scaler is None:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+    else:
+        X_scaled = scaler.transform(X)
     feature_names = X.columns.tolist()
 
+    if return_meta:
+        return X_scaled, y, scaler, feature_names, meta
     return X_scaled, y, scaler, feature_names
@@ -0,0 +1,185 @@
+# src/incremental.py
+"""
+Warm-start retraining: continue boosting the last saved model on the rows
+that arrived since the previous run, and fall back to a full retrain on a
+schedule or when the new window has drifted away from the training data.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+from src.feature_engineering import engineer_features
+from src.model_registry import LocalModelRegistry
+from src.quantile_models import update_quantile_models
+
+logger = logging.getLogger(__name__)
+
+# Calendar features always shift for a recent window, so they are not drift
+CALENDAR_FEATURES = ("day_of_week", "hour", "week_of_year")
+
+
+def load_training_state(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_training_state(path: str, watermark, full_retrain: bool) -> dict:
+    """Record the newest row trained on and, for full runs, when it happened"""
+    state = load_training_state(path)
+    state["watermark"] = pd.Timestamp(watermark).isoformat()
+    if full_retrain:
+        state["last_full_retrain"] = datetime.now().isoformat()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+    return state
+
+
+def load_previous_model(config: dict):
+    """Return the production bundle from the local registry, or None before the first promotion"""
+    try:
+        return LocalModelRegistry(config["registry_dir"], config["model_name"]).load()
+    except FileNotFoundError:
+        return None
+
+
+def feature_drift(X_new_scaled) -> np.ndarray:
+    """
+    Per-feature mean shift of the new window in training standard deviations.
+    X_new_scaled must come from the training scaler, so 0 means no shift.
+    """
+    return np.abs(np.nanmean(np.asarray(X_new_scaled, dtype=float), axis=0))
+
+
+def full_retrain_reason(state: dict, every_days: int, now: datetime = None):
+    """Return why a scheduled full retrain is due, or None"""
+    now = now or datetime.now()
+    if "watermark" not in state or "last_full_retrain" not in state:
+        return "no previous training state"
+    last_full = datetime.fromisoformat(state["last_full_retrain"])
+    if now - last_full >= timedelta(days=every_days):
+        return f"last full retrain on {last_full:%Y-%m-%d}, schedule is every {every_days} days"
+    return None
+
+
+def warm_start(prev_model, prev_params: dict, X_new, y_new, rounds: int, holdout_fraction: float = 0.2) -> dict:
+    """
+    Continue boosting prev_model (an lgb.Booster) on the older part of the
+    new window and compare against prev_model on the most recent part.
+
+    Returns the same keys as train_and_tune_model, plus baseline_mse,
+    update_mse and accepted. An accepted update is refit on the whole window
+    (the holdout rows included) and the metrics are those of the holdout
+    comparison.
+    When the update does not beat the baseline the previous model is
+    returned unchanged.
+    """
+    n_eval = max(1, int(len(X_new) * holdout_fraction))
+    X_fit, X_eval = X_new[:-n_eval], X_new[-n_eval:]
+    y_fit, y_eval = y_new.iloc[:-n_eval], y_new.iloc[-n_eval:]
+
+    params = {**prev_params, "n_estimators": rounds}
+    updated = LGBMRegressor(**params)
+    updated.fit(X_fit, y_fit, init_model=prev_model)
+
+    baseline_pred = prev_model.predict(X_eval)
+    updated_pred = updated.predict(X_eval)
+    baseline_mse = mean_squared_error(y_eval, baseline_pred)
+    updated_mse = mean_squared_error(y_eval, updated_pred)
+    accepted = updated_mse <= baseline_mse
+    logger.info(
+        f"Warm start on {len(X_fit)} rows: MSE {updated_mse:.4f} vs baseline "
+        f"{baseline_mse:.4f} ({'accepted' if accepted else 'kept previous model'})"
+    )
+
+    if accepted:
+        # The holdout only decided acceptance; the served model learns from every new row
+        model = LGBMRegressor(**params)
+        model.fit(X_new, y_new, init_model=prev_model)
+        y_pred, mse = updated_pred, updated_mse
+    else:
+        model, y_pred, mse = prev_model, baseline_pred, baseline_mse
+    return {
+        "model": model,
+        "best_params": params if accepted else prev_params,
+        "mse": round(mse, 2),
+        "rmse": round(np.sqrt(mse), 2),
+        "r2": round(r2_score(y_eval, y_pred), 3),
+        "X_test": X_eval,
+        "y_test": y_eval,
+        "y_pred": y_pred,
+        "baseline_mse": round(baseline_mse, 2),
+        "update_mse": round(updated_mse, 2),
+        "accepted": accepted,
+    }
+
+
+def incremental_update(df: pd.DataFrame, config: dict):
+    """
+    Try a warm-start update for this run.
+
+    Returns (results, scaler, feature_names), or None when a full retrain
+    is required (no previous model, schedule due, too few rows, drift).
+    results["quantile_models"] holds the previous bundle's interval models,
+    warm-started alongside an accepted update, results["segment_models"]
+    and results["segment_by"] its local segment models (unchanged), and
+    results["drift"] the per-feature shift of the new window.
+    """
+    state = load_training_state(config["state_file"])
+    reason = full_retrain_reason(state, config["full_retrain_every_days"])
+    previous = load_previous_model(config)
+    if previous is None:
+        reason = reason or f"no production model in {config['registry_dir']}"
+    if reason:
+        logger.info(f"Full retrain: {reason}")
+        return None
+
+    X_scaled, y, scaler, feature_names, meta = engineer_features(
+        df, scaler=previous["scaler"], return_meta=True
+    )
+    new_rows = (meta["created_at"] > pd.Timestamp(state["watermark"])).to_numpy()
+    if new_rows.sum() < config["incremental_min_rows"]:
+        logger.info(f"Full retrain: only {new_rows.sum()} new rows since {state['watermark']}")
+        return None
+
+    X_new = X_scaled[new_rows]
+    y_new = y.reset_index(drop=True)[new_rows]
+    drift = dict(zip(feature_names, feature_drift(X_new)))
+    drifted = [
+        name for name, shift in drift.items()
+        if name not in CALENDAR_FEATURES and shift > config["drift_threshold"]
+    ]
+    if drifted:
+        logger.info(f"Full retrain: drift detected in {drifted}")
+        return None
+
+    results = warm_start(
+        previous["model"], previous["params"], X_new, y_new, rounds=config["incremental_rounds"]
+    )
+    # Interval models follow the point model: updated with it when the update
+    # is accepted, carried over unchanged otherwise
+    quantile_models = previous.get("quantile_models") or {}
+    if quantile_models and results["accepted"]:
+        quantile_models = update_quantile_models(
+            quantile_models, X_new, y_new, previous["params"],
+            rounds=config["incremental_rounds"], cpu_budget=config["cpu_budget"]
+        )
+    results["quantile_models"] = quantile_models
+    # Local segment models are carried over as they are until the next full retrain
+    results["segment_models"] = previous.get("segment_models") or {}
+    results["segment_by"] = previous.get("segment_by")
+    results["drift"] = drift
+    # y_new keeps positional labels into meta, so the holdout rows map back
+    results["test_meta"] = meta.iloc[results["y_test"].index].reset_index(drop=True)
+    return results, scaler, feature_names
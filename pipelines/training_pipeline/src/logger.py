@@ -1,4 +1,26 @@
-from comet_ml import Experiment
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+from comet_ml import ExistingExperiment, Experiment
+
+logger = logging.getLogger(__name__)
+
+# Experiment methods the facade queues; everything else is not supported
+_LOGGED_METHODS = (
+    "set_name", "log_metric", "log_metrics", "log_parameters", "log_other",
+    "log_text", "log_table", "log_histogram_3d", "log_model", "log_image",
+    "log_asset", "log_figure",
+)
+_STOP = object()
+
 
 def init_experiment(api_key, project_name, workspace):
     experiment = Experiment(
@@ -12,4 +34,238 @@ def log_metrics(experiment, mse, model):
     experiment.set_name("lightgbm-product-sales")
     experiment.log_metric("mse", mse)
     experiment.log_parameters(model.get_params())
-    experiment.log_model("lightgbm_model", "model.pkl")
\ No newline at end of file
+    experiment.log_model("lightgbm_model", "model.pkl")
+
+
+class NoOpExperiment:
+    """Backend that discards every call, for benchmarks and dry runs"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def get_key(self):
+        return None
+
+
+class ExperimentLogger:
+    """
+    Non-blocking facade over a Comet experiment
+
+    Calls are queued and sent in batches from a background thread, with
+    consecutive log_metric/log_metrics calls for the same step merged into
+    one request. If the backend is unavailable (None at start, or a call
+    fails) the remaining events are spooled to spool_dir and can be sent
+    later with replay_spool.
+
+    Attributes:
+        backend: Comet experiment, NoOpExperiment, or None when offline
+        spool_dir: Directory of this run's spooled batches
+        batch_size: Most events sent per batch
+        flush_interval: Seconds a partial batch waits for more events
+    """
+
+    def __init__(self, backend, spool_dir: str = "models/experiment_spool", batch_size: int = 100,
+                 flush_interval: float = 2.0, project_name: str = None, workspace: str = None):
+        self.backend = backend
+        self.spool_dir = os.path.join(spool_dir, datetime.now().strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:8])
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.offline = backend is None
+        self._run_meta = {
+            "experiment_key": backend.get_key() if backend is not None else None,
+            "project_name": project_name,
+            "workspace": workspace,
+        }
+        self._spooled = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="experiment-logger", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        if name not in _LOGGED_METHODS:
+            raise AttributeError(name)
+
+        def enqueue(*args, **kwargs):
+            self._queue.put((name, args, kwargs))
+        return enqueue
+
+    def get_key(self):
+        return self._run_meta["experiment_key"]
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            # Hold the batch open until it is full or flush_interval after its first event
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            self._send(batch)
+
+    def _send(self, batch):
+        events = _merge_metrics(batch)
+        for i, (name, args, kwargs) in enumerate(events):
+            if self.offline:
+                self._spool(events[i:])
+                return
+            try:
+                getattr(self.backend, name)(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Experiment backend failed ({e}); spooling to {self.spool_dir}")
+                self.offline = True
+                self._spool(events[i:])
+                return
+
+    def _spool(self, events):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        meta_path = os.path.join(self.spool_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as f:
+                json.dump(self._run_meta, f)
+        self._spooled += 1
+        path = os.path.join(self.spool_dir, f"batch-{self._spooled:06d}.pkl")
+        try:
+            joblib.dump(events, path)
+        except Exception as e:
+            # e.g. a matplotlib figure that cannot be pickled
+            logger.warning(f"Could not spool {len(events)} experiment events: {e}")
+
+    def flush(self, timeout: float = None):
+        """Send everything queued so far and stop the background thread"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def end(self):
+        """Flush queued events, then end the backend experiment"""
+        self.flush()
+        if self._spooled:
+            logger.info(f"{self._spooled} experiment batches spooled to {self.spool_dir}; "
+                        f"send them with: python -m src.logger replay")
+        if self.backend is not None and not self.offline:
+            self.backend.end()
+
+
+def _merge_metrics(batch):
+    """Fold runs of metric calls with the same step into single log_metrics calls"""
+    merged, open_metrics, open_step = [], None, None
+    for name, args, kwargs in batch:
+        extra = set(kwargs) - {"step"}
+        if name == "log_metric" and len(args) == 2 and not extra:
+            metrics = {args[0]: args[1]}
+        elif name == "log_metrics" and len(args) == 1 and not extra:
+            metrics = dict(args[0])
+        else:
+            merged.append((name, args, kwargs))
+            open_metrics = None
+            continue
+        step = kwargs.get("step")
+        if open_metrics is not None and open_step == step:
+            open_metrics.update(metrics)
+        else:
+            open_metrics, open_step = metrics, step
+            merged.append(("log_metrics", (metrics,), {"step": step} if step is not None else {}))
+    return merged
+
+
+def create_experiment_logger(api_key, project_name, workspace, backend: str = "comet",
+                             spool_dir: str = "models/experiment_spool", batch_size: int = 100,
+                             flush_interval: float = 2.0) -> ExperimentLogger:
+    """
+    Build the experiment logging facade
+
+    Args:
+        api_key: Comet API key
+        project_name: Comet project
+        workspace: Comet workspace
+        backend: "comet", or "noop" to discard everything (benchmarks)
+        spool_dir: Parent directory for offline batches
+        batch_size: Most events sent per batch
+        flush_interval: Seconds a partial batch waits for more events
+
+    Returns:
+        ExperimentLogger with the same logging methods as a Comet experiment
+    """
+    if backend == "noop":
+        experiment = NoOpExperiment()
+    elif backend == "comet":
+        try:
+            experiment = init_experiment(api_key, project_name, workspace)
+        except Exception as e:
+            logger.warning(f"Comet unavailable ({e}); logging offline to {spool_dir}")
+            experiment = None
+    else:
+        raise ValueError(f"Unknown experiment backend: {backend}")
+    return ExperimentLogger(experiment, spool_dir=spool_dir, batch_size=batch_size,
+                            flush_interval=flush_interval, project_name=project_name, workspace=workspace)
+
+
+def replay_spool(spool_dir: str, api_key: str, project_name: str = None, workspace: str = None) -> int:
+    """
+    Send spooled batches to Comet, oldest run first, deleting what was sent
+
+    Runs spooled after the experiment was created continue that experiment;
+    runs that never reached Comet get a new one.
+
+    Returns:
+        Number of batches sent
+    """
+    if not os.path.isdir(spool_dir):
+        return 0
+    sent = 0
+    for run in sorted(os.listdir(spool_dir)):
+        run_dir = os.path.join(spool_dir, run)
+        with open(os.path.join(run_dir, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("experiment_key"):
+            experiment = ExistingExperiment(api_key=api_key, previous_experiment=meta["experiment_key"])
+        else:
+            experiment = init_experiment(api_key, meta.get("project_name") or project_name,
+                                         meta.get("workspace") or workspace)
+        try:
+            for batch in sorted(name for name in os.listdir(run_dir) if name.startswith("batch-")):
+                path = os.path.join(run_dir, batch)
+                for name, args, kwargs in joblib.load(path):
+                    getattr(experiment, name)(*args, **kwargs)
+                os.remove(path)
+                sent += 1
+        finally:
+            experiment.end()
+        os.remove(os.path.join(run_dir, "meta.json"))
+        os.rmdir(run_dir)
+        logger.info(f"Replayed spooled run {run}")
+    return sent
+
+
+def main():
+    from src.config import TRAINING_CONFIG
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Send experiment events spooled while offline")
+    parser.add_argument("command", choices=["replay"])
+    parser.add_argument("--spool-dir", default=TRAINING_CONFIG["experiment_spool_dir"])
+    args = parser.parse_args()
+
+    sent = replay_spool(
+        args.spool_dir,
+        api_key=os.environ["COMET_ML_API_KEY"],
+        project_name=os.getenv("COMET_ML_PROJECT_NAME"),
+        workspace=os.getenv("COMET_ML_WORKSPACE"),
+    )
+    print(f"Sent {sent} spooled batches")
+
+
+if __name__ == "__main__":
+    main()
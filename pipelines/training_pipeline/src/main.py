@@ -1,7 +1,6 @@
 import comet_ml# Must be first import!
 import logging
 import numpy as np
-import joblib
 import matplotlib.pyplot as plt
 import traceback
 import os
@@ -11,16 +10,20 @@ from dotenv import load_dotenv
 from src.hopsworks_config import init_hopsworks, get_sales_data
 from src.feature_engineering import engineer_features
 from src.models import train_and_tune_model  
+from src.incremental import incremental_update, save_training_state
+from src.segment_models import routed_segments, train_segment_models
+from src.quantile_models import quantile_metrics, train_quantile_models
+from src.config import TRAINING_CONFIG
 from src.model_evaluation import (
-    calculate_core_metrics,
-    analyze_errors,
-    calculate_business_impact,
     check_against_baseline,
-    generate_deployment_report
+    generate_deployment_report,
+    meets_deployment_criteria
 )
-from src.visualization import create_evaluation_plots
-from src.logger import init_experiment
-from src.model_registry import register_model
+from src.evaluation_engine import evaluate_predictions, segment_metrics
+from src.plot_rendering import BackgroundUploader, render_evaluation_plots
+from src.logger import create_experiment_logger
+from src.model_registry import LocalModelRegistry, frame_fingerprint, register_model
+from src.model_bundle import save_bundle
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,10 +37,14 @@ def main():
         env = load_dotenv()
         
         logger.info("Initializing Comet experiment")
-        experiment = init_experiment(
-            api_key=os.environ["COMET_ML_API_KEY"],
-            project_name=os.environ["COMET_ML_PROJECT_NAME"],
-            workspace=os.environ["COMET_ML_WORKSPACE"]
+        experiment = create_experiment_logger(
+            api_key=os.getenv("COMET_ML_API_KEY"),
+            project_name=os.getenv("COMET_ML_PROJECT_NAME"),
+            workspace=os.getenv("COMET_ML_WORKSPACE"),
+            backend=TRAINING_CONFIG["experiment_backend"],
+            spool_dir=TRAINING_CONFIG["experiment_spool_dir"],
+            batch_size=TRAINING_CONFIG["experiment_batch_size"],
+            flush_interval=TRAINING_CONFIG["experiment_flush_seconds"]
         )
         
         logger.info("Initializing Hopsworks")
@@ -52,12 +59,70 @@ def main():
         experiment.log_metric("dataset_rows", len(df))
         experiment.log_metric("dataset_columns", len(df.columns))
         
-        logger.info("Engineering features")
-        X_scaled, y, scaler, feature_names = engineer_features(df)
-        experiment.log_histogram_3d(y, name="target_distribution", step=0)
-
         # 3. Model Training + Tuning
-        results = train_and_tune_model(X_scaled, y)
+        update = None
+        quantile_models = None
+        segment_models, segment_col = None, None
+        if TRAINING_CONFIG["mode"] == "incremental":
+            logger.info("Attempting warm-start update of the previous model")
+            update = incremental_update(df, TRAINING_CONFIG)
+
+        if update is not None:
+            results, scaler, feature_names = update
+            quantile_models = results["quantile_models"]
+            segment_models, segment_col = results["segment_models"], results["segment_by"]
+            experiment.log_other("training_mode", "incremental")
+            experiment.log_metrics({
+                "baseline_mse": results["baseline_mse"],
+                "incremental_accepted": int(results["accepted"])
+            })
+            experiment.log_metrics({f"drift_{name}": shift for name, shift in results["drift"].items()})
+            if not results["accepted"]:
+                # Nothing new to ship: the previous bundle stays registered and
+                # the watermark stays put, so the window is retried next run
+                drift_report = ", ".join(f"{name}={shift:.3f}" for name, shift in results["drift"].items())
+                logger.info(f"Warm-start update rejected (MSE {results['update_mse']} vs baseline "
+                            f"{results['baseline_mse']}), keeping the production model. "
+                            f"Feature drift: {drift_report}")
+                experiment.log_other("status", "rejected")
+                return
+        else:
+            logger.info("Engineering features")
+            X_scaled, y, scaler, feature_names, meta = engineer_features(df, return_meta=True)
+            experiment.log_histogram_3d(y, name="target_distribution", step=0)
+            experiment.log_other("training_mode", "full")
+
+            results = train_and_tune_model(X_scaled, y)
+            # Holdout is the most recent slice of the time-ordered rows
+            results["test_meta"] = meta.iloc[-len(results["y_test"]):].reset_index(drop=True)
+
+            n_train = len(y) - len(results["y_test"])
+            if TRAINING_CONFIG["quantiles"]:
+                logger.info(f"Training quantile models {TRAINING_CONFIG['quantiles']}")
+                quantile_models = train_quantile_models(
+                    X_scaled[:n_train], y.iloc[:n_train],
+                    params=results["best_params"],
+                    quantiles=TRAINING_CONFIG["quantiles"],
+                    cpu_budget=TRAINING_CONFIG["cpu_budget"],
+                )
+                experiment.log_metrics(quantile_metrics(quantile_models, results["X_test"], results["y_test"]))
+
+            segment_col = TRAINING_CONFIG["segment_by"]
+            if segment_col:
+                # Local models that beat the global one on their holdout rows ship with the bundle
+                logger.info(f"Comparing local models per {segment_col}")
+                models, segment_report = train_segment_models(
+                    X_scaled, y, meta[segment_col],
+                    global_model=results["model"],
+                    params=results["best_params"],
+                    n_train=n_train,
+                    min_rows=TRAINING_CONFIG["segment_min_rows"],
+                    cpu_budget=TRAINING_CONFIG["cpu_budget"],
+                )
+                experiment.log_table("segment_models.csv", tabular_data=segment_report)
+                segment_models = routed_segments(models, segment_report)
+                logger.info(f"Routing {len(segment_models)} of {len(models)} local segment models: "
+                            f"{sorted(map(str, segment_models))}")
 
         model = results["model"]
         best_params = results["best_params"]
@@ -77,84 +142,89 @@ def main():
         experiment.log_parameters(best_params)
         experiment.log_metrics({"mse": mse, "rmse": rmse, "r2": r2})
 
-    # Save and log artifacts
-        joblib.dump(scaler, "scaler.pkl")
-        experiment.log_model("scaler", "scaler.pkl", overwrite=True)
-
-        joblib.dump(model, "lightgbm_model.pkl")
-        experiment.log_model("lightgbm_model", "lightgbm_model.pkl", overwrite=True)
-
-    # Register model in Comet's Model Registry
-        # Register model in Comet's Model Registry
-        try:
-            logger.info(" Attempting to register model and push to registry...")
-            register_model(
-                experiment=experiment,
-                model=model,
-                model_name="lightgbm_model",
-                mse=mse
-    )
-            logger.success(" Model successfully pushed to Comet ML registry.")
-        except Exception as e:
-            logger.error(f" Error during model registration: {e}")
-    
-
-
-        # 4. Evaluation
+        # 4. Evaluation (one pass over the residuals, then per segment)
         logger.info("Evaluating model")
-        metrics = calculate_core_metrics(y_test, y_pred)
+        evaluation = evaluate_predictions(y_test, y_pred, unit_cost=10.0, unit_price=25.0)
+        metrics = evaluation["core"]
+        error_stats = evaluation["errors"]
+        business_impact = evaluation["business"]
         experiment.log_metrics(metrics)
-        
-        error_stats = analyze_errors(y_test, y_pred)
         experiment.log_metrics({f"error_{k}": v for k, v in error_stats.items()})
+        experiment.log_metrics({f"biz_{k}": v for k, v in business_impact.items()})
 
-        business_impact = calculate_business_impact(
-            y_true=y_test,
-            y_pred=y_pred,
+        test_meta = results["test_meta"]
+        segment_stats = segment_metrics(
+            y_test, y_pred,
+            segments={
+                col: test_meta[col]
+                for col in ("product_name", "marketplace_name", "category")
+                if col in test_meta.columns
+            },
             unit_cost=10.0,
             unit_price=25.0
         )
-        experiment.log_metrics({f"biz_{k}": v for k, v in business_impact.items()})
+        experiment.log_table("segment_metrics.csv", tabular_data=segment_stats)
 
-        # 5. Visualizations
+        # 5. Visualizations (rendered and uploaded in the background)
         logger.info("Generating evaluation visualizations")
-        feature_importances = dict(zip(feature_names, model.feature_importances_))
-        plots = create_evaluation_plots(
-            y_true=y_test,
-            y_pred=y_pred,
+        booster = model.booster_ if hasattr(model, "booster_") else model
+        feature_importances = dict(zip(feature_names, booster.feature_importance()))
+        uploader = BackgroundUploader(experiment)
+        plot_job = render_evaluation_plots(
+            y_true=np.asarray(y_test),
+            y_pred=np.asarray(y_pred),
+            out_dir=TRAINING_CONFIG["plot_dir"],
             feature_importances=feature_importances,
             model_name="lightgbm_model",
-            target_name="sub_total"
+            target_name="sub_total",
+            mode=TRAINING_CONFIG["plot_mode"],
+            formats=TRAINING_CONFIG["plot_formats"],
+            uploader=uploader
         )
-        for name, fig in plots.items():
-            experiment.log_figure(figure_name=name, figure=fig, overwrite=True)
-            plt.close(fig)
 
         # 6. Deployment Checklist
         deployment_report = generate_deployment_report(
             metrics=metrics,
             error_stats=error_stats,
-            feature_importances=feature_importances
+            feature_importances=feature_importances,
+            segment_stats=segment_stats
         )
         experiment.log_text(deployment_report, "deployment_checklist")
         logger.info(f"\n{deployment_report}")
 
-        # 7. Register model
+        # 7. Save the model bundle once and register it
+        logger.info("Saving model bundle")
+        registry = LocalModelRegistry(TRAINING_CONFIG["registry_dir"], TRAINING_CONFIG["model_name"])
+        bundle_dir = save_bundle(
+            registry.path,
+            model=model,
+            scaler=scaler,
+            feature_names=feature_names,
+            metrics={**metrics, **{f"error_{k}": v for k, v in error_stats.items()}},
+            params=best_params,
+            quantile_models=quantile_models,
+            segment_models=segment_models,
+            segment_by=segment_col,
+        )
+        # Auto-promotion only for versions the deployment report approves
+        promote = TRAINING_CONFIG["auto_promote"] and meets_deployment_criteria(metrics, error_stats)
+        if TRAINING_CONFIG["auto_promote"] and not promote:
+            logger.warning("Deployment criteria not met: registering without promoting to production")
         logger.info("Registering model")
         register_model(
             experiment=experiment,
-            model=model,
-            model_name="lightgbm_model",
-            mse=mse
+            bundle_dir=bundle_dir,
+            model_name=TRAINING_CONFIG["model_name"],
+            mse=mse,
+            registry=registry,
+            data_fingerprint=frame_fingerprint(df),
+            promote=promote
+        )
+        save_training_state(
+            TRAINING_CONFIG["state_file"],
+            watermark=df["created_at"].max(),
+            full_retrain=update is None,
         )
-        joblib.dump(model, "./models/lightgbm_model.pkl")
-
-       # Log model to Comet
-        experiment.log_model(
-            name="lightgbm_model",
-            file_or_folder="./models/lightgbm_model.pkl",
-        overwrite=True
-)
 
         logger.info("Pipeline completed successfully")
         experiment.log_other("status", "success")
@@ -165,6 +235,10 @@ def main():
             experiment.log_text(traceback.format_exc(), "exception_traceback")
         raise
     finally:
+        if 'plot_job' in locals():
+            plot_job.wait()
+        if 'uploader' in locals():
+            uploader.close()
         if 'experiment' in locals():
             experiment.end()
         plt.close('all')
@@ -0,0 +1,222 @@
+# src/model_bundle.py
+"""
+Versioned model bundle: one directory per trained model holding
+
+    manifest.json   feature schema, params, metrics, file digests, version
+    model.txt       LightGBM booster in its native text format
+    quantile_p*.txt optional quantile boosters (P10, P50, ...)
+    segment_*.txt   optional local boosters per segment value
+    scaler_*.npy    StandardScaler arrays (loadable with mmap_mode="r")
+    transformer.joblib  only for preprocessors that are not a StandardScaler
+
+The version is a hash of the file contents, so identical models map to the
+same directory and a bundle is written exactly once.
+
+The manifest names every file it refers to (model_file, scaler_files,
+quantiles, segments), so readers take file names from it instead of
+repeating the naming rules. Readers that predate the segments entry ignore
+it and serve every row with the global model.
+inference_pipeline/src/model_utils.load_bundle reads the same format; bump
+BUNDLE_FORMAT there too when the manifest changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+# 2: manifest lists model_file and scaler_files (1 used fixed names)
+BUNDLE_FORMAT = 2
+LATEST_POINTER = "latest"
+MODEL_FILE = "model.txt"
+_SCALER_ARRAYS = ("mean_", "scale_", "var_")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_pointer(path: str, value: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(value)
+    os.replace(tmp_path, path)
+
+
+def _to_booster(model) -> lgb.Booster:
+    return model.booster_ if hasattr(model, "booster_") else model
+
+
+def _quantile_file(alpha: float) -> str:
+    return f"quantile_p{round(alpha * 100):02d}.txt"
+
+
+def save_bundle(model_dir: str, model, scaler, feature_names, metrics: dict, params: dict = None,
+                quantile_models: dict = None, segment_models: dict = None, segment_by: str = None) -> str:
+    """
+    Write model + preprocessing + schema + metrics as one content-hashed bundle
+
+    Args:
+        model_dir: Parent directory; the bundle goes to model_dir/<version>
+        model: Fitted LGBMRegressor or lgb.Booster
+        scaler: Fitted StandardScaler (other transformers are joblib-dumped)
+        feature_names: Ordered feature columns the model expects
+        metrics: Evaluation metrics to record with the model
+        params: Training hyperparameters
+        quantile_models: Optional {alpha: lgb.Booster} from train_quantile_models
+        segment_models: Optional {segment value: model} served for the rows
+            of that segment instead of model (see routed_segments)
+        segment_by: Raw column holding the segment value; required with
+            segment_models
+
+    Returns:
+        Path of the bundle directory
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".bundle-", dir=model_dir)
+    try:
+        _to_booster(model).save_model(os.path.join(staging, MODEL_FILE))
+        quantiles = {}
+        for alpha, booster in sorted((quantile_models or {}).items()):
+            quantiles[str(alpha)] = _quantile_file(alpha)
+            _to_booster(booster).save_model(os.path.join(staging, quantiles[str(alpha)]))
+        segments = {}
+        if segment_models:
+            if not segment_by:
+                raise ValueError("segment_models need the segment_by column")
+            segment_files = {}
+            for i, (value, booster) in enumerate(sorted(segment_models.items(), key=lambda item: str(item[0]))):
+                segment_files[str(value)] = f"segment_{i:03d}.txt"
+                _to_booster(booster).save_model(os.path.join(staging, segment_files[str(value)]))
+            segments = {"column": segment_by, "models": segment_files}
+
+        scaler_files = {}
+        if isinstance(scaler, StandardScaler):
+            scaler_kind = "standard"
+            for attr in _SCALER_ARRAYS:
+                value = getattr(scaler, attr, None)
+                if value is not None:
+                    scaler_files[attr] = f"scaler_{attr.rstrip('_')}.npy"
+                    np.save(os.path.join(staging, scaler_files[attr]), np.asarray(value, dtype=float))
+        else:
+            scaler_kind = "joblib"
+            scaler_files["transformer"] = "transformer.joblib"
+            joblib.dump(scaler, os.path.join(staging, scaler_files["transformer"]))
+
+        files = {name: _file_digest(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+        content = hashlib.sha256(json.dumps(
+            {"files": files, "feature_names": list(feature_names)}, sort_keys=True
+        ).encode())
+        version = content.hexdigest()[:16]
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": version,
+            "created_at": datetime.now().isoformat(),
+            "lightgbm_version": lgb.__version__,
+            "feature_names": list(feature_names),
+            "model_file": MODEL_FILE,
+            "scaler": scaler_kind,
+            "scaler_files": scaler_files,
+            "params": {k: v for k, v in (params or {}).items() if isinstance(v, (int, float, str, bool, type(None)))},
+            "metrics": {k: float(v) for k, v in metrics.items()},
+            "quantiles": quantiles,
+            "segments": segments,
+            "files": files,
+        }
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        bundle_dir = os.path.join(model_dir, version)
+        if os.path.exists(bundle_dir):
+            logger.info(f"Bundle {version} already exists, reusing it")
+            shutil.rmtree(staging)
+        else:
+            os.replace(staging, bundle_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _write_pointer(os.path.join(model_dir, LATEST_POINTER), version)
+    logger.info(f"Model bundle {version} written to {bundle_dir}")
+    return bundle_dir
+
+
+def read_manifest(bundle_dir: str) -> dict:
+    """
+    Parse manifest.json, filling the fixed file names of format 1
+
+    Raises:
+        ValueError: The bundle was written by a newer format
+    """
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format", 1) > BUNDLE_FORMAT:
+        raise ValueError(f"Bundle format {manifest['format']} is newer than supported ({BUNDLE_FORMAT})")
+    manifest.setdefault("model_file", MODEL_FILE)
+    if "scaler_files" not in manifest:
+        if manifest["scaler"] == "standard":
+            manifest["scaler_files"] = {
+                attr: f"scaler_{attr.rstrip('_')}.npy" for attr in _SCALER_ARRAYS
+                if os.path.exists(os.path.join(bundle_dir, f"scaler_{attr.rstrip('_')}.npy"))
+            }
+        else:
+            manifest["scaler_files"] = {"transformer": "transformer.joblib"}
+    manifest.setdefault("quantiles", {})
+    manifest.setdefault("segments", {})
+    return manifest
+
+
+def load_bundle(bundle_dir: str) -> dict:
+    """
+    Load a bundle written by save_bundle
+
+    Returns:
+        Dictionary with model (lgb.Booster), quantile_models ({alpha:
+        lgb.Booster}, empty if none), segment_models ({segment value:
+        lgb.Booster}, empty if none) with their segment_by column, scaler,
+        feature_names, metrics, params, version and the raw manifest
+    """
+    manifest = read_manifest(bundle_dir)
+
+    if manifest["scaler"] == "standard":
+        scaler = StandardScaler()
+        for attr, name in manifest["scaler_files"].items():
+            setattr(scaler, attr, np.load(os.path.join(bundle_dir, name), mmap_mode="r"))
+        scaler.n_features_in_ = len(manifest["feature_names"])
+        scaler.feature_names_in_ = np.asarray(manifest["feature_names"], dtype=object)
+    else:
+        scaler = joblib.load(os.path.join(bundle_dir, manifest["scaler_files"]["transformer"]))
+
+    return {
+        "model": lgb.Booster(model_file=os.path.join(bundle_dir, manifest["model_file"])),
+        "quantile_models": {
+            float(alpha): lgb.Booster(model_file=os.path.join(bundle_dir, name))
+            for alpha, name in manifest["quantiles"].items()
+        },
+        "segment_models": {
+            value: lgb.Booster(model_file=os.path.join(bundle_dir, name))
+            for value, name in manifest["segments"].get("models", {}).items()
+        },
+        "segment_by": manifest["segments"].get("column"),
+        "scaler": scaler,
+        "feature_names": manifest["feature_names"],
+        "metrics": manifest["metrics"],
+        "params": manifest["params"],
+        "version": manifest["version"],
+        "manifest": manifest,
+    }
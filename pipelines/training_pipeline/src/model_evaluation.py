@@ -1,63 +1,20 @@
 from comet_ml import API
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score,explained_variance_score
-import numpy as np
-import pandas as pd
+
+from src.evaluation_engine import evaluate_predictions
 
 def calculate_core_metrics(y_true, y_pred):
     """Calculate and return all basic metrics"""
-    return {
-        'mse': mean_squared_error(y_true, y_pred),
-        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
-        'mae': mean_absolute_error(y_true, y_pred),
-        'r2': r2_score(y_true, y_pred),
-        'explained_variance': explained_variance_score(y_true, y_pred)
-    }
+    return evaluate_predictions(y_true, y_pred)["core"]
 
 
 
 def analyze_errors(y_true, y_pred):
-    errors = y_true - y_pred
-    return {
-        'max_overprediction': errors.min(),
-        'max_underprediction': errors.max(),
-        'error_std': errors.std(),
-        'error_skew': pd.Series(errors).skew(),
-        'percentile_5th': np.percentile(errors, 5),
-        'percentile_95th': np.percentile(errors, 95)
-    }
+    return evaluate_predictions(y_true, y_pred)["errors"]
 
 
 
 def calculate_business_impact(y_true, y_pred, unit_cost: float, unit_price: float) -> dict:
-    if len(y_true) != len(y_pred):
-        raise ValueError("Length of y_true and y_pred must match")
-
-    y_true = pd.Series(y_true).fillna(0)
-    y_pred = pd.Series(y_pred).fillna(0)
-
-    errors = y_true - y_pred
-    over_errors = errors[errors < 0]   # overpredictions
-    under_errors = errors[errors > 0]  # underpredictions
-
-    lost_profit = (under_errors * (unit_price - unit_cost)).sum()
-    waste_cost = (abs(over_errors) * unit_cost).sum()
-
-    total_cost = lost_profit + waste_cost
-    cost_ratio = waste_cost / lost_profit if lost_profit != 0 else np.inf
-    net_revenue_impact = (unit_price * y_true.sum()) - waste_cost
-
-    results = {
-        "total_predictions": len(y_true),
-        "underprediction_count": len(under_errors),
-        "overprediction_count": len(over_errors),
-        "total_lost_profit": round(lost_profit, 2),
-        "total_waste_cost": round(waste_cost, 2),
-        "total_business_cost": round(total_cost, 2),
-        "waste_to_profit_ratio": round(cost_ratio, 2),
-        "net_revenue_impact": round(net_revenue_impact, 2),
-    }
-
-    return results
+    return evaluate_predictions(y_true, y_pred, unit_cost=unit_cost, unit_price=unit_price)["business"]
 
 
 
@@ -74,16 +31,27 @@ def check_against_baseline(experiment, current_metrics, baseline_thresholds):
         'alerts': alerts
     }
 
-def generate_deployment_report(metrics, error_stats, feature_importances=None):
+# Thresholds (customize these per project requirements)
+DEPLOYMENT_THRESHOLDS = {
+    'r2': {'min': 0.7, 'ideal': 0.8},
+    'mae': {'max': 3.0, 'ideal': 2.5},
+    'max_overprediction': {'max': 15.0},
+    'max_underprediction': {'max': 15.0}
+}
+
+
+def meets_deployment_criteria(metrics, error_stats) -> bool:
+    """The deployment report's recommendation: True means APPROVE DEPLOYMENT"""
+    return all([
+        metrics['r2'] >= DEPLOYMENT_THRESHOLDS['r2']['min'],
+        metrics['mae'] <= DEPLOYMENT_THRESHOLDS['mae']['max'],
+        abs(error_stats['max_overprediction']) <= DEPLOYMENT_THRESHOLDS['max_overprediction']['max'],
+        abs(error_stats['max_underprediction']) <= DEPLOYMENT_THRESHOLDS['max_underprediction']['max']
+    ])
+
+
+def generate_deployment_report(metrics, error_stats, feature_importances=None, segment_stats=None):
  
-    # Thresholds (customize these per project requirements)
-    DEPLOYMENT_THRESHOLDS = {
-        'r2': {'min': 0.7, 'ideal': 0.8},
-        'mae': {'max': 3.0, 'ideal': 2.5},
-        'max_overprediction': {'max': 15.0},
-        'max_underprediction': {'max': 15.0}
-    }
-    
     # Evaluation Results
     report = [
 
@@ -111,13 +79,18 @@ def generate_deployment_report(metrics, error_stats, feature_importances=None):
                                    reverse=True)[:3]]
         ])
     
+    # Weakest segments per segmentation (if provided)
+    if segment_stats is not None and len(segment_stats):
+        report.extend(["", "WEAKEST SEGMENTS (by MAE)"])
+        for segment_type, group in segment_stats.groupby("segment_type", sort=False):
+            report.append(f"  {segment_type}")
+            report.extend(
+                f"    • {row.segment}: MAE {row.mae:.2f}, bias {row.bias:+.2f} (n={row.n})"
+                for row in group.nlargest(3, "mae").itertuples()
+            )
+
     # Final Recommendation
-    meets_criteria = all([
-        metrics['r2'] >= DEPLOYMENT_THRESHOLDS['r2']['min'],
-        metrics['mae'] <= DEPLOYMENT_THRESHOLDS['mae']['max'],
-        abs(error_stats['max_overprediction']) <= DEPLOYMENT_THRESHOLDS['max_overprediction']['max'],
-        abs(error_stats['max_underprediction']) <= DEPLOYMENT_THRESHOLDS['max_underprediction']['max']
-    ])
+    meets_criteria = meets_deployment_criteria(metrics, error_stats)
     
     report.extend([
         "",
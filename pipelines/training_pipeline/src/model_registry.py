@@ -1,34 +1,144 @@
 # src/model_registry.py
-import joblib
-import tempfile
-import os
+import argparse
+import hashlib
+import json
 import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.config import TRAINING_CONFIG
+from src.model_bundle import LATEST_POINTER, load_bundle
 
 # Initialize logger properly
 logger = logging.getLogger(__name__)
 
-def register_model(experiment, model, mse, model_name="sales_forecast_model"):
+PRODUCTION_STAGE = "production"
+INDEX_FILE = "index.json"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a training frame, recorded with each registered version"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update(",".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+def _atomic_write(path: str, text: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class LocalModelRegistry:
     """
-    Register the trained model in Comet ML model registry
+    Filesystem model registry: versioned bundles under root/<model_name>/,
+    an index.json with per-version metadata and one pointer file per stage.
+
+    Attributes:
+        root: Registry root directory
+        model_name: Registered model name
+        path: Directory holding this model's bundles, index and pointers
+    """
+
+    def __init__(self, root: str, model_name: str = "lightgbm_model"):
+        self.root = root
+        self.model_name = model_name
+        self.path = os.path.join(root, model_name)
+        os.makedirs(self.path, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self) -> dict:
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path) as f:
+            return json.load(f)
+
+    def register(self, bundle_dir: str, metadata: dict) -> str:
+        """Record a bundle already saved under self.path; returns its version"""
+        version = os.path.basename(os.path.normpath(bundle_dir))
+        if os.path.dirname(os.path.abspath(bundle_dir)) != os.path.abspath(self.path):
+            raise ValueError(f"Bundle {bundle_dir} is not inside registry path {self.path}")
+
+        self._index[version] = {
+            "registered_at": datetime.now().isoformat(),
+            **metadata,
+        }
+        _atomic_write(os.path.join(self.path, INDEX_FILE), json.dumps(self._index, indent=2))
+        _atomic_write(os.path.join(self.path, LATEST_POINTER), version)
+        logger.info(f"Registered {self.model_name} version {version}")
+        return version
+
+    def promote(self, version: str, stage: str = PRODUCTION_STAGE):
+        """Point a stage (e.g. production) at a registered version"""
+        if version not in self._index:
+            raise KeyError(f"Version {version} is not registered for {self.model_name}")
+        _atomic_write(os.path.join(self.path, stage), version)
+        logger.info(f"{self.model_name} {stage} -> {version}")
+
+    def versions(self) -> dict:
+        return dict(self._index)
+
+    def resolve(self, version: str = None, stage: str = PRODUCTION_STAGE) -> str:
+        """
+        Version for a pinned version or a stage pointer
+
+        The latest pointer is never a fallback: every run writes it, including
+        runs that did not meet the deployment criteria.
+
+        Raises:
+            FileNotFoundError: The stage has not been promoted to yet
+        """
+        if version is not None:
+            if version not in self._index:
+                raise KeyError(f"Version {version} is not registered for {self.model_name}")
+            return version
+        pointer_path = os.path.join(self.path, stage)
+        if not os.path.exists(pointer_path):
+            raise FileNotFoundError(f"No {stage} version of {self.model_name} in {self.path}")
+        with open(pointer_path) as f:
+            return f.read().strip()
+
+    def load(self, version: str = None, stage: str = PRODUCTION_STAGE) -> dict:
+        """Load a bundle (see model_bundle.load_bundle) by version or stage"""
+        return load_bundle(os.path.join(self.path, self.resolve(version, stage)))
+
+
+def register_model(experiment, bundle_dir, mse, model_name="sales_forecast_model",
+                   registry: LocalModelRegistry = None, data_fingerprint=None, promote=True):
+    """
+    Register a saved model bundle in the local registry, mirrored to Comet ML
     
     Args:
-        experiment: Comet ML experiment object
-        model: The trained model object to register
+        experiment: Comet ML experiment object, or None to skip the mirror
+        bundle_dir: Bundle directory written by model_bundle.save_bundle
         mse: Model's mean squared error (must be a float)
         model_name: Name for the registered model
+        registry: LocalModelRegistry the bundle was saved into
+        data_fingerprint: Fingerprint of the training data (frame_fingerprint)
+        promote: Point the production stage at this version
     """
+    # Validate mse is a numeric value
+    mse_float = float(mse)
+
+    if registry is not None:
+        version = registry.register(bundle_dir, {"mse": mse_float, "data_fingerprint": data_fingerprint})
+        if promote:
+            registry.promote(version)
+
+    if experiment is None:
+        return
+
+    # Comet is a mirror: a failure there must not lose the local registration
     try:
-        # Validate mse is a numeric value
-        mse_float = float(mse)
-        
-        # Save model to temporary file
-        model_filename = f"{model_name}.pkl"
-        joblib.dump(model, model_filename)
-        
-        # Log model to Comet ML
+        # Log the bundle directory as-is; nothing is re-serialized here
         experiment.log_model(
             name=model_name,
-            file_or_folder=model_filename,
+            file_or_folder=bundle_dir,
             overwrite=True,
             metadata={"mse": mse_float}
         )
@@ -38,12 +148,35 @@ def register_model(experiment, model, mse, model_name="sales_forecast_model"):
         
         logger.info(f"Model {model_name} registered successfully with MSE: {mse_float:.2f}")
         
-        # Clean up temporary file
-        os.remove(model_filename)
-        
     except Exception as e:
-        logger.error(f"Failed to register model: {str(e)}")
-        # Ensure file is cleaned up even if error occurs
-        if os.path.exists(model_filename):
-            os.remove(model_filename)
-        raise
\ No newline at end of file
+        logger.error(f"Failed to mirror model to Comet: {str(e)}")
+        if registry is None:
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the local model registry or move stage pointers")
+    parser.add_argument("--root", default=TRAINING_CONFIG["registry_dir"])
+    parser.add_argument("--model-name", default=TRAINING_CONFIG["model_name"])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    promote = sub.add_parser("promote")
+    promote.add_argument("version")
+    promote.add_argument("--stage", default=PRODUCTION_STAGE)
+    args = parser.parse_args()
+
+    registry = LocalModelRegistry(args.root, args.model_name)
+    if args.command == "promote":
+        registry.promote(args.version, args.stage)
+        return
+    try:
+        production = registry.resolve()
+    except FileNotFoundError:
+        production = None
+    for version, meta in sorted(registry.versions().items(), key=lambda kv: kv[1]["registered_at"]):
+        marker = "*" if version == production else " "
+        print(f"{marker} {version}  mse={meta.get('mse')}  data={meta.get('data_fingerprint')}  {meta['registered_at'][:19]}")
+
+
+if __name__ == "__main__":
+    main()
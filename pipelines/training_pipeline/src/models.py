@@ -1,36 +1,77 @@
-import joblib
 import numpy as np
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit
 from lightgbm import LGBMRegressor
 
-def train_and_tune_model(X, y, test_size=0.2, random_state=42):
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
-    )
+from src.config import TRAINING_CONFIG
+from src.resources import split_thread_budget
+from src.trial_cache import TrialCache
+from src.tuning import count_fit_tasks, tune_lightgbm, expand_grid
 
-    # Define model and param grid
-    model = LGBMRegressor(random_state=random_state)
+PARAM_GRID = {
+    'n_estimators': [100, 200],
+    'max_depth': [3, 5, 7],
+    'learning_rate': [0.05, 0.1, 0.2],
+    'num_leaves': [31, 50],
+}
 
-    param_grid = {
-        'n_estimators': [100, 200],
-        'max_depth': [3, 5, 7],
-        'learning_rate': [0.05, 0.1, 0.2],
-        'num_leaves': [31, 50],
-    }
 
-    grid = GridSearchCV(
-        estimator=model,
-        param_grid=param_grid,
-        scoring='neg_mean_squared_error',
-        cv=3,
-        n_jobs=-1,
-        verbose=1
+def train_and_tune_model(X, y, test_size=0.2, random_state=42, n_splits=3, engine="native"):
+    # Rows come in time order from engineer_features: hold out the most
+    # recent slice instead of shuffling the future into training.
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, shuffle=False
     )
 
-    grid.fit(X_train, y_train)
-    best_model = grid.best_estimator_
+    # Split the core budget between parallel trials and LightGBM threads;
+    # the native engine trains one booster per n_estimators group and fold
+    if engine == "native":
+        n_tasks = count_fit_tasks(PARAM_GRID, n_splits)
+    else:
+        n_tasks = len(expand_grid(PARAM_GRID)) * n_splits
+    outer_jobs, inner_threads = split_thread_budget(
+        budget=TRAINING_CONFIG["cpu_budget"],
+        outer_jobs=TRAINING_CONFIG["outer_jobs"],
+        inner_threads=TRAINING_CONFIG["inner_threads"],
+        n_tasks=n_tasks,
+    )
+    total_threads = outer_jobs * inner_threads
+
+    if engine == "native":
+        # Binned once, time-ordered folds, lgb.train per uncached candidate
+        cache = TrialCache(TRAINING_CONFIG["trial_cache"]) if TRAINING_CONFIG["trial_cache"] else None
+        try:
+            search = tune_lightgbm(
+                X_train, y_train,
+                param_grid=PARAM_GRID,
+                n_splits=n_splits,
+                base_params={'random_state': random_state},
+                n_jobs=outer_jobs,
+                num_threads=inner_threads,
+                cache=cache,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        best_params = search["best_params"]
+        best_model = LGBMRegressor(
+            random_state=random_state, n_jobs=total_threads, verbose=-1, **best_params
+        )
+        best_model.fit(X_train, y_train)
+    elif engine == "sklearn":
+        grid = GridSearchCV(
+            estimator=LGBMRegressor(random_state=random_state, n_jobs=inner_threads),
+            param_grid=PARAM_GRID,
+            scoring='neg_mean_squared_error',
+            cv=TimeSeriesSplit(n_splits=n_splits),
+            n_jobs=outer_jobs,
+            verbose=1
+        )
+        grid.fit(X_train, y_train)
+        best_model = grid.best_estimator_
+        best_params = grid.best_params_
+    else:
+        raise ValueError(f"Unknown tuning engine: {engine}")
 
     # Evaluate
     y_pred = best_model.predict(X_test)
@@ -38,13 +79,10 @@ def train_and_tune_model(X, y, test_size=0.2, random_state=42):
     rmse = np.sqrt(mse)
     r2 = r2_score(y_test, y_pred)
 
-    # Save best model
-    joblib.dump(best_model, "model.pkl")
-
     # Return all useful outputs
     return {
         "model": best_model,
-        "best_params": grid.best_params_,
+        "best_params": best_params,
         "mse": round(mse, 2),
         "rmse": round(rmse, 2),
         "r2": round(r2, 3),
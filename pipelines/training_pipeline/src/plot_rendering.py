@@ -0,0 +1,187 @@
+# src/plot_rendering.py
+"""
+Off-thread evaluation plots: every figure is drawn and saved by its own
+worker process on the Agg backend, and the saved files are handed to a
+background thread that uploads them, so the training run does not wait
+on matplotlib or the network.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from src.resources import available_cpus
+from src.visualization import PLOT_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Keyword arguments for savefig per output format; svgz is gzip-compressed SVG
+_SAVE_OPTIONS = {
+    "png": {"dpi": 100, "pil_kwargs": {"optimize": True}},
+    "svg": {},
+    "svgz": {},
+}
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def _render_plot(name, y_true, y_pred, feature_importances, visualizer_kwargs, out_dir, formats):
+    import matplotlib.pyplot as plt
+    from src.visualization import ModelVisualizer
+
+    fig = ModelVisualizer(**visualizer_kwargs).create_plot(name, y_true, y_pred, feature_importances)
+    paths = []
+    try:
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            fig.savefig(path, format=fmt, **_SAVE_OPTIONS[fmt])
+            paths.append(path)
+    finally:
+        plt.close(fig)
+    return name, paths
+
+
+class BackgroundUploader:
+    """
+    Runs upload calls one at a time on a daemon thread
+
+    Failures are logged and skipped, so a flaky tracking server never
+    fails the training run.
+    """
+
+    def __init__(self, experiment):
+        self.experiment = experiment
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="artifact-uploader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            name, path = item
+            try:
+                if path.endswith(".png"):
+                    self.experiment.log_image(path, name=name, overwrite=True)
+                else:
+                    self.experiment.log_asset(path, file_name=os.path.basename(path), overwrite=True)
+            except Exception as e:
+                logger.warning(f"Upload of {path} failed: {e}")
+
+    def submit(self, name: str, path: str):
+        self._queue.put((name, path))
+
+    def close(self, timeout: float = None):
+        """Upload everything queued so far, then stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Artifact uploads still running after timeout")
+
+
+def _queue_uploads(future, name, uploader, queued):
+    try:
+        if not future.cancelled() and future.exception() is None:
+            for path in future.result()[1]:
+                uploader.submit(name, path)
+    finally:
+        queued.set()
+
+
+class PlotRenderJob:
+    """Handle on plots being rendered in the background"""
+
+    def __init__(self, futures: dict, executor: ProcessPoolExecutor, queued: list):
+        self.futures = futures
+        self._executor = executor
+        # Set once a finished plot's files are on the upload queue; the
+        # done-callback runs after waiters wake, so wait() checks these too
+        self._queued = queued
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Block until rendering finishes
+
+        Returns:
+            Dictionary of {plot name: list of saved file paths} for the
+            plots that rendered successfully
+        """
+        wait(list(self.futures.values()), timeout=timeout)
+        for event in self._queued:
+            event.wait(timeout)
+        paths = {}
+        for name, future in self.futures.items():
+            if not future.done():
+                logger.warning(f"Plot {name} still rendering after timeout")
+            elif future.exception() is not None:
+                logger.warning(f"Plot {name} failed: {future.exception()}")
+            else:
+                paths[name] = future.result()[1]
+        self._executor.shutdown(wait=False)
+        return paths
+
+
+def render_evaluation_plots(
+    y_true,
+    y_pred,
+    out_dir: str,
+    feature_importances: dict = None,
+    model_name: str = "Model",
+    target_name: str = "sub_total",
+    mode: str = "auto",
+    formats=("png", "svgz"),
+    uploader: BackgroundUploader = None,
+    max_workers: int = 0
+) -> PlotRenderJob:
+    """
+    Start rendering the evaluation plots in a process pool and return at once
+
+    Args:
+        y_true: Array of true target values
+        y_pred: Array of predicted values
+        out_dir: Directory the image files are written to
+        feature_importances: Dictionary of {feature_name: importance_score}
+        model_name: Display name for plot titles
+        target_name: Name of target variable (for axis labels)
+        mode: Plot mode passed to ModelVisualizer ("auto", "full", "large")
+        formats: File formats to save, any of "png", "svg", "svgz"
+        uploader: If given, every saved file is queued on it as it completes
+        max_workers: Worker processes, 0 for one per plot up to the CPU count
+
+    Returns:
+        PlotRenderJob; call wait() before shutting down
+    """
+    unknown = set(formats) - set(_SAVE_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported plot formats: {sorted(unknown)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    names = [name for name in PLOT_NAMES if name != "feature_importance" or feature_importances]
+    workers = max_workers or min(len(names), available_cpus())
+    visualizer_kwargs = {"model_name": model_name, "target_name": target_name, "mode": mode}
+
+    # spawn: the pipeline already runs LightGBM/OpenMP and logger threads, and forking those can deadlock
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker)
+    futures, queued = {}, []
+    for name in names:
+        future = executor.submit(
+            _render_plot, name, y_true, y_pred, feature_importances,
+            visualizer_kwargs, out_dir, tuple(formats),
+        )
+        if uploader is not None:
+            event = threading.Event()
+            future.add_done_callback(
+                lambda f, name=name, event=event: _queue_uploads(f, name, uploader, event)
+            )
+            queued.append(event)
+        futures[name] = future
+    logger.info(f"Rendering {len(names)} plots in {workers} background processes")
+    return PlotRenderJob(futures, executor, queued)
@@ -0,0 +1,119 @@
+# src/quantile_models.py
+"""
+Prediction intervals from one LightGBM quantile model per level (P10, P50,
+P90 by default), all trained in parallel on a single binned Dataset.
+"""
+
+import logging
+
+import lightgbm as lgb
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.resources import split_thread_budget
+from src.tuning import build_dataset, to_native_params
+
+logger = logging.getLogger(__name__)
+
+
+def quantile_label(alpha: float) -> str:
+    """0.1 -> 'p10'"""
+    return f"p{round(alpha * 100):02d}"
+
+
+def _fit_quantile(dataset, native, num_boost_round, alpha):
+    return alpha, lgb.train({**native, "objective": "quantile", "alpha": alpha}, dataset,
+                            num_boost_round=num_boost_round)
+
+
+def train_quantile_models(X, y, params: dict, quantiles=(0.1, 0.5, 0.9), cpu_budget: int = 0) -> dict:
+    """
+    Fit one quantile booster per level on a shared binned Dataset
+
+    Args:
+        X: Feature matrix (training rows only)
+        y: Target values aligned with X
+        params: sklearn-style LGBMRegressor params (e.g. best_params)
+        quantiles: Quantile levels in (0, 1)
+        cpu_budget: Cores to use, 0 for all available
+
+    Returns:
+        Dictionary of {alpha: lgb.Booster}
+    """
+    outer, inner = split_thread_budget(budget=cpu_budget, n_tasks=len(quantiles))
+    native, num_boost_round = to_native_params(params)
+    native["num_threads"] = inner
+
+    dataset = build_dataset(X, y)
+    logger.info(f"Training {len(quantiles)} quantile models: {outer} jobs x {inner} threads")
+    fitted = Parallel(n_jobs=outer, prefer="threads")(
+        delayed(_fit_quantile)(dataset, native, num_boost_round, alpha) for alpha in quantiles
+    )
+    return dict(sorted(fitted))
+
+
+def _continue_quantile(X, y, native, num_boost_round, alpha, booster):
+    # Own Dataset per model: lgb.train stores the init model's scores on it
+    dataset = lgb.Dataset(X, label=y, params={"verbosity": -1}, free_raw_data=False)
+    return alpha, lgb.train({**native, "objective": "quantile", "alpha": alpha}, dataset,
+                            num_boost_round=num_boost_round, init_model=booster)
+
+
+def update_quantile_models(models: dict, X, y, params: dict, rounds: int, cpu_budget: int = 0) -> dict:
+    """
+    Warm start: continue boosting every quantile model on new rows
+
+    Args:
+        models: {alpha: lgb.Booster} of the previous bundle
+        X: Feature matrix of the new rows (scaled with the previous scaler)
+        y: Target values aligned with X
+        params: sklearn-style params the models were trained with
+        rounds: Boosting rounds added to each model
+        cpu_budget: Cores to use, 0 for all available
+
+    Returns:
+        Dictionary of {alpha: lgb.Booster}
+    """
+    outer, inner = split_thread_budget(budget=cpu_budget, n_tasks=len(models))
+    native, _ = to_native_params(params)
+    native["num_threads"] = inner
+
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=float)
+    logger.info(f"Updating {len(models)} quantile models with {rounds} rounds on {len(X)} rows")
+    fitted = Parallel(n_jobs=outer, prefer="threads")(
+        delayed(_continue_quantile)(X, y, native, rounds, alpha, booster)
+        for alpha, booster in models.items()
+    )
+    return dict(sorted(fitted))
+
+
+def predict_quantiles(models: dict, X) -> np.ndarray:
+    """
+    Predictions of every quantile model, shape (n_rows, n_quantiles)
+
+    Rows are sorted across quantiles, so separately fitted models never
+    return crossing intervals (P10 above P50, ...).
+    """
+    X = np.asarray(X)
+    preds = np.column_stack([models[alpha].predict(X) for alpha in sorted(models)])
+    return np.sort(preds, axis=1)
+
+
+def quantile_metrics(models: dict, X, y) -> dict:
+    """
+    Pinball loss per level and the empirical coverage of the outer interval
+    """
+    y = np.asarray(y, dtype=float)
+    alphas = sorted(models)
+    preds = predict_quantiles(models, X)
+    metrics = {}
+    for i, alpha in enumerate(alphas):
+        diff = y - preds[:, i]
+        metrics[f"pinball_{quantile_label(alpha)}"] = float(np.mean(np.maximum(alpha * diff, (alpha - 1) * diff)))
+        metrics[f"below_{quantile_label(alpha)}"] = float(np.mean(diff < 0))
+    if len(alphas) > 1:
+        inside = (y >= preds[:, 0]) & (y <= preds[:, -1])
+        metrics["interval_coverage"] = float(inside.mean())
+        metrics["interval_nominal"] = alphas[-1] - alphas[0]
+    return metrics
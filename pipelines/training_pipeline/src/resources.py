@@ -0,0 +1,87 @@
+# src/resources.py
+"""
+CPU budget for nested parallelism: outer parallel trials x inner LightGBM
+threads must not exceed the cores this process is actually allowed to use.
+"""
+
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+_CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V1_DIRS = ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct")
+
+
+def _read(path: str):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit():
+    """CPU quota from cgroup v2 or v1 as a (fractional) core count, or None"""
+    cpu_max = _read(_CGROUP_V2_CPU_MAX)
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    for directory in _CGROUP_V1_DIRS:
+        quota = _read(os.path.join(directory, "cpu.cfs_quota_us"))
+        period = _read(os.path.join(directory, "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> int:
+    """Cores usable by this process: affinity mask capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return cpus
+
+
+def split_thread_budget(budget: int = 0, outer_jobs: int = 0, inner_threads: int = 0, n_tasks: int = None) -> tuple:
+    """
+    Split a core budget into (outer parallel jobs, threads per LightGBM fit)
+
+    Args:
+        budget: Total cores to use; 0 means available_cpus()
+        outer_jobs: Fixed number of parallel trials; 0 derives it
+        inner_threads: Fixed LightGBM num_threads; 0 derives it
+        n_tasks: Number of independent fits, caps the outer parallelism
+
+    Returns:
+        (outer_jobs, inner_threads) with outer_jobs * inner_threads <= budget
+    """
+    budget = budget or available_cpus()
+    if outer_jobs and inner_threads:
+        if outer_jobs * inner_threads > budget:
+            logger.warning(
+                f"{outer_jobs} jobs x {inner_threads} threads exceeds the "
+                f"{budget}-core budget; expect oversubscription"
+            )
+        return outer_jobs, inner_threads
+
+    if inner_threads:
+        outer_jobs = max(1, budget // inner_threads)
+    elif not outer_jobs:
+        # Many small independent fits scale better across trials than
+        # inside a single LightGBM fit.
+        outer_jobs = budget
+    if n_tasks:
+        outer_jobs = min(outer_jobs, n_tasks)
+    outer_jobs = max(1, min(outer_jobs, budget))
+    inner_threads = inner_threads or max(1, budget // outer_jobs)
+    return outer_jobs, inner_threads
@@ -0,0 +1,140 @@
+# src/segment_models.py
+"""
+Local models per segment (marketplace, category, ...) trained in a process
+pool and compared with the global model on the global holdout rows. The
+segments whose local model wins (routed_segments) ship in the model bundle
+and the inference predictor routes their rows to it.
+"""
+
+import logging
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+from sklearn.metrics import mean_squared_error
+
+from src.resources import split_thread_budget
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux)"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _fit_segment(segment, X_train, y_train, X_eval, y_eval, params):
+    start = time.perf_counter()
+    rss_before = _rss_mb()
+
+    model = LGBMRegressor(**params)
+    model.fit(X_train, y_train)
+    mse = mean_squared_error(y_eval, model.predict(X_eval)) if len(y_eval) else float("nan")
+
+    stats = {
+        "rows": len(X_train) + len(X_eval),
+        "holdout_rows": len(X_eval),
+        "seconds": round(time.perf_counter() - start, 2),
+        "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+        # ru_maxrss is KB on Linux and covers the worker's whole lifetime
+        "worker_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "holdout_mse": float(mse),
+    }
+    return segment, model, stats
+
+
+def train_segment_models(X, y, segments, global_model, params: dict, n_train: int,
+                         min_rows: int = 500, cpu_budget: int = 0):
+    """
+    Fit one LGBMRegressor per segment in a process pool
+
+    Local models train on the same rows as the global model (the first
+    n_train) and both are scored on the segment's rows of the global
+    holdout, so the comparison is out of sample for both.
+
+    Args:
+        X: Feature matrix, rows ordered oldest to newest
+        y: Target values aligned with X
+        segments: Segment label per row (e.g. meta['marketplace_name'])
+        global_model: Global model fitted on the first n_train rows
+        params: LGBMRegressor params for every local model (e.g. best_params)
+        n_train: Rows before the global holdout
+        min_rows: Segments with fewer training rows stay on the global model
+        cpu_budget: Cores to use, 0 for all available
+
+    Returns:
+        (models, report): {segment value: fitted model} and one report row
+        per segment with local_holdout_mse and global_holdout_mse
+    """
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=float)
+    segments = pd.Series(np.asarray(segments))
+    segment_rows = segments.groupby(segments, sort=False).indices
+    split = {value: np.searchsorted(rows, n_train) for value, rows in segment_rows.items()}
+
+    # Largest first so the long fits start early and small ones fill gaps
+    eligible = sorted(
+        (value for value in segment_rows if split[value] >= min_rows),
+        key=lambda value: len(segment_rows[value]),
+        reverse=True,
+    )
+    report = {
+        value: {"rows": len(rows), "model": "global"}
+        for value, rows in segment_rows.items() if split[value] < min_rows
+    }
+
+    models = {}
+    if eligible:
+        workers, threads = split_thread_budget(budget=cpu_budget, n_tasks=len(eligible))
+        fit_params = {**params, "n_jobs": threads, "verbose": -1}
+        logger.info(f"Training {len(eligible)} segment models: {workers} workers x {threads} threads")
+        # spawn: forking after LightGBM/OpenMP and logger threads have started can deadlock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = []
+            for value in eligible:
+                train_rows, eval_rows = np.split(segment_rows[value], [split[value]])
+                futures.append(pool.submit(
+                    _fit_segment, value, X[train_rows], y[train_rows], X[eval_rows], y[eval_rows], fit_params,
+                ))
+            for future in as_completed(futures):
+                value, model, stats = future.result()
+                eval_rows = segment_rows[value][split[value]:]
+                stats["local_holdout_mse"] = stats.pop("holdout_mse")
+                stats["global_holdout_mse"] = float(mean_squared_error(
+                    y[eval_rows], global_model.predict(X[eval_rows])
+                )) if len(eval_rows) else float("nan")
+                models[value] = model
+                report[value] = {**stats, "model": "local"}
+                logger.info(f"Segment {value!r}: {stats}")
+
+    for value, row in report.items():
+        if row["model"] == "global":
+            logger.info(f"Segment {value!r}: {row['rows']} rows, using global model")
+
+    report_df = pd.DataFrame.from_dict(report, orient="index").rename_axis("segment").reset_index()
+    return models, report_df
+
+
+def routed_segments(models: dict, report: pd.DataFrame) -> dict:
+    """
+    Local models worth serving: those with a lower holdout MSE than the
+    global model on their segment's rows
+
+    Args:
+        models: {segment value: fitted model} from train_segment_models
+        report: Its per-segment report
+
+    Returns:
+        Subset of models; segments without a holdout comparison stay global
+    """
+    if not models or not {"local_holdout_mse", "global_holdout_mse"} <= set(report.columns):
+        return {}
+    wins = report[report["local_holdout_mse"] < report["global_holdout_mse"]]["segment"]
+    return {value: models[value] for value in wins if value in models}
@@ -0,0 +1,166 @@
+# src/trial_cache.py
+"""
+On-disk cache of CV fold scores, so repeated or extended searches only fit
+parameter combinations they have not seen on the same data.
+
+Usage:
+    python -m src.trial_cache list
+    python -m src.trial_cache prune --older-than-days 30
+    python -m src.trial_cache prune --dataset <fingerprint>
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import lightgbm
+import numpy as np
+import sklearn
+
+from src.config import TRAINING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Params that change speed but not the fitted model
+_IGNORED_PARAMS = {"num_threads", "n_jobs", "verbosity", "verbose"}
+
+
+def dataset_fingerprint(X, y) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (np.asarray(X, dtype=float), np.asarray(y, dtype=float)):
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def folds_fingerprint(folds) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for train_idx, val_idx in folds:
+        digest.update(np.asarray(train_idx, dtype=np.int64).tobytes())
+        digest.update(b"|")
+        digest.update(np.asarray(val_idx, dtype=np.int64).tobytes())
+        digest.update(b";")
+    return digest.hexdigest()
+
+
+def library_versions() -> dict:
+    return {"lightgbm": lightgbm.__version__, "numpy": np.__version__, "sklearn": sklearn.__version__}
+
+
+class TrialCache:
+    """
+    SQLite store of per-fold MSE keyed by (dataset, folds, params, versions)
+
+    Attributes:
+        path: Location of the SQLite file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS trials (
+                trial_key TEXT NOT NULL,
+                fold INTEGER NOT NULL,
+                dataset TEXT NOT NULL,
+                params TEXT NOT NULL,
+                versions TEXT NOT NULL,
+                mse REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (trial_key, fold)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS trials_dataset ON trials (dataset)")
+        self._versions = json.dumps(library_versions(), sort_keys=True)
+
+    @staticmethod
+    def _params_json(params: dict) -> str:
+        kept = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+        return json.dumps(kept, sort_keys=True, default=str)
+
+    def _trial_key(self, dataset: str, folds: str, params: dict) -> str:
+        raw = "\n".join([dataset, folds, self._params_json(params), self._versions])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get(self, dataset: str, folds: str, params: dict) -> dict:
+        """Cached {fold: mse} for one candidate, possibly partial or empty"""
+        rows = self._conn.execute(
+            "SELECT fold, mse FROM trials WHERE trial_key = ?",
+            (self._trial_key(dataset, folds, params),),
+        )
+        return dict(rows.fetchall())
+
+    def put(self, dataset: str, folds: str, params: dict, fold_scores: dict):
+        key = self._trial_key(dataset, folds, params)
+        now = datetime.now().isoformat()
+        params_json = self._params_json(params)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, fold, dataset, params_json, self._versions, mse, now)
+                 for fold, mse in fold_scores.items()],
+            )
+
+    def summary(self) -> list:
+        """One row per dataset fingerprint: trial count and age range"""
+        rows = self._conn.execute(
+            """
+            SELECT dataset, COUNT(DISTINCT trial_key), COUNT(*), MIN(created_at), MAX(created_at)
+            FROM trials GROUP BY dataset ORDER BY MAX(created_at) DESC
+            """
+        )
+        columns = ["dataset", "trials", "fold_scores", "first_seen", "last_seen"]
+        return [dict(zip(columns, row)) for row in rows.fetchall()]
+
+    def prune(self, older_than_days: int = None, dataset: str = None) -> int:
+        """Delete fold scores by age and/or dataset; returns rows removed"""
+        clauses, args = [], []
+        if older_than_days is not None:
+            clauses.append("created_at < ?")
+            args.append((datetime.now() - timedelta(days=older_than_days)).isoformat())
+        if dataset is not None:
+            clauses.append("dataset = ?")
+            args.append(dataset)
+        if not clauses:
+            raise ValueError("prune needs older_than_days and/or dataset")
+        with self._conn:
+            deleted = self._conn.execute(f"DELETE FROM trials WHERE {' AND '.join(clauses)}", args).rowcount
+        self._conn.execute("VACUUM")
+        return deleted
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the CV trial cache")
+    parser.add_argument("--path", default=TRAINING_CONFIG["trial_cache"])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    prune = sub.add_parser("prune")
+    prune.add_argument("--older-than-days", type=int)
+    prune.add_argument("--dataset")
+    args = parser.parse_args()
+
+    cache = TrialCache(args.path)
+    if args.command == "list":
+        for row in cache.summary():
+            print(
+                f"{row['dataset']}  {row['trials']:>5} trials  {row['fold_scores']:>6} fold scores  "
+                f"{row['first_seen'][:19]} .. {row['last_seen'][:19]}"
+            )
+    else:
+        print(f"Removed {cache.prune(args.older_than_days, args.dataset)} fold scores")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# src/tuning.py
+"""
+Hyperparameter tuning engine built on LightGBM's native training API.
+
+The feature matrix is binned into a single lgb.Dataset once; every
+time-ordered CV fold is a subset of that Dataset, so histogram binning is
+paid once per search instead of once per (fold, candidate) pair.
+"""
+
+import itertools
+import logging
+
+import lightgbm as lgb
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.trial_cache import dataset_fingerprint, folds_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# sklearn-style parameter names that map to something else in lgb.train
+_NATIVE_ALIASES = {
+    "random_state": "seed",
+    "n_jobs": "num_threads",
+}
+
+
+def time_series_folds(n_samples: int, n_splits: int = 3):
+    """Expanding-window folds over rows that are already sorted by time"""
+    splitter = TimeSeriesSplit(n_splits=n_splits)
+    return list(splitter.split(np.arange(n_samples)))
+
+
+def build_dataset(X, y, params=None) -> lgb.Dataset:
+    """Bin X once and keep the raw data around so folds can be subset from it"""
+    dataset = lgb.Dataset(
+        np.asarray(X),
+        label=np.asarray(y, dtype=float),
+        params={"verbosity": -1, **(params or {})},
+        free_raw_data=False,
+    )
+    return dataset.construct()
+
+
+def to_native_params(params: dict) -> tuple:
+    """
+    Split sklearn-style LGBMRegressor params into (lgb.train params, rounds)
+    """
+    native = {"objective": "regression", "verbosity": -1}
+    num_boost_round = 100
+    for key, value in params.items():
+        if key == "n_estimators":
+            num_boost_round = int(value)
+        else:
+            native[_NATIVE_ALIASES.get(key, key)] = value
+    return native, num_boost_round
+
+
+def expand_grid(param_grid: dict) -> list:
+    keys = sorted(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+
+def _key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def _group_by_rounds(candidates: list) -> dict:
+    """
+    Candidates that only differ in n_estimators share one booster: train the
+    largest round count and score the smaller ones with num_iteration.
+    """
+    groups = {}
+    for params in candidates:
+        rest = tuple(sorted((k, v) for k, v in params.items() if k != "n_estimators"))
+        groups.setdefault(rest, []).append(params)
+    return groups
+
+
+def count_fit_tasks(param_grid: dict, n_splits: int) -> int:
+    """Boosters tune_lightgbm trains for a grid without cached scores"""
+    return len(_group_by_rounds(expand_grid(param_grid))) * n_splits
+
+
+def _fit_fold(fold_set, X_val, y_val, base_params, round_counts):
+    native, _ = to_native_params(base_params)
+    booster = lgb.train(native, fold_set, num_boost_round=max(round_counts))
+    return {
+        rounds: float(np.mean((y_val - booster.predict(X_val, num_iteration=rounds)) ** 2))
+        for rounds in round_counts
+    }
+
+
+def tune_lightgbm(X, y, param_grid: dict, n_splits: int = 3, base_params=None,
+                  n_jobs: int = 1, num_threads: int = 0, cache=None) -> dict:
+    """
+    Grid search over param_grid with time-ordered CV on a shared binned Dataset
+
+    Args:
+        X: Feature matrix, rows ordered oldest to newest
+        y: Target values aligned with X
+        param_grid: sklearn-style grid, e.g. {'num_leaves': [31, 50]}
+        n_splits: Number of expanding-window CV folds
+        base_params: Params applied to every candidate (e.g. random_state)
+        n_jobs: Fits run in parallel (threads; LightGBM releases the GIL)
+        num_threads: LightGBM threads per fit, 0 for LightGBM's default
+        cache: Optional TrialCache; only fold scores it lacks are fitted
+
+    Returns:
+        Dictionary with best_params, best_score (mean fold MSE) and cv_results
+    """
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=float)
+    base_params = dict(base_params or {})
+    if num_threads:
+        base_params["num_threads"] = num_threads
+
+    folds = time_series_folds(len(X), n_splits)
+    candidates = expand_grid(param_grid)
+
+    # {candidate key: {fold: mse}}, pre-filled from the cache when given
+    scores = {_key(c): {} for c in candidates}
+    if cache is not None:
+        data_fp, folds_fp = dataset_fingerprint(X, y), folds_fingerprint(folds)
+        for candidate in candidates:
+            scores[_key(candidate)] = cache.get(data_fp, folds_fp, {**base_params, **candidate})
+
+    # One task per (param group, fold) that still has a missing candidate
+    groups = list(_group_by_rounds(candidates).items())
+    tasks = []
+    for g, (_, group) in enumerate(groups):
+        for f in range(len(folds)):
+            missing = sorted({p.get("n_estimators", 100) for p in group if f not in scores[_key(p)]})
+            if missing:
+                tasks.append((g, f, missing))
+
+    if tasks:
+        full_set = build_dataset(X, y)
+        # Subsets reuse the parent's bin mappers; build them up front so the
+        # parallel trial loop only trains.
+        fold_sets = {
+            f: full_set.subset(folds[f][0]).construct()
+            for f in sorted({f for _, f, _ in tasks})
+        }
+        outputs = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_fit_fold)(
+                fold_sets[f], X[folds[f][1]], y[folds[f][1]],
+                {**base_params, **dict(groups[g][0])}, rounds,
+            )
+            for g, f, rounds in tasks
+        )
+        fresh = {}
+        for (g, f, _), output in zip(tasks, outputs):
+            for candidate in groups[g][1]:
+                rounds = candidate.get("n_estimators", 100)
+                if rounds in output:
+                    scores[_key(candidate)][f] = output[rounds]
+                    fresh.setdefault(_key(candidate), {})[f] = output[rounds]
+        if cache is not None:
+            for candidate in candidates:
+                if _key(candidate) in fresh:
+                    cache.put(data_fp, folds_fp, {**base_params, **candidate}, fresh[_key(candidate)])
+
+    cv_results = []
+    for candidate in candidates:
+        fold_mse = [scores[_key(candidate)][f] for f in range(len(folds))]
+        cv_results.append({"params": candidate, "fold_mse": fold_mse, "mean_mse": float(np.mean(fold_mse))})
+    best = min(cv_results, key=lambda r: r["mean_mse"])
+    logger.info(
+        f"Evaluated {len(candidates)} candidates x {len(folds)} folds with {len(tasks)} fits "
+        f"({n_jobs} jobs x {num_threads or 'default'} threads), "
+        f"best CV MSE {best['mean_mse']:.4f} with {best['params']}"
+    )
+    return {
+        "best_params": best["params"],
+        "best_score": best["mean_mse"],
+        "cv_results": cv_results,
+    }
@@ -9,6 +9,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from sklearn.metrics import r2_score
+from statsmodels.nonparametric.smoothers_lowess import lowess
 
 # Configure global plot settings
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -20,6 +21,8 @@ plt.rcParams.update({
     'axes.labelsize': 12
 })
 
+PLOT_NAMES = ("actual_vs_predicted", "residual_analysis", "error_distribution", "feature_importance")
+
 class ModelVisualizer:
     """
     Creates consistent evaluation visualizations with configurable styling
@@ -28,17 +31,35 @@ class ModelVisualizer:
         model_name: Display name for plot titles
         target_name: Name of target variable (for axis labels)
         figsize: Default figure size (width, height)
+        mode: "full" draws every point, "large" draws densities, binned
+            curves and histograms, "auto" picks by row count
+        large_threshold: Row count from which "auto" switches to "large"
+        sample_size: Points used for lowess and overlays in "large" mode
     """
     
     def __init__(
         self,
         model_name: str = "Model",
         target_name: str = "sub_total",
-        figsize: tuple = (10, 6)
+        figsize: tuple = (10, 6),
+        mode: str = "auto",
+        large_threshold: int = 100_000,
+        sample_size: int = 20_000
     ):
+        if mode not in ("auto", "full", "large"):
+            raise ValueError(f"Unknown plot mode: {mode}")
         self.model_name = model_name
         self.target_name = target_name
         self.figsize = figsize
+        self.mode = mode
+        self.large_threshold = large_threshold
+        self.sample_size = sample_size
+
+    def is_large(self, n_rows: int) -> bool:
+        """Whether n_rows should be drawn with the large-data plots"""
+        if self.mode == "auto":
+            return n_rows >= self.large_threshold
+        return self.mode == "large"
         
     def create_plots(
         self,
@@ -57,26 +78,50 @@ class ModelVisualizer:
         Returns:
             Dictionary mapping plot names to matplotlib Figures
         """
-        plots = {}
+        names = [name for name in PLOT_NAMES if name != "feature_importance" or feature_importances]
+        return {
+            name: self.create_plot(name, y_true, y_pred, feature_importances)
+            for name in names
+        }
+
+    def create_plot(
+        self,
+        name: str,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        feature_importances: Optional[Dict[str, float]] = None
+    ) -> plt.Figure:
+        """
+        Generates a single evaluation plot by name (one of PLOT_NAMES)
+        """
+        if name == "feature_importance":
+            return self._create_feature_importance_plot(feature_importances)
+        
+        y_true = np.asarray(y_true, dtype=float)
+        y_pred = np.asarray(y_pred, dtype=float)
         residuals = y_true - y_pred
-        r2 = r2_score(y_true, y_pred)
+        large = self.is_large(len(y_true))
         
         # 1. Prediction Scatter Plot
-        plots["actual_vs_predicted"] = self._create_scatter_plot(y_true, y_pred, r2)
+        if name == "actual_vs_predicted":
+            r2 = r2_score(y_true, y_pred)
+            if large:
+                return self._create_density_plot(y_true, y_pred, r2)
+            return self._create_scatter_plot(y_true, y_pred, r2)
         
         # 2. Residual Analysis
-        plots["residual_analysis"] = self._create_residual_plot(y_pred, residuals)
+        if name == "residual_analysis":
+            if large:
+                return self._create_binned_residual_plot(y_pred, residuals)
+            return self._create_residual_plot(y_pred, residuals)
         
         # 3. Error Distribution
-        plots["error_distribution"] = self._create_error_histogram(residuals)
-        
-        # 4. Feature Importance (if provided)
-        if feature_importances:
-            plots["feature_importance"] = self._create_feature_importance_plot(
-                feature_importances
-            )
+        if name == "error_distribution":
+            if large:
+                return self._create_binned_error_histogram(residuals)
+            return self._create_error_histogram(residuals)
         
-        return plots
+        raise ValueError(f"Unknown plot: {name}")
     
     def _create_scatter_plot(
         self,
@@ -164,6 +209,112 @@ class ModelVisualizer:
         fig.tight_layout()
         return fig
     
+    def _stratified_sample(self, values: np.ndarray, n_strata: int = 50) -> np.ndarray:
+        """Row indices sampled evenly across quantile strata of values"""
+        if len(values) <= self.sample_size:
+            return np.arange(len(values))
+        rng = np.random.default_rng(0)
+        edges = np.quantile(values, np.linspace(0, 1, n_strata + 1)[1:-1])
+        strata = np.searchsorted(edges, values, side="right")
+        per_stratum = max(1, self.sample_size // n_strata)
+        order = np.argsort(strata, kind="stable")
+        starts = np.searchsorted(strata[order], np.arange(n_strata + 1))
+        picks = [
+            rng.choice(order[lo:hi], size=min(per_stratum, hi - lo), replace=False)
+            for lo, hi in zip(starts[:-1], starts[1:]) if hi > lo
+        ]
+        return np.sort(np.concatenate(picks))
+
+    def _create_density_plot(
+        self,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        r2: float
+    ) -> plt.Figure:
+        """Actual vs Predicted as a hexbin density (large data)"""
+        fig, ax = plt.subplots(figsize=self.figsize)
+        hb = ax.hexbin(y_true, y_pred, gridsize=80, bins="log", mincnt=1, cmap="viridis")
+        fig.colorbar(hb, ax=ax, label="Rows (log scale)")
+        
+        lo, hi = float(np.min(y_true)), float(np.max(y_true))
+        ax.plot([lo, hi], [lo, hi], 'r--', lw=2, label='Ideal')
+        
+        ax.set(
+            xlabel=f'Actual {self.target_name}',
+            ylabel=f'Predicted {self.target_name}',
+            title=f'{self.model_name} - Actual vs Predicted (R²={r2:.2f}, n={len(y_true):,})'
+        )
+        ax.legend()
+        fig.tight_layout()
+        return fig
+
+    def _create_binned_residual_plot(
+        self,
+        y_pred: np.ndarray,
+        residuals: np.ndarray,
+        n_bins: int = 50
+    ) -> plt.Figure:
+        """Binned mean residuals plus lowess on a stratified sample (large data)"""
+        fig, ax = plt.subplots(figsize=self.figsize)
+        
+        # Mean and 10-90% band of residuals per predicted-value quantile bin
+        edges = np.unique(np.quantile(y_pred, np.linspace(0, 1, n_bins + 1)))
+        if len(edges) < 2:
+            # Constant predictions: one bin around the single value
+            edges = np.array([edges[0] - 0.5, edges[0] + 0.5])
+        bins = np.clip(np.searchsorted(edges, y_pred, side="right") - 1, 0, len(edges) - 2)
+        counts = np.bincount(bins, minlength=len(edges) - 1)
+        filled = counts > 0
+        centers = ((edges[:-1] + edges[1:]) / 2)[filled]
+        means = (np.bincount(bins, weights=residuals, minlength=len(edges) - 1)[filled] / counts[filled])
+        order = np.argsort(bins, kind="stable")
+        groups = np.split(residuals[order], np.cumsum(counts)[:-1])
+        band = np.array([np.percentile(g, [10, 90]) for g in groups if len(g)])
+        ax.fill_between(centers, band[:, 0], band[:, 1], alpha=0.2, label='10-90% of residuals')
+        ax.plot(centers, means, 'o-', ms=3, label='Binned mean')
+        
+        sample = self._stratified_sample(y_pred)
+        ax.scatter(y_pred[sample], residuals[sample], s=2, alpha=0.15, color='gray', rasterized=True)
+        if np.ptp(y_pred[sample]) > 0:
+            smoothed = lowess(residuals[sample], y_pred[sample], frac=0.3, return_sorted=True)
+            ax.plot(smoothed[:, 0], smoothed[:, 1], color='red', lw=2, label=f'Lowess (n={len(sample):,} sample)')
+        
+        # Reference lines
+        ax.axhline(y=0, color='black', linestyle='--')
+        ax.axhline(y=np.mean(residuals), color='green', linestyle='-')
+        
+        ax.set(
+            xlabel='Predicted Values',
+            ylabel='Residuals',
+            title=f'{self.model_name} - Residual Analysis (n={len(residuals):,})'
+        )
+        ax.legend()
+        fig.tight_layout()
+        return fig
+
+    def _create_binned_error_histogram(
+        self,
+        residuals: np.ndarray,
+        n_bins: int = 60
+    ) -> plt.Figure:
+        """Error distribution from a precomputed histogram (large data)"""
+        fig, ax = plt.subplots(figsize=self.figsize)
+        counts, edges = np.histogram(residuals, bins=n_bins)
+        ax.stairs(counts, edges, fill=True, alpha=0.7)
+        
+        mean, std = np.mean(residuals), np.std(residuals)
+        ax.axvline(x=0, color='red', linestyle='--')
+        ax.axvline(x=mean, color='green', linestyle='-')
+        
+        ax.set(
+            xlabel='Prediction Error',
+            ylabel='Count',
+            title=f'{self.model_name} - Error Distribution\n'
+                  f'Mean Error: {mean:.2f} ± {std:.2f}'
+        )
+        fig.tight_layout()
+        return fig
+    
     def _create_feature_importance_plot(
         self,
         feature_importances: Dict[str, float]
@@ -198,7 +349,8 @@ def create_evaluation_plots(
     y_pred: np.ndarray,
     feature_importances: Optional[Dict[str, float]] = None,
     model_name: str = "Model",
-    target_name: str = "sub_total"
+    target_name: str = "sub_total",
+    mode: str = "auto"
 ) -> Dict[str, plt.Figure]:
     """
     One-shot function to generate all standard evaluation plots
@@ -211,5 +363,5 @@ def create_evaluation_plots(
             model_name="SalesForecaster"
         )
     """
-    visualizer = ModelVisualizer(model_name=model_name, target_name=target_name)
+    visualizer = ModelVisualizer(model_name=model_name, target_name=target_name, mode=mode)
     return visualizer.create_plots(y_true, y_pred, feature_importances)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import explained_variance_score, mean_absolute_error, mean_squared_error, r2_score
+
+from src.evaluation_engine import evaluate_predictions, segment_metrics
+
+
+# The sklearn/pandas implementations evaluate_predictions replaced
+
+def _reference_core(y_true, y_pred):
+    return {
+        "mse": mean_squared_error(y_true, y_pred),
+        "rmse": np.sqrt(mean_squared_error(y_true, y_pred)),
+        "mae": mean_absolute_error(y_true, y_pred),
+        "r2": r2_score(y_true, y_pred),
+        "explained_variance": explained_variance_score(y_true, y_pred),
+    }
+
+
+def _reference_errors(y_true, y_pred):
+    errors = y_true - y_pred
+    return {
+        "max_overprediction": errors.min(),
+        "max_underprediction": errors.max(),
+        "error_std": errors.std(),
+        "error_skew": pd.Series(errors).skew(),
+        "percentile_5th": np.percentile(errors, 5),
+        "percentile_95th": np.percentile(errors, 95),
+    }
+
+
+def _reference_business(y_true, y_pred, unit_cost, unit_price):
+    y_true = pd.Series(y_true).fillna(0)
+    y_pred = pd.Series(y_pred).fillna(0)
+    errors = y_true - y_pred
+    over_errors = errors[errors < 0]
+    under_errors = errors[errors > 0]
+    lost_profit = (under_errors * (unit_price - unit_cost)).sum()
+    waste_cost = (abs(over_errors) * unit_cost).sum()
+    cost_ratio = waste_cost / lost_profit if lost_profit != 0 else np.inf
+    return {
+        "total_predictions": len(y_true),
+        "underprediction_count": len(under_errors),
+        "overprediction_count": len(over_errors),
+        "total_lost_profit": round(lost_profit, 2),
+        "total_waste_cost": round(waste_cost, 2),
+        "total_business_cost": round(lost_profit + waste_cost, 2),
+        "waste_to_profit_ratio": round(cost_ratio, 2),
+        "net_revenue_impact": round((unit_price * y_true.sum()) - waste_cost, 2),
+    }
+
+
+def _holdout(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = pd.Series(rng.gamma(2.0, 50.0, n))
+    y_pred = y_true + rng.normal(5.0, 20.0, n)
+    return y_true, pd.Series(y_pred)
+
+
+@pytest.mark.parametrize("n", [500, 3])
+def test_matches_sklearn_and_pandas(n):
+    y_true, y_pred = _holdout(n)
+
+    result = evaluate_predictions(y_true, y_pred, unit_cost=10.0, unit_price=25.0)
+
+    assert result["core"] == pytest.approx(_reference_core(y_true, y_pred), rel=1e-9)
+    assert result["errors"] == pytest.approx(_reference_errors(y_true, y_pred), rel=1e-9)
+    assert result["business"] == pytest.approx(_reference_business(y_true, y_pred, 10.0, 25.0), rel=1e-9)
+
+
+def test_constant_target_follows_sklearn_convention():
+    y_true = pd.Series(np.full(20, 7.0))
+
+    for y_pred in (y_true.copy(), y_true + np.linspace(-1, 1, 20)):
+        assert evaluate_predictions(y_true, y_pred)["core"] == pytest.approx(_reference_core(y_true, y_pred))
+
+
+def test_missing_values_count_as_zero_for_business_impact():
+    y_true, y_pred = _holdout(50)
+    y_true[[3, 9]] = np.nan
+    y_pred[4] = np.nan
+
+    assert (evaluate_predictions(y_true, y_pred, 10.0, 25.0)["business"]
+            == pytest.approx(_reference_business(y_true, y_pred, 10.0, 25.0)))
+
+
+def test_segment_metrics_match_groupby():
+    y_true, y_pred = _holdout(400)
+    rng = np.random.default_rng(1)
+    labels = pd.Series(rng.choice(["amz", "ebay", "etsy"], len(y_true)))
+    labels[rng.random(len(labels)) < 0.05] = None
+
+    table = segment_metrics(y_true, y_pred, {"marketplace_name": labels}).set_index("segment")
+
+    frame = pd.DataFrame({"y": y_true, "p": y_pred, "segment": labels}).dropna(subset=["segment"])
+    for segment, group in frame.groupby("segment"):
+        errors = group["y"] - group["p"]
+        row = table.loc[segment]
+        assert row["n"] == len(group)
+        assert row["mse"] == pytest.approx(mean_squared_error(group["y"], group["p"]))
+        assert row["mae"] == pytest.approx(mean_absolute_error(group["y"], group["p"]))
+        assert row["r2"] == pytest.approx(r2_score(group["y"], group["p"]))
+        assert row["bias"] == pytest.approx(errors.mean())
+        assert row["lost_profit"] == pytest.approx(errors[errors > 0].sum() * 15.0)
+        assert row["waste_cost"] == pytest.approx(-errors[errors < 0].sum() * 10.0)
+    # Rows without a label are left out
+    assert table["n"].sum() == len(frame)
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+
+import src.incremental as incremental
+from src.feature_engineering import engineer_features
+
+
+def _sales(n_products=20, days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01")
+    rows = []
+    for p in range(n_products):
+        base = rng.uniform(5, 50)
+        for d in range(days):
+            rows.append({
+                "order_id": p * 1000 + d,
+                "created_at": start + pd.Timedelta(days=d, hours=int(rng.integers(0, 24))),
+                "product_name": f"prod_{p}",
+                "marketplace_name": ["amz", "ebay"][p % 2],
+                "quantity": float(rng.integers(1, 5)),
+                "sub_total": base * rng.integers(1, 5) + rng.normal(),
+            })
+    return pd.DataFrame(rows)
+
+
+def _config(tmp_path, **overrides):
+    return {
+        "state_file": str(tmp_path / "training_state.json"),
+        "registry_dir": str(tmp_path / "registry"),
+        "model_name": "lightgbm_model",
+        "full_retrain_every_days": 7,
+        "incremental_rounds": 10,
+        "incremental_min_rows": 20,
+        "drift_threshold": 100.0,
+        "cpu_budget": 1,
+        **overrides,
+    }
+
+
+@pytest.fixture
+def previous(monkeypatch):
+    """Production bundle trained on everything, served by the fake registry"""
+    X, y, scaler, _ = engineer_features(_sales())
+    params = {"n_estimators": 20, "num_leaves": 15, "verbose": -1}
+    model = LGBMRegressor(**params).fit(X, y)
+    bundle = {"model": model.booster_, "scaler": scaler, "params": params}
+    monkeypatch.setattr(incremental, "load_previous_model", lambda config: bundle)
+    return bundle
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "state" / "training_state.json")
+    incremental.save_training_state(path, watermark="2025-02-01 10:00", full_retrain=True)
+    first = incremental.load_training_state(path)
+    assert first["watermark"] == "2025-02-01T10:00:00"
+
+    # A warm-start run moves the watermark but keeps the last full retrain
+    incremental.save_training_state(path, watermark=pd.Timestamp("2025-02-03"), full_retrain=False)
+    second = incremental.load_training_state(path)
+    assert second["watermark"] == "2025-02-03T00:00:00"
+    assert second["last_full_retrain"] == first["last_full_retrain"]
+
+
+def test_full_retrain_reason():
+    assert incremental.full_retrain_reason({}, 7) == "no previous training state"
+    now = datetime(2025, 3, 10)
+    state = {"watermark": "2025-03-09T00:00:00", "last_full_retrain": (now - timedelta(days=2)).isoformat()}
+    assert incremental.full_retrain_reason(state, 7, now=now) is None
+    assert incremental.full_retrain_reason(state, 2, now=now) is not None
+
+
+def test_only_rows_after_the_watermark_are_trained_on(tmp_path, previous):
+    df = _sales()
+    # The watermark is an existing row's timestamp: that row was trained on already
+    watermark = df["created_at"].sort_values().iloc[int(len(df) * 0.8)]
+    config = _config(tmp_path)
+    incremental.save_training_state(config["state_file"], watermark=watermark, full_retrain=True)
+
+    results, scaler, feature_names = incremental.incremental_update(df, config)
+
+    n_new = int((df["created_at"] > watermark).sum())
+    n_eval = max(1, int(n_new * 0.2))
+    assert len(results["y_test"]) == n_eval
+    assert (results["test_meta"]["created_at"] > watermark).all()
+    # The holdout is the newest slice of the new rows
+    newest = df.loc[df["created_at"] > watermark, "created_at"].sort_values().iloc[-n_eval:]
+    assert list(results["test_meta"]["created_at"]) == list(newest)
+    assert scaler is previous["scaler"]
+    assert "prev_day_sales" in feature_names
+    assert set(results["drift"]) == set(feature_names)
+
+
+def test_too_few_new_rows_falls_back_to_full_retrain(tmp_path, previous):
+    df = _sales()
+    config = _config(tmp_path, incremental_min_rows=50)
+    watermark = df["created_at"].sort_values().iloc[-10]
+    incremental.save_training_state(config["state_file"], watermark=watermark, full_retrain=True)
+    assert incremental.incremental_update(df, config) is None
+
+
+def test_rejected_update_is_not_saved_or_registered(tmp_path, monkeypatch):
+    # main imports the Hopsworks client at module level
+    pytest.importorskip("hopsworks")
+    import src.main as main
+
+    calls = []
+
+    class _Experiment:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: calls.append(name)
+
+    df = _sales(n_products=2, days=5)
+    rejected = {"accepted": False, "baseline_mse": 1.0, "update_mse": 2.0, "mse": 1.0,
+                "quantile_models": {}, "drift": {"quantity": 0.1}}
+    monkeypatch.setitem(main.TRAINING_CONFIG, "mode", "incremental")
+    monkeypatch.setenv("HOPSWORKS_API_KEY", "key")
+    monkeypatch.setenv("HOPSWORKS_PROJECT_NAME", "project")
+    monkeypatch.setattr(main, "create_experiment_logger", lambda **kwargs: _Experiment())
+    monkeypatch.setattr(main, "init_hopsworks", lambda **kwargs: (None, None))
+    monkeypatch.setattr(main, "get_sales_data", lambda fs: df)
+    monkeypatch.setattr(main, "incremental_update", lambda df, config: (rejected, None, ["quantity"]))
+    for name in ("save_bundle", "register_model", "save_training_state"):
+        monkeypatch.setattr(main, name, lambda *args, _name=name, **kwargs: calls.append(_name))
+
+    main.main()
+    assert not {"save_bundle", "register_model", "save_training_state"} & set(calls)
@@ -0,0 +1,107 @@
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from src.model_bundle import BUNDLE_FORMAT, LATEST_POINTER, load_bundle, read_manifest, save_bundle
+
+FEATURES = ["day_of_week", "week_of_year", "prev_day_sales"]
+
+
+def _booster(X, y, objective="regression", **params):
+    return lgb.train({"objective": objective, "verbose": -1, "min_data_in_leaf": 5, **params},
+                     lgb.Dataset(X, y), num_boost_round=10)
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, len(FEATURES)))
+    return X, 3 * X[:, 2] + rng.normal(size=len(X))
+
+
+def test_bundle_round_trip(tmp_path, data):
+    X, y = data
+    frame = pd.DataFrame(X, columns=FEATURES)
+    scaler = StandardScaler().fit(frame)
+    model = _booster(X, y)
+    quantiles = {alpha: _booster(X, y, "quantile", alpha=alpha) for alpha in (0.1, 0.9)}
+
+    bundle_dir = save_bundle(str(tmp_path), model, scaler, FEATURES, {"mse": np.float64(1.5)},
+                             params={"learning_rate": 0.1, "callbacks": [print]}, quantile_models=quantiles)
+    bundle = load_bundle(bundle_dir)
+
+    np.testing.assert_allclose(bundle["model"].predict(X), model.predict(X))
+    for alpha, booster in quantiles.items():
+        np.testing.assert_allclose(bundle["quantile_models"][alpha].predict(X), booster.predict(X))
+    np.testing.assert_allclose(bundle["scaler"].transform(frame), scaler.transform(frame))
+    assert bundle["feature_names"] == FEATURES
+    assert bundle["metrics"] == {"mse": 1.5}
+    # Only JSON-safe params are kept
+    assert bundle["params"] == {"learning_rate": 0.1}
+    assert bundle["version"] == os.path.basename(bundle_dir)
+    with open(os.path.join(tmp_path, LATEST_POINTER)) as f:
+        assert f.read() == bundle["version"]
+
+    manifest = bundle["manifest"]
+    assert manifest["format"] == BUNDLE_FORMAT
+    assert manifest["quantiles"] == {"0.1": "quantile_p10.txt", "0.9": "quantile_p90.txt"}
+    # Every file the manifest names is digested, and nothing else is in the bundle
+    assert set(manifest["files"]) | {"manifest.json"} == set(os.listdir(bundle_dir))
+
+
+def test_identical_model_reuses_bundle(tmp_path, data):
+    X, y = data
+    model, scaler = _booster(X, y), StandardScaler().fit(X)
+
+    first = save_bundle(str(tmp_path), model, scaler, FEATURES, {"mse": 1.0})
+    second = save_bundle(str(tmp_path), model, scaler, FEATURES, {"mse": 2.0})
+
+    assert first == second
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(first), LATEST_POINTER])
+
+
+def test_non_standard_scaler_is_joblib_dumped(tmp_path, data):
+    X, y = data
+    scaler = MinMaxScaler().fit(X)
+
+    bundle = load_bundle(save_bundle(str(tmp_path), _booster(X, y), scaler, FEATURES, {}))
+
+    assert bundle["manifest"]["scaler"] == "joblib"
+    np.testing.assert_allclose(bundle["scaler"].transform(X), scaler.transform(X))
+
+
+def test_format_1_manifest_uses_fixed_names(tmp_path, data):
+    X, y = data
+    bundle_dir = save_bundle(str(tmp_path), _booster(X, y), StandardScaler().fit(X), FEATURES, {})
+    manifest_path = os.path.join(bundle_dir, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for key in ("format", "model_file", "scaler_files", "quantiles", "segments"):
+        manifest.pop(key)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    manifest = read_manifest(bundle_dir)
+
+    assert manifest["model_file"] == "model.txt"
+    assert set(manifest["scaler_files"]) == {"mean_", "scale_", "var_"}
+    assert load_bundle(bundle_dir)["quantile_models"] == {}
+
+
+def test_newer_format_is_rejected(tmp_path, data):
+    X, y = data
+    bundle_dir = save_bundle(str(tmp_path), _booster(X, y), StandardScaler().fit(X), FEATURES, {})
+    manifest_path = os.path.join(bundle_dir, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["format"] = BUNDLE_FORMAT + 1
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match="newer"):
+        load_bundle(bundle_dir)
@@ -0,0 +1,36 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from src.incremental import load_previous_model
+from src.model_bundle import save_bundle
+from src.model_registry import LocalModelRegistry, register_model
+
+
+def _save(registry, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(100, 2))
+    booster = lgb.train({"objective": "regression", "verbose": -1, "min_data_in_leaf": 5},
+                        lgb.Dataset(X, X[:, 0]), num_boost_round=3)
+    return save_bundle(registry.path, booster, StandardScaler().fit(X), ["a", "b"], {"mse": 1.0})
+
+
+def test_unpromoted_versions_are_never_resolved(tmp_path):
+    registry = LocalModelRegistry(str(tmp_path))
+    register_model(None, _save(registry, 0), mse=1.0, registry=registry, promote=False)
+
+    with pytest.raises(FileNotFoundError):
+        registry.resolve()
+    assert load_previous_model({"registry_dir": str(tmp_path), "model_name": registry.model_name}) is None
+
+
+def test_rejected_run_does_not_move_production(tmp_path):
+    registry = LocalModelRegistry(str(tmp_path))
+    register_model(None, _save(registry, 0), mse=1.0, registry=registry, promote=True)
+    approved = registry.resolve()
+    register_model(None, _save(registry, 1), mse=9.0, registry=registry, promote=False)
+
+    assert len(registry.versions()) == 2
+    assert registry.resolve() == approved
+    assert load_previous_model({"registry_dir": str(tmp_path), "model_name": registry.model_name})["version"] == approved
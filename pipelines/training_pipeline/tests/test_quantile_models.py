@@ -0,0 +1,56 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.quantile_models import predict_quantiles, quantile_metrics, train_quantile_models, update_quantile_models
+
+PARAMS = {"n_estimators": 30, "learning_rate": 0.1, "num_leaves": 15}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 3))
+    y = 10 * X[:, 0] + rng.normal(scale=5.0, size=len(X))
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def models(data):
+    X, y = data
+    return train_quantile_models(X[:1500], y[:1500], PARAMS, quantiles=(0.9, 0.1, 0.5), cpu_budget=2)
+
+
+def test_one_booster_per_level_in_order(models):
+    assert list(models) == [0.1, 0.5, 0.9]
+    assert all(isinstance(booster, lgb.Booster) for booster in models.values())
+    assert all(booster.current_iteration() == PARAMS["n_estimators"] for booster in models.values())
+
+
+def test_intervals_cover_about_their_nominal_share(models, data):
+    X, y = data
+    metrics = quantile_metrics(models, X[1500:], y[1500:])
+
+    assert metrics["interval_nominal"] == pytest.approx(0.8)
+    assert 0.65 < metrics["interval_coverage"] < 0.95
+    assert metrics["below_p10"] < metrics["below_p50"] < metrics["below_p90"]
+    assert all(metrics[f"pinball_{label}"] > 0 for label in ("p10", "p50", "p90"))
+
+
+def test_predictions_never_cross(models, data):
+    X, _ = data
+    # Far outside the training range, where separately fitted levels can cross
+    preds = predict_quantiles(models, X * 50)
+
+    assert preds.shape == (len(X), 3)
+    assert (np.diff(preds, axis=1) >= 0).all()
+
+
+def test_update_adds_rounds_and_keeps_originals(models, data):
+    X, y = data
+    updated = update_quantile_models(models, X[1500:], y[1500:], PARAMS, rounds=5, cpu_budget=2)
+
+    assert list(updated) == list(models)
+    for alpha, booster in updated.items():
+        assert booster.current_iteration() == PARAMS["n_estimators"] + 5
+        assert models[alpha].current_iteration() == PARAMS["n_estimators"]
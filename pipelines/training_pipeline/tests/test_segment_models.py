@@ -0,0 +1,57 @@
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.model_bundle import load_bundle, save_bundle
+from src.segment_models import routed_segments
+
+
+def _booster(X, y):
+    return lgb.train({"objective": "regression", "verbose": -1, "min_data_in_leaf": 5},
+                     lgb.Dataset(X, y), num_boost_round=5)
+
+
+def test_only_local_models_beating_global_are_routed():
+    models = {"amz": "m_amz", "ebay": "m_ebay"}
+    report = pd.DataFrame({
+        "segment": ["amz", "ebay", "etsy"],
+        "model": ["local", "local", "global"],
+        "local_holdout_mse": [1.0, 5.0, np.nan],
+        "global_holdout_mse": [2.0, 4.0, np.nan],
+    })
+
+    assert routed_segments(models, report) == {"amz": "m_amz"}
+    # Every segment below the row minimum: the report has no MSE columns
+    assert routed_segments({}, pd.DataFrame({"segment": ["etsy"], "model": ["global"]})) == {}
+
+
+def test_segment_models_round_trip_through_bundle(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 2))
+    scaler = StandardScaler().fit(X)
+    local = {"amz": _booster(X, 100 + X[:, 0]), "ebay": _booster(X, -X[:, 1])}
+
+    bundle_dir = save_bundle(str(tmp_path), _booster(X, X[:, 0]), scaler, ["a", "b"], {"mse": 1.0},
+                             segment_models=local, segment_by="marketplace_name")
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    bundle = load_bundle(bundle_dir)
+
+    assert manifest["segments"]["column"] == "marketplace_name"
+    assert set(manifest["segments"]["models"]) == {"amz", "ebay"}
+    assert bundle["segment_by"] == "marketplace_name"
+    for value, booster in local.items():
+        np.testing.assert_allclose(bundle["segment_models"][value].predict(X), booster.predict(X))
+
+
+def test_bundle_without_segments_loads_empty(tmp_path):
+    X = np.random.default_rng(1).normal(size=(100, 2))
+    bundle = load_bundle(save_bundle(str(tmp_path), _booster(X, X[:, 0]), StandardScaler().fit(X),
+                                     ["a", "b"], {"mse": 1.0}))
+
+    assert bundle["segment_models"] == {}
+    assert bundle["segment_by"] is None
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+import src.tuning as tuning
+from src.trial_cache import TrialCache, dataset_fingerprint, folds_fingerprint
+from src.tuning import time_series_folds, tune_lightgbm
+
+GRID = {"n_estimators": [10, 20], "num_leaves": [7, 15]}
+BASE = {"random_state": 0, "num_threads": 1}
+
+
+def _data(n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 3))
+    return X, X[:, 0] - X[:, 2] + 0.1 * rng.normal(size=n_rows)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TrialCache(str(tmp_path / "cache" / "trials.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def fitted(monkeypatch):
+    """(group params, rounds) of every booster tune_lightgbm trains"""
+    calls = []
+    fit_fold = tuning._fit_fold
+
+    def counting(fold_set, X_val, y_val, base_params, round_counts):
+        calls.append((base_params.get("num_leaves"), tuple(round_counts)))
+        return fit_fold(fold_set, X_val, y_val, base_params, round_counts)
+
+    monkeypatch.setattr(tuning, "_fit_fold", counting)
+    return calls
+
+
+def test_get_put_and_reopen(tmp_path, cache):
+    params = {"num_leaves": 7, "n_estimators": 10, "num_threads": 4}
+    assert cache.get("data", "folds", params) == {}
+    cache.put("data", "folds", params, {0: 1.5})
+    cache.put("data", "folds", params, {1: 2.5})
+    # Thread counts do not change the model, so they are not part of the key
+    assert cache.get("data", "folds", {**params, "num_threads": 1}) == {0: 1.5, 1: 2.5}
+    assert cache.get("other", "folds", params) == {}
+    assert cache.get("data", "folds", {**params, "num_leaves": 15}) == {}
+
+    reopened = TrialCache(cache.path)
+    assert reopened.get("data", "folds", params) == {0: 1.5, 1: 2.5}
+    assert reopened.summary()[0]["fold_scores"] == 2
+    assert reopened.prune(dataset="data") == 2
+    reopened.close()
+
+
+def test_fingerprints():
+    X, y = _data()
+    assert dataset_fingerprint(X, y) == dataset_fingerprint(X.copy(), y.copy())
+    assert dataset_fingerprint(X, y) != dataset_fingerprint(X, y + 1)
+    assert folds_fingerprint(time_series_folds(100, 3)) != folds_fingerprint(time_series_folds(100, 4))
+
+
+def test_full_hit_fits_nothing(cache, fitted):
+    X, y = _data()
+    first = tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    assert len(fitted) == 2 * 3
+    fitted.clear()
+
+    second = tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    assert fitted == []
+    assert second["cv_results"] == first["cv_results"]
+
+
+def test_extended_grid_fits_only_new_candidates(cache, fitted):
+    X, y = _data()
+    tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    fitted.clear()
+
+    extended = {**GRID, "n_estimators": [10, 20, 40]}
+    search = tune_lightgbm(X, y, extended, n_splits=3, base_params=BASE, cache=cache)
+    # Only n_estimators=40 is new: one booster per num_leaves and fold, for 40 rounds
+    assert sorted(fitted) == sorted([(7, (40,))] * 3 + [(15, (40,))] * 3)
+    assert len(search["cv_results"]) == 6
+
+
+def test_partial_folds_are_refit(cache, fitted):
+    X, y = _data()
+    tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    with cache._conn:
+        cache._conn.execute("DELETE FROM trials WHERE fold = 2")
+    fitted.clear()
+
+    tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    assert sorted(fitted) == [(7, (10, 20)), (15, (10, 20))]
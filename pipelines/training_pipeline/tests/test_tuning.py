@@ -0,0 +1,101 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+import src.tuning as tuning
+from src.tuning import build_dataset, count_fit_tasks, time_series_folds, to_native_params, tune_lightgbm
+
+GRID = {"n_estimators": [10, 30], "num_leaves": [7, 15], "learning_rate": [0.1]}
+BASE = {"random_state": 0, "num_threads": 1}
+
+
+def _data(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4))
+    y = 2 * X[:, 0] - X[:, 1] ** 2 + 0.1 * rng.normal(size=n_rows)
+    return X, y
+
+
+class _DictCache:
+    """TrialCache stand-in keeping fold scores in memory"""
+
+    def __init__(self):
+        self.scores = {}
+
+    @staticmethod
+    def _key(dataset, folds, params):
+        return dataset, folds, tuple(sorted((k, v) for k, v in params.items() if k != "num_threads"))
+
+    def get(self, dataset, folds, params):
+        return dict(self.scores.get(self._key(dataset, folds, params), {}))
+
+    def put(self, dataset, folds, params, fold_scores):
+        self.scores.setdefault(self._key(dataset, folds, params), {}).update(fold_scores)
+
+
+@pytest.fixture
+def fit_calls(monkeypatch):
+    """Number of boosters tune_lightgbm trains"""
+    calls = []
+    fit_fold = tuning._fit_fold
+
+    def counting(*args):
+        calls.append(args[-1])
+        return fit_fold(*args)
+
+    monkeypatch.setattr(tuning, "_fit_fold", counting)
+    return calls
+
+
+def test_folds_never_train_on_the_future():
+    folds = time_series_folds(100, n_splits=4)
+    assert len(folds) == 4
+    previous_train = 0
+    for train_idx, val_idx in folds:
+        assert train_idx.max() < val_idx.min()
+        assert np.array_equal(train_idx, np.arange(len(train_idx)))
+        assert np.array_equal(val_idx, np.arange(val_idx[0], val_idx[-1] + 1))
+        assert len(train_idx) > previous_train
+        previous_train = len(train_idx)
+    assert folds[-1][1][-1] == 99
+
+
+def test_round_groups_match_separate_fits(fit_calls):
+    X, y = _data()
+    search = tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE)
+    # One booster per (num_leaves, learning_rate) and fold, not per n_estimators
+    assert len(fit_calls) == count_fit_tasks(GRID, 3) == 2 * 3
+    assert all(rounds == [10, 30] for rounds in fit_calls)
+
+    full_set = build_dataset(X, y)
+    folds = time_series_folds(len(X), 3)
+    for result in search["cv_results"]:
+        native, rounds = to_native_params({**BASE, **result["params"]})
+        expected = []
+        for train_idx, val_idx in folds:
+            booster = lgb.train(native, full_set.subset(train_idx), num_boost_round=rounds)
+            expected.append(np.mean((y[val_idx] - booster.predict(X[val_idx])) ** 2))
+        assert np.allclose(result["fold_mse"], expected, rtol=1e-10)
+    best = min(search["cv_results"], key=lambda r: r["mean_mse"])
+    assert search["best_params"] == best["params"]
+
+
+def test_cache_round_trip(fit_calls):
+    X, y = _data()
+    cache = _DictCache()
+    first = tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    n_first = len(fit_calls)
+
+    second = tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    assert len(fit_calls) == n_first
+    assert second["best_params"] == first["best_params"]
+    assert [r["fold_mse"] for r in second["cv_results"]] == [r["fold_mse"] for r in first["cv_results"]]
+
+
+def test_cache_is_keyed_on_the_data(fit_calls):
+    X, y = _data()
+    cache = _DictCache()
+    tune_lightgbm(X, y, GRID, n_splits=3, base_params=BASE, cache=cache)
+    n_first = len(fit_calls)
+    tune_lightgbm(X, y + 1.0, GRID, n_splits=3, base_params=BASE, cache=cache)
+    assert len(fit_calls) == 2 * n_first